@@ -7,6 +7,13 @@ while ! nc -z ${DB_HOST} ${DB_PORT:-5432}; do
   sleep 1
 done
 
+# One directory per container, sample files are named by PID and PIDs
+# repeat across containers. prometheus_client needs it empty on start.
+if [ -n "${PROMETHEUS_MULTIPROC_DIR}" ]; then
+    rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+    mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+
 if [ "$1" = "gunicorn" ]; then
     python manage.py migrate
     python manage.py collectstatic --noinput
@@ -0,0 +1,6 @@
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Drops the live samples of a dead worker from /metrics
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,26 @@
+from adrf import mixins as async_mixins
+from adrf.viewsets import GenericViewSet
+from rest_framework import mixins
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+class AsyncReadModelViewSet(
+    async_mixins.ListModelMixin,
+    async_mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    mixins.UpdateModelMixin,
+    mixins.DestroyModelMixin,
+    GenericViewSet,
+):
+    """
+    ModelViewSet whose list and retrieve are served natively async with
+    the async ORM. Writes and extra actions stay sync and run in a thread,
+    so they keep working unchanged under the ASGI worker.
+    """
+
+    async def list(self, request: Request, *args, **kwargs) -> Response:
+        return await self.alist(request, *args, **kwargs)
+
+    async def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        return await self.aretrieve(request, *args, **kwargs)
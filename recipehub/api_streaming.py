@@ -0,0 +1,108 @@
+import json
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import QuerySet
+from django.http import HttpResponseBase, StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON, one object per line.
+    Selected with ?format=ndjson or Accept: application/x-ndjson
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        # Errors and other non-streamed responses become a single line
+        rows = data if isinstance(data, list) else [data]
+        return "".join(ndjson_line(row) for row in rows).encode(self.charset)
+
+
+STREAMING_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+
+def ndjson_line(data: Any) -> str:
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False) + "\n"
+
+
+class PaginatedStreamMixin:
+    """
+    List actions answered with the view's pagination or, for the NDJSON
+    format, streamed from a server-side cursor in bounded batches.
+    Actions using it need renderer_classes=STREAMING_RENDERER_CLASSES.
+    Under ASGI the stream is an async generator: Django would read a
+    sync iterator into a list before sending the first byte.
+    """
+
+    stream_chunk_size = 500
+
+    def paginated_or_streamed(
+        self, queryset: QuerySet, serializer_class: type[BaseSerializer]
+    ) -> HttpResponseBase:
+        if self.request.accepted_renderer.format == NDJSONRenderer.format:
+            if isinstance(self.request._request, ASGIRequest):
+                content = self.astream_ndjson(queryset, serializer_class)
+            else:
+                content = self.stream_ndjson(queryset, serializer_class)
+            return StreamingHttpResponse(
+                content,
+                content_type=NDJSONRenderer.media_type,
+            )
+
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = serializer_class(queryset, many=True, context=context)
+        return Response(serializer.data)
+
+    def batch_renderer(
+        self, serializer_class: type[BaseSerializer]
+    ) -> Callable[[list[Any]], str]:
+        context = self.get_serializer_context()
+
+        def render(batch: list[Any]) -> str:
+            data = serializer_class(batch, many=True, context=context).data
+            return "".join(ndjson_line(row) for row in data)
+
+        return render
+
+    def stream_ndjson(
+        self, queryset: QuerySet, serializer_class: type[BaseSerializer]
+    ) -> Iterator[str]:
+        render = self.batch_renderer(serializer_class)
+        batch = []
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            batch.append(obj)
+            if len(batch) == self.stream_chunk_size:
+                yield render(batch)
+                batch = []
+        if batch:
+            yield render(batch)
+
+    async def astream_ndjson(
+        self, queryset: QuerySet, serializer_class: type[BaseSerializer]
+    ) -> AsyncIterator[str]:
+        # Serializers may query related objects, so batches render in a thread
+        render = sync_to_async(self.batch_renderer(serializer_class))
+        batch = []
+        async for obj in queryset.aiterator(chunk_size=self.stream_chunk_size):
+            batch.append(obj)
+            if len(batch) == self.stream_chunk_size:
+                yield await render(batch)
+                batch = []
+        if batch:
+            yield await render(batch)
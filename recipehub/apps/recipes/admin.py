@@ -1,5 +1,5 @@
 from django.contrib import admin
-from recipehub.apps.recipes.models import Recipe, Category
+from recipehub.apps.recipes.models import Recipe, Category, Ingredient
 
 
 @admin.register(Recipe)
@@ -10,3 +10,9 @@ class RecipeAdmin(admin.ModelAdmin):
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ["id", "name"]
+
+
+@admin.register(Ingredient)
+class IngredientAdmin(admin.ModelAdmin):
+    list_display = ["id", "name"]
+    search_fields = ["name"]
@@ -1,7 +1,31 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class CategoryPagination(PageNumberPagination):
     page_size = 5
     page_size_query_param = "page-size"
     max_page_size = 30
+
+
+class RecipeCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id), opted into with ?pagination=cursor.
+    Deep pages cost the same as the first one: no COUNT(*) and no OFFSET.
+    """
+
+    ordering = ("-created_at", "-pk")
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        # Ordering chosen through OrderingFilter gets pk as a tie-breaker
+        if not {"pk", "-pk", "id", "-id"} & set(ordering):
+            tie_breaker = "-pk" if ordering[0].startswith("-") else "pk"
+            ordering = (*ordering, tie_breaker)
+        return ordering
+
+
+def wants_cursor_pagination(query_params) -> bool:
+    return (
+        query_params.get("pagination") == "cursor"
+        or RecipeCursorPagination.cursor_query_param in query_params
+    )
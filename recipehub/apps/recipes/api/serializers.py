@@ -15,6 +15,7 @@ class CategorySerializer(serializers.HyperlinkedModelSerializer):
 
 class RecipeSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
+    photo_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -25,6 +26,7 @@ class RecipeSerializer(serializers.ModelSerializer):
             "slug",
             "announcement_text",
             "photo",
+            "photo_variants",
             "ingredients",
             "recipe_text",
             "servings",
@@ -39,9 +41,38 @@ class RecipeSerializer(serializers.ModelSerializer):
         validated_data["user"] = self.context["request"].user
         return Recipe.objects.create(**validated_data)
 
+    def get_photo_variants(self, obj) -> dict[str, dict[str, str]]:
+        request = self.context.get("request")
+        if request is None:
+            return obj.photo_variant_urls
+        return {
+            ext: {width: request.build_absolute_uri(url) for width, url in urls.items()}
+            for ext, urls in obj.photo_variant_urls.items()
+        }
+
     def validate_ingredients(self, value):
         return validate_ingredients_format(value)
 
 
+class RecipeUserStateSerializer(RecipeSerializer):
+    """
+    Recipe with the requesting user's state and the rating summary.
+    Expects a queryset passed through annotate_user_state
+    """
+
+    is_favorited = serializers.BooleanField(read_only=True)
+    my_rating = serializers.FloatField(read_only=True, allow_null=True)
+    average_rating = serializers.FloatField(read_only=True, allow_null=True)
+    review_count = serializers.IntegerField(source="rating_count", read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + [
+            "is_favorited",
+            "my_rating",
+            "average_rating",
+            "review_count",
+        ]
+
+
 class RecipeModerationSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=("approved", "rejected"))
@@ -1,27 +1,50 @@
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
+from django.http import HttpResponseBase
 from rest_framework.request import Request
 
 import recipehub.api_permissions as custom_permissions
 from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets, permissions, status
+from rest_framework import permissions, status
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.pagination import BasePagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, BasePermission
 from rest_framework.response import Response
-from recipehub.apps.recipes.api.pagination import CategoryPagination
+from rest_framework.serializers import BaseSerializer
+from recipehub.api_async import AsyncReadModelViewSet
+from recipehub.api_streaming import PaginatedStreamMixin, STREAMING_RENDERER_CLASSES
+from recipehub.apps.recipes.api.pagination import (
+    CategoryPagination,
+    RecipeCursorPagination,
+    wants_cursor_pagination,
+)
 
 from recipehub.apps.recipes.api.serializers import (
     RecipeSerializer,
     CategorySerializer,
     RecipeModerationSerializer,
+    RecipeUserStateSerializer,
 )
 from recipehub.apps.recipes.models import Recipe, Category
-from recipehub.apps.recipes.utils import get_best_recipes
+from recipehub.apps.recipes.recommendations import recommended_recipes
+from recipehub.apps.recipes.similarity import (
+    get_similar_recipe_ids,
+    order_like,
+    similar_recipes_queryset,
+)
+from recipehub.apps.recipes.trending import get_trending_recipes
+from recipehub.apps.recipes.utils import (
+    add_user_favorite,
+    annotate_user_state,
+    filter_by_ingredients,
+    get_best_recipes,
+    remove_user_favorite,
+)
 from recipehub.apps.users.models import UserRecipeFavorite
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(AsyncReadModelViewSet):
     queryset = Category.objects.all().order_by("pk")
     serializer_class = CategorySerializer
     pagination_class = CategoryPagination
@@ -32,7 +55,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(PaginatedStreamMixin, AsyncReadModelViewSet):
     queryset = Recipe.objects.all().order_by("pk")
     serializer_class = RecipeSerializer
     lookup_field = "slug"
@@ -43,12 +66,47 @@ class RecipeViewSet(viewsets.ModelViewSet):
     }
     search_fields = ["name", "ingredients", "recipe_text"]
     ordering_fields = ["name", "cooking_time", "created_at"]
+    # Actions whose results may be reordered by created_at for keyset paging
+    cursor_pagination_actions = ["list", "my_recipes", "get_in_process_recipes"]
+    # Actions that add the user's state to each recipe with ?include=user_state
+    user_state_actions = ["list", "my_recipes", "recipe_builder"]
+
+    @property
+    def paginator(self) -> BasePagination | None:
+        # Page numbers by default, keyset pagination with ?pagination=cursor
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            if (
+                request is not None
+                and self.action in self.cursor_pagination_actions
+                and wants_cursor_pagination(request.query_params)
+            ):
+                self._paginator = RecipeCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
 
     def get_queryset(self) -> QuerySet[Recipe]:
         user = self.request.user
+        queryset = Recipe.objects.select_related("user")
+        if self.includes_user_state():
+            queryset = annotate_user_state(queryset, user)
         if user.is_staff:
-            return Recipe.objects.all()
-        return Recipe.objects.filter(moderation_status="approved")
+            return queryset
+        return queryset.filter(moderation_status="approved")
+
+    def get_serializer_class(self) -> type[BaseSerializer]:
+        if self.includes_user_state():
+            return RecipeUserStateSerializer
+        return super().get_serializer_class()
+
+    def includes_user_state(self) -> bool:
+        request = getattr(self, "request", None)
+        return (
+            request is not None
+            and self.action in self.user_state_actions
+            and "user_state" in request.query_params.get("include", "").split(",")
+        )
 
     def get_permissions(self) -> list[BasePermission]:
         # For custom actions use permissions from the decorator
@@ -79,11 +137,16 @@ class RecipeViewSet(viewsets.ModelViewSet):
         methods=["get"],
         url_path="my-recipes",
         permission_classes=[IsAuthenticated],
+        renderer_classes=STREAMING_RENDERER_CLASSES,
     )
-    def my_recipes(self, request: Request) -> Response:
-        recipes = self.get_queryset().filter(user=request.user).order_by("pk")
-        serializer = RecipeSerializer(recipes, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def my_recipes(self, request: Request) -> HttpResponseBase:
+        recipes = (
+            self.get_queryset()
+            .select_related("user")
+            .filter(user=request.user)
+            .order_by("pk")
+        )
+        return self.paginated_or_streamed(recipes, self.get_serializer_class())
 
     @action(
         detail=False,
@@ -100,6 +163,46 @@ class RecipeViewSet(viewsets.ModelViewSet):
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="trending",
+        name="Trending recipes",
+        permission_classes=[IsAuthenticated],
+    )
+    def trending(self, request: Request) -> Response:
+        serializer = RecipeSerializer(get_trending_recipes(), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="recommended",
+        name="Recommended recipes",
+        permission_classes=[IsAuthenticated],
+    )
+    def recommended(self, request: Request) -> Response:
+        # Precomputed by the recommendation tasks, users without
+        # favorites or reviews yet get the best recipes
+        recipes = recommended_recipes(request.user.id) or get_best_recipes()
+        serializer = RecipeSerializer(recipes, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="similar",
+        name="Similar recipes",
+        permission_classes=[IsAuthenticated],
+    )
+    def similar(self, request: Request, *args, **kwargs) -> Response:
+        # Precomputed by the rebuild_similar_recipes task
+        recipe = self.get_object()
+        similar_ids = get_similar_recipe_ids(recipe.id)
+        recipes = order_like(similar_recipes_queryset(similar_ids), similar_ids)
+        serializer = RecipeSerializer(recipes, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
     # Moderation block
     @action(
         detail=False,
@@ -107,11 +210,15 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_path="in-process",
         name="Recipes are being moderated",
         permission_classes=[IsAuthenticated, IsAdminUser],
+        renderer_classes=STREAMING_RENDERER_CLASSES,
     )
-    def get_in_process_recipes(self, request: Request) -> Response:
-        recipes = Recipe.objects.filter(moderation_status="in_process").order_by("pk")
-        serializer = RecipeSerializer(recipes, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def get_in_process_recipes(self, request: Request) -> HttpResponseBase:
+        recipes = (
+            Recipe.objects.select_related("user")
+            .filter(moderation_status="in_process")
+            .order_by("pk")
+        )
+        return self.paginated_or_streamed(recipes, RecipeSerializer)
 
     @action(
         detail=True,
@@ -169,6 +276,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            add_user_favorite(user.id, recipe.id)
             return Response(status=status.HTTP_201_CREATED)
 
         deleted, _ = UserRecipeFavorite.objects.filter(
@@ -181,6 +289,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        remove_user_favorite(user.id, recipe.id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     # Recipe Builder block
@@ -190,17 +299,14 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_path="builder",
         name="Recipe builder",
         permission_classes=[IsAuthenticated],
+        renderer_classes=STREAMING_RENDERER_CLASSES,
     )
-    def recipe_builder(self, request: Request) -> Response:
+    def recipe_builder(self, request: Request) -> HttpResponseBase:
         ingredients = request.query_params.get("ingredients", "").split(",")
-        q = Q()
-        for ing in ingredients:
-            q |= Q(ingredients__icontains=ing)
-        queryset = (
-            Recipe.objects.select_related("user", "category")
-            .filter(moderation_status="approved")
-            .filter(q)
-            .order_by("pk")
-        )
-        serializer = RecipeSerializer(queryset, many=True)
-        return Response({"recipes": serializer.data}, status=status.HTTP_200_OK)
+        queryset = filter_by_ingredients(
+            Recipe.objects.select_related("user").filter(moderation_status="approved"),
+            ingredients,
+        ).order_by("-matched_ingredients", "missing_ingredients", "pk")
+        if self.includes_user_state():
+            queryset = annotate_user_state(queryset, request.user)
+        return self.paginated_or_streamed(queryset, self.get_serializer_class())
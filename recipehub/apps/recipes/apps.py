@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class RecipesConfig(AppConfig):
     name = "recipehub.apps.recipes"
+
+    def ready(self):
+        import recipehub.apps.recipes.signals  # noqa: F401
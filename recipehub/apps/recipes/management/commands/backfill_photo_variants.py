@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.tasks import generate_recipe_photo_variants
+
+
+class Command(BaseCommand):
+    help = "Queues resized variants for recipe photos that don't have them yet"
+
+    def handle(self, *args, **options):
+        recipe_ids = (
+            Recipe.objects.exclude(photo="")
+            .exclude(photo__isnull=True)
+            .filter(photo_variants={})
+            .values_list("pk", flat=True)
+        )
+
+        queued = 0
+        for recipe_id in recipe_ids.iterator():
+            generate_recipe_photo_variants.delay(recipe_id)
+            queued += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Queued photo variants for {queued} recipes")
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.utils import sync_recipe_ingredients
+
+
+class Command(BaseCommand):
+    help = "Parses Recipe.ingredients text into Ingredient and RecipeIngredient rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = Recipe.objects.only("pk", "ingredients").order_by("pk")
+
+        batch = []
+        processed = 0
+        for recipe in queryset.iterator(chunk_size=batch_size):
+            batch.append(recipe)
+            if len(batch) >= batch_size:
+                with transaction.atomic():
+                    sync_recipe_ingredients(batch)
+                processed += len(batch)
+                batch = []
+
+        if batch:
+            with transaction.atomic():
+                sync_recipe_ingredients(batch)
+            processed += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled ingredients for {processed} recipes")
+        )
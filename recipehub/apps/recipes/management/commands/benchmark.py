@@ -0,0 +1,251 @@
+import json
+import math
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from recipehub.apps.recipes.models import Recipe
+
+User = get_user_model()
+
+SCENARIOS = [
+    "recipes-list",
+    "recipes-search",
+    "recipe-detail",
+    "create-review",
+    "save-recipe",
+    "api-recipes",
+    "api-recipes-cursor",
+    "api-recipe-detail",
+]
+
+
+def build_scenarios(recipe: Recipe) -> dict[str, tuple[str, str, dict | None]]:
+    """
+    Maps scenario names to (method, url, JSON payload)
+    """
+    search = recipe.name.split()[0]
+    return {
+        "recipes-list": ("get", reverse("recipes:recipes-list"), None),
+        "recipes-search": (
+            "get",
+            f"{reverse('recipes:recipes-list')}?search={search}",
+            None,
+        ),
+        "recipe-detail": (
+            "get",
+            reverse("recipes:recipe-detail", kwargs={"slug": recipe.slug}),
+            None,
+        ),
+        "create-review": (
+            "post",
+            reverse("reviews:create-review"),
+            {"slug": recipe.slug, "rating": 4},
+        ),
+        "save-recipe": ("post", reverse("recipes:save-recipe"), {"slug": recipe.slug}),
+        "api-recipes": ("get", reverse("recipe-list"), None),
+        "api-recipes-cursor": (
+            "get",
+            f"{reverse('recipe-list')}?pagination=cursor",
+            None,
+        ),
+        "api-recipe-detail": (
+            "get",
+            reverse("recipe-detail", kwargs={"slug": recipe.slug}),
+            None,
+        ),
+    }
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(durations: list[float], errors: int, elapsed: float) -> dict:
+    values = sorted(duration * 1000 for duration in durations)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Returns the scenarios whose p95 grew by more than threshold percent
+    """
+    regressions = []
+    for name, stats in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base or not base["p95_ms"]:
+            continue
+        change = (stats["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+        if change > threshold:
+            regressions.append(
+                f"{name}: p95 {base['p95_ms']}ms -> {stats['p95_ms']}ms (+{change:.1f}%)"
+            )
+    return regressions
+
+
+def current_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures p50/p95/p99 latency of the hot HTML and API paths through "
+        "the Django test client against the configured database and Redis"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument(
+            "--scenario", action="append", choices=SCENARIOS, dest="scenarios"
+        )
+        parser.add_argument("--user", help="Username to send requests as")
+        parser.add_argument("--output", help="Write results as JSON to this file")
+        parser.add_argument("--compare", help="Baseline JSON from a previous run")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20.0,
+            help="Allowed p95 growth over the baseline, in percent",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1")
+        user = self.get_user(options["user"])
+        recipe = (
+            Recipe.objects.filter(moderation_status="approved")
+            .exclude(user=user)
+            .order_by("pk")
+            .first()
+        )
+        if recipe is None:
+            raise CommandError("No approved recipes to benchmark, seed data first")
+
+        host = next((h for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+        scenarios = build_scenarios(recipe)
+        results = {
+            "commit": current_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "scenarios": {},
+        }
+
+        for name in options["scenarios"] or SCENARIOS:
+            method, url, payload = scenarios[name]
+            run = Runner(user, host, method, url, payload)
+            run.measure(options["warmup"], concurrency=1)
+            start = time.perf_counter()
+            durations, errors = run.measure(options["requests"], options["concurrency"])
+            stats = summarize(durations, errors, time.perf_counter() - start)
+            results["scenarios"][name] = stats
+            self.stdout.write(
+                f"{name:<20} p50 {stats['p50_ms']:>9.2f}ms  "
+                f"p95 {stats['p95_ms']:>9.2f}ms  p99 {stats['p99_ms']:>9.2f}ms  "
+                f"errors {stats['errors']}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+            regressions = compare(results, baseline, options["threshold"])
+            if regressions:
+                raise CommandError("Latency regressions:\n" + "\n".join(regressions))
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished"))
+
+    def get_user(self, username: str | None) -> User:
+        users = User.objects.filter(is_active=True).order_by("pk")
+        user = users.filter(username=username).first() if username else users.first()
+        if user is None:
+            raise CommandError("No user to send requests as")
+        return user
+
+
+class Runner:
+    """
+    Sends one scenario's requests from a pool of logged-in test clients
+    """
+
+    def __init__(self, user, host: str, method: str, url: str, payload: dict | None):
+        self.user = user
+        self.host = host
+        self.method = method
+        self.url = url
+        self.payload = payload
+
+    def measure(self, requests: int, concurrency: int) -> tuple[list[float], int]:
+        if requests <= 0:
+            return [], 0
+        if concurrency <= 1:
+            return self.worker(requests)
+
+        counts = [
+            requests // concurrency + (1 if i < requests % concurrency else 0)
+            for i in range(concurrency)
+        ]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            batches = list(pool.map(self.threaded_worker, counts))
+        durations = [duration for batch, _ in batches for duration in batch]
+        return durations, sum(errors for _, errors in batches)
+
+    def threaded_worker(self, requests: int) -> tuple[list[float], int]:
+        try:
+            return self.worker(requests)
+        finally:
+            connections.close_all()
+
+    def worker(self, requests: int) -> tuple[list[float], int]:
+        client = Client(HTTP_HOST=self.host, raise_request_exception=False)
+        client.force_login(self.user)
+
+        durations = []
+        errors = 0
+        for _ in range(requests):
+            start = time.perf_counter()
+            if self.method == "post":
+                response = client.post(
+                    self.url, data=self.payload, content_type="application/json"
+                )
+            else:
+                response = client.get(self.url)
+            durations.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+        return durations, errors
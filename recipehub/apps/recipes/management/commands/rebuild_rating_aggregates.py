@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.utils import rating_histogram_field, RATING_STARS
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the denormalized rating aggregates on Recipe from Review rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        aggregates = {
+            "total_sum": Coalesce(Sum("reviews__rating"), 0.0),
+            "total_count": Count("reviews"),
+        }
+        for star in RATING_STARS:
+            aggregates[f"total_{star}"] = Count(
+                "reviews",
+                filter=Q(
+                    reviews__rating__gte=star - 0.5, reviews__rating__lt=star + 0.5
+                ),
+            )
+        update_fields = ["rating_sum", "rating_count"] + [
+            rating_histogram_field(star) for star in RATING_STARS
+        ]
+
+        queryset = (
+            Recipe.objects.annotate(**aggregates)
+            .only("pk", *update_fields)
+            .order_by("pk")
+        )
+
+        batch = []
+        updated = 0
+        for recipe in queryset.iterator(chunk_size=batch_size):
+            recipe.rating_sum = recipe.total_sum
+            recipe.rating_count = recipe.total_count
+            for star in RATING_STARS:
+                setattr(
+                    recipe,
+                    rating_histogram_field(star),
+                    getattr(recipe, f"total_{star}"),
+                )
+            batch.append(recipe)
+
+            if len(batch) >= batch_size:
+                Recipe.objects.bulk_update(batch, update_fields)
+                updated += len(batch)
+                batch = []
+
+        if batch:
+            Recipe.objects.bulk_update(batch, update_fields)
+            updated += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt rating aggregates for {updated} recipes")
+        )
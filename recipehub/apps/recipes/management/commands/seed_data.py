@@ -0,0 +1,476 @@
+import csv
+import io
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from recipehub.apps.recipes.models import Category, Recipe
+from recipehub.apps.recipes.utils import (
+    RATING_STARS,
+    generate_unique_slug,
+    invalidate_best_recipes,
+    rating_histogram_field,
+    sync_recipe_ingredients,
+)
+from recipehub.apps.reviews.models import Comment, Review
+from recipehub.apps.users.models import UserRecipeFavorite
+from recipehub.redis import batch_r, pipeline
+
+User = get_user_model()
+
+CATEGORY_NAMES = [
+    "Breakfast",
+    "Soups",
+    "Salads",
+    "Pasta",
+    "Baking",
+    "Desserts",
+    "Grill",
+    "Seafood",
+    "Vegetarian",
+    "Drinks",
+    "Snacks",
+    "Sauces",
+]
+ADJECTIVES = [
+    "Spicy",
+    "Creamy",
+    "Crispy",
+    "Smoky",
+    "Roasted",
+    "Garlic",
+    "Lemon",
+    "Herb",
+    "Honey",
+    "Rustic",
+    "Quick",
+    "Classic",
+    "Sweet",
+    "Tangy",
+    "Golden",
+    "Summer",
+]
+MAINS = [
+    "Tomato",
+    "Chicken",
+    "Mushroom",
+    "Salmon",
+    "Potato",
+    "Lentil",
+    "Pumpkin",
+    "Beef",
+    "Spinach",
+    "Shrimp",
+    "Apple",
+    "Chickpea",
+    "Cheese",
+    "Pork",
+    "Carrot",
+    "Tofu",
+]
+DISHES = [
+    "Soup",
+    "Salad",
+    "Pasta",
+    "Stew",
+    "Pie",
+    "Curry",
+    "Risotto",
+    "Tart",
+    "Bowl",
+    "Casserole",
+]
+INGREDIENTS = [
+    "tomato",
+    "onion",
+    "garlic",
+    "olive oil",
+    "butter",
+    "flour",
+    "egg",
+    "milk",
+    "cheese",
+    "chicken",
+    "rice",
+    "potato",
+    "carrot",
+    "salt",
+    "black pepper",
+    "lemon",
+    "basil",
+    "parsley",
+    "cream",
+    "sugar",
+    "honey",
+    "mushroom",
+    "spinach",
+    "salmon",
+    "lentils",
+    "chickpeas",
+    "paprika",
+    "cumin",
+    "ginger",
+    "soy sauce",
+]
+QUANTITIES = ["1 pc", "2 pcs", "100 g", "200 g", "500 g", "1 tbsp", "2 tsp", "1 cup"]
+COMMENTS = [
+    "Made this for dinner, everyone loved it.",
+    "Needed a bit more salt, otherwise great.",
+    "Easy to follow, thanks!",
+    "I swapped the cheese for feta and it worked well.",
+    "Took longer than the stated cooking time for me.",
+    "Will definitely make it again.",
+]
+# Skewed towards good ratings, like real review sites
+RATING_WEIGHTS = [4, 6, 15, 35, 40]
+
+
+def zipf_weights(size: int, skew: float) -> list[float]:
+    """
+    Popularity weights by rank, rank 0 being the most popular
+    """
+    return [1 / (rank + 1) ** skew for rank in range(size)]
+
+
+def allocate(total: int, weights: list[float], cap: int | None = None) -> list[int]:
+    """
+    Splits total between the weighted slots. With a cap, what the full
+    slots cannot take goes to the others, as long as any has room left.
+    """
+    counts = [0] * len(weights)
+    open_slots = list(range(len(weights)))
+    while total > 0 and open_slots:
+        weight_sum = sum(weights[i] for i in open_slots)
+        shares = {i: int(total * weights[i] / weight_sum) for i in open_slots}
+        for n in range(total - sum(shares.values())):
+            shares[open_slots[n % len(open_slots)]] += 1
+        for i, share in shares.items():
+            if cap is not None:
+                share = min(share, cap - counts[i])
+            counts[i] += share
+            total -= share
+        if cap is not None:
+            open_slots = [i for i in open_slots if counts[i] < cap]
+    return counts
+
+
+def copy_rows(model, fields: list[str], rows: list[tuple]) -> None:
+    """
+    Inserts rows with a single COPY ... FROM STDIN, skipping the ORM
+    """
+    if not rows:
+        return
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(f).column) for f in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+class SlugAllocator:
+    """
+    Hands out unique slugs from one suffix query per distinct base,
+    continuing after the suffixes already in the table
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.next_suffix: dict[str, int] = {}
+
+    def __call__(self, value: str) -> str:
+        base = slugify(value)
+        suffix = self.next_suffix.get(base)
+        if suffix is None:
+            slug = generate_unique_slug(self.model(), value)
+            suffix = int(slug.rsplit("-", 1)[1]) if slug != base else 0
+        else:
+            slug = f"{base}-{suffix}"
+        self.next_suffix[base] = suffix + 1
+        return slug
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a large synthetic dataset for capacity testing with "
+        "bulk_create and COPY, keeping aggregates and Redis keys consistent"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=len(CATEGORY_NAMES))
+        parser.add_argument("--recipes", type=int, default=10000)
+        parser.add_argument("--reviews", type=int, default=100000)
+        parser.add_argument("--comments", type=int, default=20000)
+        parser.add_argument("--favorites", type=int, default=50000)
+        parser.add_argument(
+            "--views", type=int, help="Total unique views, 100 per recipe by default"
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of recipe and author popularity, 0 is uniform",
+        )
+        parser.add_argument("--approved-ratio", type=float, default=0.9)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Spread reviews, comments and favorites over this many days",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--password", default="seed-password")
+        parser.add_argument("--seed", type=int, help="Random seed for repeatable data")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["categories"] < 1:
+            raise CommandError("--users and --categories must be at least 1")
+        if not 0 <= options["approved_ratio"] <= 1:
+            raise CommandError("--approved-ratio must be between 0 and 1")
+
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = datetime.now(timezone.utc)
+        self.days = options["days"]
+
+        user_ids = self.seed_users(options["users"], options["password"])
+        category_ids = self.seed_categories(options["categories"])
+        plan = self.plan_recipes(options, len(user_ids))
+
+        totals = {"recipes": 0, "reviews": 0, "comments": 0, "favorites": 0}
+        slug = SlugAllocator(Recipe)
+        for start in range(0, len(plan), self.batch_size):
+            with transaction.atomic():
+                batch_totals = self.seed_recipe_batch(
+                    plan[start : start + self.batch_size],
+                    user_ids,
+                    category_ids,
+                    slug,
+                )
+            for key, count in batch_totals.items():
+                totals[key] += count
+            self.stdout.write(f"Seeded {totals['recipes']}/{len(plan)} recipes")
+
+        invalidate_best_recipes()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(user_ids)} users, {len(category_ids)} categories, "
+                f"{totals['recipes']} recipes, {totals['reviews']} reviews, "
+                f"{totals['comments']} comments and {totals['favorites']} favorites"
+            )
+        )
+
+    def seed_users(self, count: int, password: str) -> list[int]:
+        # Hashing is deliberately slow, so every seeded user shares one hash
+        password = make_password(password)
+        offset = User.objects.filter(username__startswith="seed-user-").count()
+        user_ids = []
+        for start in range(0, count, self.batch_size):
+            with transaction.atomic():
+                users = User.objects.bulk_create(
+                    [
+                        User(
+                            username=f"seed-user-{offset + n}",
+                            email=f"seed-user-{offset + n}@example.com",
+                            password=password,
+                        )
+                        for n in range(start, min(start + self.batch_size, count))
+                    ]
+                )
+                # Verified primary addresses, as mandatory email verification
+                # keeps users without one from logging in
+                EmailAddress.objects.bulk_create(
+                    [
+                        EmailAddress(
+                            user_id=user.pk,
+                            email=user.email,
+                            verified=True,
+                            primary=True,
+                        )
+                        for user in users
+                    ]
+                )
+            user_ids.extend(user.pk for user in users)
+        return user_ids
+
+    def seed_categories(self, count: int) -> list[int]:
+        slug = SlugAllocator(Category)
+        categories = []
+        for n in range(count):
+            name = CATEGORY_NAMES[n % len(CATEGORY_NAMES)]
+            if n >= len(CATEGORY_NAMES):
+                name = f"{name} {n // len(CATEGORY_NAMES) + 1}"
+            categories.append(Category(name=name, slug=slug(name)))
+        return [category.pk for category in Category.objects.bulk_create(categories)]
+
+    def plan_recipes(self, options: dict, user_count: int) -> list[dict]:
+        """
+        Decides status, author and engagement volumes of every recipe up
+        front, so the skew holds across the whole dataset rather than per batch
+        """
+        count = options["recipes"]
+        authors = self.random.choices(
+            range(user_count),
+            cum_weights=list(accumulate(zipf_weights(user_count, options["skew"]))),
+            k=count,
+        )
+        plan = []
+        for author in authors:
+            approved = self.random.random() < options["approved_ratio"]
+            status = (
+                "approved"
+                if approved
+                else self.random.choice(["in_process", "rejected"])
+            )
+            plan.append(
+                {
+                    "author": author,
+                    "status": status,
+                    "reviews": 0,
+                    "comments": 0,
+                    "favorites": 0,
+                    "views": 0,
+                }
+            )
+
+        # Only approved recipes are visible, so only they get engagement.
+        # Popularity rank is shuffled to not correlate with insertion order.
+        approved = [item for item in plan if item["status"] == "approved"]
+        self.random.shuffle(approved)
+        weights = zipf_weights(len(approved), options["skew"])
+        views = options["views"] if options["views"] is not None else count * 100
+        # Reviewers and favoriters are distinct users other than the author
+        volumes = {
+            "reviews": allocate(options["reviews"], weights, cap=user_count - 1),
+            "favorites": allocate(options["favorites"], weights, cap=user_count - 1),
+            "comments": allocate(options["comments"], weights),
+            "views": allocate(views, weights),
+        }
+        for key, counts in volumes.items():
+            for item, value in zip(approved, counts):
+                item[key] = value
+        return plan
+
+    def seed_recipe_batch(
+        self,
+        plan: list[dict],
+        user_ids: list[int],
+        category_ids: list[int],
+        slug: SlugAllocator,
+    ) -> dict[str, int]:
+        recipes = []
+        reviews = []
+        for item in plan:
+            name = (
+                f"{self.random.choice(ADJECTIVES)} {self.random.choice(MAINS)} "
+                f"{self.random.choice(DISHES)}"
+            )
+            ratings = self.random.choices(
+                list(RATING_STARS), weights=RATING_WEIGHTS, k=item["reviews"]
+            )
+            reviews.append(ratings)
+            recipe = Recipe(
+                user_id=user_ids[item["author"]],
+                category_id=self.random.choice(category_ids),
+                name=name,
+                slug=slug(name),
+                announcement_text=f"A {name.lower()} for any day of the week.",
+                ingredients=self.fake_ingredients(),
+                recipe_text=f"Prepare the ingredients and cook the {name.lower()}.",
+                servings=self.random.randint(1, 8),
+                cooking_time=self.random.randint(5, 180),
+                calories=self.random.randint(50, 1200),
+                moderation_status=item["status"],
+                view_count=item["views"],
+                rating_sum=sum(ratings),
+                rating_count=len(ratings),
+            )
+            # The aggregates the Review signals would have maintained
+            for star in RATING_STARS:
+                setattr(recipe, rating_histogram_field(star), ratings.count(star))
+            recipes.append(recipe)
+
+        Recipe.objects.bulk_create(recipes)
+        sync_recipe_ingredients(recipes)
+
+        review_rows, comment_rows, favorite_rows = [], [], []
+        for recipe, item, ratings in zip(recipes, plan, reviews):
+            author = user_ids[item["author"]]
+            for user_id, rating in zip(
+                self.other_users(user_ids, author, ratings), ratings
+            ):
+                review_rows.append((recipe.pk, user_id, rating, self.timestamp()))
+            for user_id in self.other_users(user_ids, author, range(item["favorites"])):
+                favorite_rows.append((user_id, recipe.pk, self.timestamp()))
+            for _ in range(item["comments"]):
+                comment_rows.append(
+                    (
+                        recipe.pk,
+                        self.random.choice(user_ids),
+                        self.random.choice(COMMENTS),
+                        self.timestamp(),
+                        True,
+                    )
+                )
+
+        copy_rows(Review, ["recipe", "user", "rating", "created_at"], review_rows)
+        copy_rows(
+            Comment, ["recipe", "user", "body", "created_at", "active"], comment_rows
+        )
+        copy_rows(UserRecipeFavorite, ["user", "recipe", "added_at"], favorite_rows)
+        self.seed_redis(recipes)
+
+        return {
+            "recipes": len(recipes),
+            "reviews": len(review_rows),
+            "comments": len(comment_rows),
+            "favorites": len(favorite_rows),
+        }
+
+    def seed_redis(self, recipes: list[Recipe]) -> None:
+        """
+        Writes the rating leaderboard and view totals the views keep in Redis
+        """
+        pipe = pipeline(batch_r)
+        ratings = {
+            recipe.pk: recipe.average_rating
+            for recipe in recipes
+            if recipe.rating_count
+        }
+        if ratings:
+            pipe.zadd("recipe:ratings", ratings)
+        for recipe in recipes:
+            if recipe.view_count:
+                pipe.set(f"recipe:{recipe.pk}:views", recipe.view_count)
+        pipe.execute()
+
+    def other_users(self, user_ids: list[int], author: int, items) -> list[int]:
+        """
+        Distinct random users other than the author, one per item
+        """
+        count = len(items)
+        if not count:
+            return []
+        picked = self.random.sample(user_ids, min(count + 1, len(user_ids)))
+        return [user_id for user_id in picked if user_id != author][:count]
+
+    def fake_ingredients(self) -> str:
+        names = self.random.sample(INGREDIENTS, self.random.randint(3, 10))
+        return "\n".join(f"{name} - {self.random.choice(QUANTITIES)}" for name in names)
+
+    def timestamp(self) -> str:
+        offset = timedelta(seconds=self.random.randint(0, self.days * 24 * 60 * 60))
+        return (self.now - offset).isoformat()
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_alter_category_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of unique views'),
+        ),
+    ]
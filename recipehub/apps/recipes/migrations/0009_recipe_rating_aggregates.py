@@ -0,0 +1,79 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:21
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    aggregates = {
+        "total_sum": Sum("reviews__rating"),
+        "total_count": Count("reviews"),
+    }
+    for star in range(1, 6):
+        aggregates[f"total_{star}"] = Count(
+            "reviews",
+            filter=Q(reviews__rating__gte=star - 0.5, reviews__rating__lt=star + 0.5),
+        )
+
+    recipes = []
+    for recipe in Recipe.objects.annotate(**aggregates).filter(total_count__gt=0):
+        recipe.rating_sum = recipe.total_sum
+        recipe.rating_count = recipe.total_count
+        for star in range(1, 6):
+            setattr(recipe, f"rating_{star}_count", getattr(recipe, f"total_{star}"))
+        recipes.append(recipe)
+
+    Recipe.objects.bulk_update(
+        recipes,
+        ["rating_sum", "rating_count"]
+        + [f"rating_{star}_count" for star in range(1, 6)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_view_count'),
+        ('reviews', '0005_remove_comment_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_sum',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:24
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ingredients'], name='recipe_ingredients_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:26
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+from recipehub.apps.recipes.utils import parse_ingredients
+
+
+def fill_recipe_ingredients(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    Ingredient = apps.get_model("recipes", "Ingredient")
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+
+    recipes = Recipe.objects.only("pk", "ingredients").order_by("pk")
+    batch = []
+    for recipe in recipes.iterator(chunk_size=500):
+        batch.append(recipe)
+        if len(batch) == 500:
+            fill_batch(batch, Recipe, Ingredient, RecipeIngredient)
+            batch = []
+    if batch:
+        fill_batch(batch, Recipe, Ingredient, RecipeIngredient)
+
+
+def fill_batch(recipes, Recipe, Ingredient, RecipeIngredient):
+    parsed = {recipe.pk: parse_ingredients(recipe.ingredients) for recipe in recipes}
+    names = {name for items in parsed.values() for name in items}
+    Ingredient.objects.bulk_create(
+        [Ingredient(name=name) for name in names], ignore_conflicts=True
+    )
+    ingredient_ids = dict(
+        Ingredient.objects.filter(name__in=names).values_list("name", "id")
+    )
+    RecipeIngredient.objects.bulk_create(
+        [
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_ids[name],
+                quantity=quantity,
+            )
+            for recipe_id, items in parsed.items()
+            for name, quantity in items.items()
+        ]
+    )
+    for recipe in recipes:
+        recipe.ingredients_count = len(parsed[recipe.pk])
+    Recipe.objects.bulk_update(recipes, ["ingredients_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_ingredients_trgm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.CharField(blank=True, max_length=255)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='recipe',
+            name='recipe_ingredients_trgm',
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='ingredient_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='ingredient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredients', to='recipes.ingredient'),
+        ),
+        migrations.AddField(
+            model_name='recipeingredient',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredients', to='recipes.recipe'),
+        ),
+        migrations.AddIndex(
+            model_name='recipeingredient',
+            index=models.Index(fields=['ingredient', 'recipe'], name='recipe_ingredient_lookup'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recipeingredient',
+            unique_together={('recipe', 'ingredient')},
+        ),
+        migrations.RunPython(fill_recipe_ingredients, migrations.RunPython.noop),
+    ]
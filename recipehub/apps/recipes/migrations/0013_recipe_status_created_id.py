@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_ingredient_recipeingredient'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['moderation_status', '-created_at', '-id'], name='recipe_status_created_id'),
+        ),
+    ]
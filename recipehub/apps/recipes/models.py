@@ -1,9 +1,18 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 
-from recipehub.apps.recipes.utils import recipe_photo_upload_to, generate_unique_slug
+from recipehub.apps.recipes.utils import (
+    recipe_photo_upload_to,
+    save_with_unique_slug,
+    sync_recipe_ingredients,
+    photo_variant_names,
+    rating_histogram_field,
+    RATING_STARS,
+)
 
 User = get_user_model()
 
@@ -13,15 +22,20 @@ APPROVED_CHOICES = [
     ("in_process", "In Process"),
 ]
 
+SEARCH_CONFIG = "english"
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(max_length=100, unique=True, blank=True, null=True)
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = generate_unique_slug(self, self.name)
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(
+                self, self.name, lambda: super(Category, self).save(*args, **kwargs)
+            )
 
     def __str__(self):
         return self.name
@@ -36,6 +50,8 @@ class Recipe(models.Model):
     slug = models.SlugField(max_length=255, unique=True, blank=True)
     announcement_text = models.TextField(blank=True)
     photo = models.ImageField(upload_to=recipe_photo_upload_to, blank=True, null=True)
+    # Resized copies of the photo by format and width, filled by a Celery task
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
     ingredients = models.TextField(
         help_text="Enter each ingredient on a new line and in the following order: ingredient name - quantity",
     )
@@ -61,9 +77,41 @@ class Recipe(models.Model):
         validators=[MinValueValidator(0)],
         help_text="Calories per serving",
     )
+    view_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of unique views",
+    )
+    # Rating aggregates maintained by the Review signals
+    rating_sum = models.FloatField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+    ingredients_count = models.PositiveIntegerField(default=0, editable=False)
+    # Weighted full-text document kept current by PostgreSQL on every write
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("ingredients", weight="B", config=SEARCH_CONFIG)
+            + SearchVector("recipe_text", weight="C", config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="recipe_search_vector_gin"),
+            # Keyset pagination over approved recipes
+            models.Index(
+                fields=["moderation_status", "-created_at", "-id"],
+                name="recipe_status_created_id",
+            ),
+        ]
 
     def __str__(self):
         return f'"{self.name}" from {self.user.username}'
@@ -71,7 +119,134 @@ class Recipe(models.Model):
     def get_absolute_url(self):
         return reverse("recipes:recipe-detail", kwargs={"slug": self.slug})
 
+    @property
+    def average_rating(self) -> float | None:
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @property
+    def rating_histogram(self) -> dict[int, int]:
+        return {
+            star: getattr(self, rating_histogram_field(star)) for star in RATING_STARS
+        }
+
+    @property
+    def photo_variant_urls(self) -> dict[str, dict[str, str]]:
+        return {
+            ext: {
+                width: self.photo.storage.url(name) for width, name in variants.items()
+            }
+            for ext, variants in self.photo_variants.items()
+        }
+
+    @property
+    def photo_srcsets(self) -> dict[str, str]:
+        return {
+            ext: ", ".join(f"{url} {width}w" for width, url in urls.items())
+            for ext, urls in self.photo_variant_urls.items()
+        }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded text to skip re-parsing unchanged ingredients
+        instance._loaded_ingredients = instance.__dict__.get("ingredients")
+        instance._loaded_photo = instance.__dict__.get("photo")
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = generate_unique_slug(self, self.name)
-        super().save(*args, **kwargs)
+        from recipehub.apps.recipes.tasks import (
+            delete_recipe_photo_files,
+            generate_recipe_photo_variants,
+        )
+
+        # Deferred fields weren't loaded, so they can't have changed, and
+        # reading them would cost a query each
+        deferred = self.get_deferred_fields()
+        update_fields = kwargs.get("update_fields")
+
+        def saves(field: str) -> bool:
+            if update_fields is not None:
+                return field in update_fields
+            return field not in deferred
+
+        ingredients_changed = saves("ingredients") and self.ingredients != getattr(
+            self, "_loaded_ingredients", None
+        )
+        photo_changed = saves("photo") and self.photo.name != getattr(
+            self, "_loaded_photo", None
+        )
+        stale_variants = []
+        if photo_changed:
+            stale_variants = photo_variant_names(self.photo_variants)
+            self.photo_variants = {}
+
+        def write():
+            with transaction.atomic():
+                super(Recipe, self).save(*args, **kwargs)
+                if ingredients_changed:
+                    sync_recipe_ingredients([self])
+                if photo_changed and self.photo:
+                    generate_recipe_photo_variants.delay_on_commit(self.pk)
+                if stale_variants:
+                    delete_recipe_photo_files.delay_on_commit(stale_variants)
+
+        if self.slug:
+            write()
+        else:
+            save_with_unique_slug(self, self.name, write)
+        if ingredients_changed:
+            self._loaded_ingredients = self.ingredients
+        if photo_changed:
+            self._loaded_photo = self.photo.name
+
+
+class Ingredient(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        ordering = ["name"]
+        indexes = [
+            GinIndex(
+                fields=["name"], name="ingredient_name_trgm", opclasses=["gin_trgm_ops"]
+            )
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class RecipeIngredient(models.Model):
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name="recipe_ingredients"
+    )
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, related_name="recipe_ingredients"
+    )
+    quantity = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        unique_together = ("recipe", "ingredient")
+        # Serves the "what can I cook" GROUP BY without touching the heap
+        indexes = [
+            models.Index(
+                fields=["ingredient", "recipe"], name="recipe_ingredient_lookup"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.ingredient.name} - {self.quantity}"
+
+
+class RecipeViewFlush(models.Model):
+    """
+    Redis view batches already added to Recipe.view_count, written in the
+    same transaction so a replayed batch is skipped
+    """
+
+    batch_id = models.CharField(max_length=32, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.batch_id
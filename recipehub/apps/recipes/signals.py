@@ -0,0 +1,39 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.recommendations import mark_user_for_recommendations
+from recipehub.apps.recipes.tasks import delete_recipe_photo_files
+from recipehub.apps.recipes.trending import TRENDING_REVIEW_WEIGHT, bump_trending
+from recipehub.apps.recipes.utils import photo_variant_names
+from recipehub.apps.reviews.models import Review
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def queue_recommendations_refresh(sender, instance: Any, **kwargs: Any) -> None:
+    # Picked up by the refresh_recommendations task. Favorites mark the
+    # user in add_user_favorite and remove_user_favorite instead, a delete
+    # receiver would cost the favorite views their fast delete.
+    transaction.on_commit(lambda: mark_user_for_recommendations(instance.user_id))
+
+
+@receiver(post_save, sender=Review)
+def bump_trending_on_review(
+    sender, instance: Any, created: bool, **kwargs: Any
+) -> None:
+    # Changing the rating later is not new engagement
+    if created:
+        transaction.on_commit(
+            lambda: bump_trending({instance.recipe_id: TRENDING_REVIEW_WEIGHT})
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_photo_variants(sender, instance: Any, **kwargs: Any) -> None:
+    names = photo_variant_names(instance.photo_variants)
+    if names:
+        delete_recipe_photo_files.delay_on_commit(names)
@@ -0,0 +1,163 @@
+import random
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Iterable
+
+from django.apps import apps
+
+from recipehub.redis import batch_r, get_async_redis, pipeline, r
+
+# 32 bands of 4 rows: pairs above ~0.5 Jaccard share a bucket with high
+# probability, pairs below ~0.2 rarely do
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+SIMILAR_RECIPES_LIMIT = 6
+# Recipes sharing a bucket with many others (e.g. "salt" alone) only
+# compare against this many candidates
+SIMILAR_CANDIDATES_LIMIT = 200
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def similar_recipes_key(recipe_id: int) -> str:
+    return f"recipe:{recipe_id}:similar"
+
+
+def ingredient_hashes(ingredient_id: int) -> tuple[int, ...]:
+    return tuple((a * ingredient_id + b) % _MERSENNE_PRIME for a, b in _PERMUTATIONS)
+
+
+def minhash_signature(
+    ingredient_ids: Iterable[int], hashes: dict[int, tuple[int, ...]] | None = None
+) -> tuple[int, ...]:
+    """
+    Smallest value of each hash permutation over the ingredient IDs.
+    Pass a dict to reuse the hashes of ingredients across recipes.
+    """
+    if hashes is None:
+        hashes = {}
+    columns = []
+    for ingredient_id in ingredient_ids:
+        if ingredient_id not in hashes:
+            hashes[ingredient_id] = ingredient_hashes(ingredient_id)
+        columns.append(hashes[ingredient_id])
+    return tuple(map(min, zip(*columns)))
+
+
+def lsh_buckets(signatures: dict[int, tuple[int, ...]]) -> list[list[int]]:
+    """
+    Groups recipes whose signatures are equal in at least one band
+    """
+    buckets = defaultdict(list)
+    for recipe_id, signature in signatures.items():
+        for band in range(LSH_BANDS):
+            rows = signature[band * LSH_ROWS : (band + 1) * LSH_ROWS]
+            buckets[(band, rows)].append(recipe_id)
+    return [members for members in buckets.values() if len(members) > 1]
+
+
+def approved_ingredient_sets() -> dict[int, frozenset[int]]:
+    """
+    Ingredient IDs of every approved recipe. The ingredient lines are
+    already normalized into RecipeIngredient rows, quantities are left
+    out so "2 eggs" and "3 eggs" still match.
+    """
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+    rows = (
+        RecipeIngredient.objects.filter(recipe__moderation_status="approved")
+        .order_by("recipe_id")
+        .values_list("recipe_id", "ingredient_id")
+        .iterator(chunk_size=5000)
+    )
+    return {
+        recipe_id: frozenset(ingredient_id for _, ingredient_id in group)
+        for recipe_id, group in groupby(rows, key=itemgetter(0))
+    }
+
+
+def find_similar_recipes(
+    ingredient_sets: dict[int, frozenset[int]],
+    limit: int = SIMILAR_RECIPES_LIMIT,
+) -> dict[int, list[int]]:
+    """
+    Top similar recipes per recipe. LSH picks the candidates, the exact
+    Jaccard similarity of the ingredient sets ranks them.
+    """
+    hashes = {}
+    signatures = {
+        recipe_id: minhash_signature(ingredients, hashes)
+        for recipe_id, ingredients in ingredient_sets.items()
+    }
+    candidates = defaultdict(set)
+    for members in lsh_buckets(signatures):
+        for recipe_id in members:
+            found = candidates[recipe_id]
+            for other_id in members:
+                if len(found) >= SIMILAR_CANDIDATES_LIMIT:
+                    break
+                if other_id != recipe_id:
+                    found.add(other_id)
+
+    similar = {}
+    for recipe_id, found in candidates.items():
+        ingredients = ingredient_sets[recipe_id]
+        scored = sorted(
+            (
+                -len(ingredients & ingredient_sets[other_id])
+                / len(ingredients | ingredient_sets[other_id]),
+                other_id,
+            )
+            for other_id in found
+        )
+        similar[recipe_id] = [other_id for _, other_id in scored[:limit]]
+    return similar
+
+
+def store_similar_recipes(
+    similar: dict[int, list[int]], recipe_ids: Iterable[int]
+) -> None:
+    """
+    Replaces the stored lists of the given recipes, recipes without
+    similar ones lose their list. Each chunk is swapped in one MULTI.
+    """
+    pipe = pipeline(batch_r, transaction=True)
+    for recipe_id in recipe_ids:
+        key = similar_recipes_key(recipe_id)
+        pipe.delete(key)
+        if similar.get(recipe_id):
+            pipe.rpush(key, *similar[recipe_id])
+        if len(pipe) >= 1000:
+            pipe.execute()
+    pipe.execute()
+
+
+def get_similar_recipe_ids(recipe_id: int) -> list[int]:
+    return [int(i) for i in r.lrange(similar_recipes_key(recipe_id), 0, -1)]
+
+
+async def aget_similar_recipe_ids(recipe_id: int) -> list[int]:
+    ids = await get_async_redis().lrange(similar_recipes_key(recipe_id), 0, -1)
+    return [int(i) for i in ids]
+
+
+def similar_recipes_queryset(recipe_ids: list[int]) -> Any:
+    """
+    Approved recipes among the IDs. Order them by recipe_ids,
+    see order_like.
+    """
+    Recipe = apps.get_model("recipes", "Recipe")
+    return Recipe.objects.select_related("user").filter(
+        pk__in=recipe_ids, moderation_status="approved"
+    )
+
+
+def order_like(recipes: Iterable[Any], recipe_ids: list[int]) -> list[Any]:
+    by_id = {recipe.pk: recipe for recipe in recipes}
+    return [by_id[recipe_id] for recipe_id in recipe_ids if recipe_id in by_id]
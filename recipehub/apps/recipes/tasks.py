@@ -0,0 +1,182 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from celery import shared_task
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, When
+from django.utils import timezone
+from redis.exceptions import ResponseError
+
+from recipehub.apps.recipes.models import Recipe, RecipeViewFlush
+from recipehub.apps.recipes.recommendations import (
+    RECOMMENDATIONS_DIRTY_KEY,
+    item_similarities,
+    load_interactions,
+    load_neighbors,
+    store_neighbors,
+    store_recommendations,
+)
+from recipehub.apps.recipes.similarity import (
+    approved_ingredient_sets,
+    find_similar_recipes,
+    store_similar_recipes,
+)
+from recipehub.apps.recipes.utils import (
+    RECIPE_VIEWS_PENDING_KEY,
+    generate_photo_variants,
+    photo_variant_names,
+)
+from recipehub.apps.recipes.trending import TRENDING_VIEW_WEIGHT, bump_trending
+from recipehub.redis import r, redis_lock
+
+logger = logging.getLogger(__name__)
+
+RECIPE_VIEWS_FLUSHING_KEY = "recipe:views:flushing"
+RECIPE_VIEWS_FLUSH_LOCK_KEY = "recipe:views:flush:lock"
+# Outlives any run, so a killed worker only blocks flushing this long
+RECIPE_VIEWS_FLUSH_LOCK_TTL = 60 * 10
+# Field of the flushing hash naming the batch, recipe IDs are numeric
+RECIPE_VIEWS_BATCH_FIELD = "batch"
+# Applied batch IDs are only needed until their hash is deleted
+RECIPE_VIEWS_FLUSH_RETENTION = timedelta(days=1)
+
+
+@shared_task
+def flush_recipe_views() -> int:
+    """
+    Moves accumulated view deltas from Redis into Recipe.view_count
+    with a single bulk UPDATE. Returns the number of updated recipes.
+    One run at a time, and each batch is applied once: its ID is stored
+    in the same transaction, so a run dying before the hash is deleted
+    doesn't count the views again.
+    """
+    with redis_lock(
+        RECIPE_VIEWS_FLUSH_LOCK_KEY, RECIPE_VIEWS_FLUSH_LOCK_TTL, client=r
+    ) as token:
+        return _flush_recipe_views() if token else 0
+
+
+def _flush_recipe_views() -> int:
+    # A leftover flushing hash means the previous run failed before
+    # deleting it, so finish it instead of taking a new batch
+    if not r.exists(RECIPE_VIEWS_FLUSHING_KEY):
+        try:
+            r.rename(RECIPE_VIEWS_PENDING_KEY, RECIPE_VIEWS_FLUSHING_KEY)
+        except ResponseError:
+            # Nothing has been viewed since the last flush
+            return 0
+    r.hsetnx(RECIPE_VIEWS_FLUSHING_KEY, RECIPE_VIEWS_BATCH_FIELD, uuid.uuid4().hex)
+
+    deltas = r.hgetall(RECIPE_VIEWS_FLUSHING_KEY)
+    batch_id = deltas.pop(RECIPE_VIEWS_BATCH_FIELD.encode()).decode()
+    deltas = {int(recipe_id): int(delta) for recipe_id, delta in deltas.items()}
+
+    with transaction.atomic():
+        _, applied = RecipeViewFlush.objects.get_or_create(batch_id=batch_id)
+        if applied and deltas:
+            Recipe.objects.filter(pk__in=deltas).update(
+                view_count=Case(
+                    *[
+                        When(pk=recipe_id, then=F("view_count") + delta)
+                        for recipe_id, delta in deltas.items()
+                    ],
+                    default=F("view_count"),
+                    output_field=PositiveIntegerField(),
+                )
+            )
+        RecipeViewFlush.objects.filter(
+            created_at__lt=timezone.now() - RECIPE_VIEWS_FLUSH_RETENTION
+        ).delete()
+
+    if applied:
+        bump_trending(
+            {
+                recipe_id: delta * TRENDING_VIEW_WEIGHT
+                for recipe_id, delta in deltas.items()
+            }
+        )
+    r.delete(RECIPE_VIEWS_FLUSHING_KEY)
+    if not applied:
+        logger.info(f"Skipped view batch {batch_id}, already applied")
+        return 0
+    logger.info(f"Flushed views for {len(deltas)} recipes")
+    return len(deltas)
+
+
+@shared_task
+def generate_recipe_photo_variants(recipe_id: int) -> None:
+    """
+    Builds the resized variants of a recipe photo and stores their paths.
+    Skipped when the photo was removed or replaced in the meantime.
+    """
+    recipe = Recipe.objects.filter(pk=recipe_id).only("photo", "photo_variants").first()
+    if recipe is None or not recipe.photo:
+        return
+
+    variants = generate_photo_variants(recipe.photo)
+    updated = Recipe.objects.filter(pk=recipe_id, photo=recipe.photo.name).update(
+        photo_variants=variants
+    )
+    new_names = photo_variant_names(variants)
+    if updated:
+        # Files of an earlier run for the same photo
+        stale = set(photo_variant_names(recipe.photo_variants)) - set(new_names)
+    else:
+        stale = new_names
+    delete_recipe_photo_files(sorted(stale))
+
+
+@shared_task
+def delete_recipe_photo_files(names: list[str]) -> None:
+    """
+    Removes photo variants no recipe points to anymore
+    """
+    storage = Recipe._meta.get_field("photo").storage
+    for name in names:
+        storage.delete(name)
+
+
+@shared_task
+def rebuild_similar_recipes() -> int:
+    """
+    Recomputes the similar recipes of every approved recipe from shared
+    ingredients and stores them in Redis. Returns the number of recipes
+    with similar ones.
+    """
+    similar = find_similar_recipes(approved_ingredient_sets())
+    store_similar_recipes(similar, Recipe.objects.values_list("pk", flat=True))
+    logger.info(f"Stored similar recipes for {len(similar)} recipes")
+    return len(similar)
+
+
+@shared_task
+def rebuild_recommendations() -> int:
+    """
+    Recomputes the item-item similarities from all favorites and reviews,
+    then every interacting user's recommendations. Returns the number of
+    users with recommendations.
+    """
+    matrix = load_interactions()
+    neighbors = item_similarities(matrix)
+    store_neighbors(neighbors)
+    stored = store_recommendations(matrix, neighbors, matrix.keys())
+    logger.info(
+        f"Stored neighbors for {len(neighbors)} recipes and "
+        f"recommendations for {stored} users"
+    )
+    return stored
+
+
+@shared_task
+def refresh_recommendations(batch_size: int = 500) -> int:
+    """
+    Rescores the users whose favorites or reviews changed against the
+    stored neighbors. The neighbors themselves move with the next rebuild.
+    """
+    user_ids = [int(i) for i in r.spop(RECOMMENDATIONS_DIRTY_KEY, batch_size)]
+    if not user_ids:
+        return 0
+    matrix = load_interactions(user_ids)
+    neighbors = load_neighbors({i for row in matrix.values() for i in row})
+    return store_recommendations(matrix, neighbors, user_ids)
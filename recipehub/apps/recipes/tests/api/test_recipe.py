@@ -1,13 +1,22 @@
+import json
+from unittest.mock import patch
+
 import pytest
 from rest_framework import status
 
+from recipehub.apps.recipes.api.views import RecipeViewSet
 from recipehub.apps.recipes.api.serializers import (
     RecipeModerationSerializer,
     RecipeSerializer,
 )
 from recipehub.apps.recipes.models import Recipe
 from recipehub.apps.users.models import UserRecipeFavorite
-from recipehub.factories import RecipeFactory, CategoryFactory
+from recipehub.factories import (
+    CategoryFactory,
+    RecipeFactory,
+    ReviewFactory,
+    UserRecipeFavoriteFactory,
+)
 
 ENDPOINT = "/api/recipes/"
 
@@ -27,6 +36,44 @@ class TestPaginationRecipeList:
         assert len(response.data["results"]) <= self.PAGE_SIZE
 
 
+@pytest.mark.django_db
+class TestCursorPaginationRecipeList:
+    PAGE_SIZE = 10
+
+    def test_cursor_pagination_pages(self, authenticated_client):
+        RecipeFactory.create_batch(15, moderation_status="approved")
+        response = authenticated_client.get(f"{ENDPOINT}?pagination=cursor")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert len(response.data["results"]) == self.PAGE_SIZE
+        assert response.data["previous"] is None
+
+        next_response = authenticated_client.get(response.data["next"])
+        assert len(next_response.data["results"]) == 5
+        assert next_response.data["next"] is None
+
+        slugs = [r["slug"] for r in response.data["results"]]
+        slugs += [r["slug"] for r in next_response.data["results"]]
+        assert len(set(slugs)) == 15
+
+    def test_cursor_pagination_with_filters(self, authenticated_client):
+        category = CategoryFactory(name="Dessert")
+        RecipeFactory.create_batch(
+            3, category=category, cooking_time=10, moderation_status="approved"
+        )
+        RecipeFactory.create_batch(3, cooking_time=10, moderation_status="approved")
+
+        response = authenticated_client.get(
+            f"{ENDPOINT}?pagination=cursor&category__name=Dessert&ordering=-name"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        names = [r["name"] for r in response.data["results"]]
+        assert len(names) == 3
+        assert names == sorted(names, reverse=True)
+
+
 @pytest.mark.django_db
 class TestSearchRecipeList:
     def test_search_recipes(self, authenticated_client):
@@ -327,7 +374,7 @@ class TestRecipeCustomActions:
         response = authenticated_client.get(f"{ENDPOINT}my-recipes/")
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 3
+        assert response.data["count"] == 3
         assert Recipe.objects.filter(user=user).count() == 3
 
     def test_my_recipes_empty(self, authenticated_client):
@@ -335,7 +382,7 @@ class TestRecipeCustomActions:
         response = authenticated_client.get(f"{ENDPOINT}my-recipes/")
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert response.data["count"] == 0
 
     # Best Recipes action tests
     def test_best_recipes_permissions(self, api_client):
@@ -366,9 +413,10 @@ class TestRecipeCustomActions:
         response = admin_client.get(f"{ENDPOINT}in-process/")
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert response.data["count"] == 2
         assert all(
-            recipe["moderation_status"] == "in_process" for recipe in response.data
+            recipe["moderation_status"] == "in_process"
+            for recipe in response.data["results"]
         )
 
     # Moderation: moderate action
@@ -483,8 +531,8 @@ class TestRecipeCustomActions:
         )
 
         assert response.status_code == status.HTTP_200_OK
-        assert "recipes" in response.data
-        assert len(response.data["recipes"]) == 2
+        assert "results" in response.data
+        assert len(response.data["results"]) == 2
 
     def test_recipe_builder_no_ingredients(self, authenticated_client):
         """Recipe builder with no ingredients returns empty or all recipes"""
@@ -493,8 +541,8 @@ class TestRecipeCustomActions:
         response = authenticated_client.get(f"{ENDPOINT}builder/")
 
         assert response.status_code == status.HTTP_200_OK
-        assert "recipes" in response.data
-        assert len(response.data["recipes"]) == 3
+        assert "results" in response.data
+        assert len(response.data["results"]) == 3
 
     def test_recipe_builder_no_matches(self, authenticated_client):
         """Recipe builder returns empty when no recipes match"""
@@ -505,8 +553,8 @@ class TestRecipeCustomActions:
         )
 
         assert response.status_code == status.HTTP_200_OK
-        assert "recipes" in response.data
-        assert len(response.data["recipes"]) == 0
+        assert "results" in response.data
+        assert len(response.data["results"]) == 0
 
     def test_recipe_builder_only_approved_recipes(self, authenticated_client):
         """Recipe builder returns only approved recipes"""
@@ -517,8 +565,145 @@ class TestRecipeCustomActions:
         response = authenticated_client.get(f"{ENDPOINT}builder/?ingredients=tomato")
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data["recipes"]) == 1
-        assert response.data["recipes"][0]["moderation_status"] == "approved"
+        assert len(response.data["results"]) == 1
+        assert response.data["results"][0]["moderation_status"] == "approved"
+
+
+@pytest.mark.django_db
+class TestStreamingRecipeActions:
+    """Tests for pagination and NDJSON streaming of the list actions"""
+
+    PAGE_SIZE = 10
+
+    def test_my_recipes_paginated(self, authenticated_client, users_list):
+        user = users_list["first_simple_user"]
+        RecipeFactory.create_batch(12, user=user, moderation_status="approved")
+
+        response = authenticated_client.get(f"{ENDPOINT}my-recipes/")
+
+        assert response.data["count"] == 12
+        assert len(response.data["results"]) == self.PAGE_SIZE
+        assert response.data["next"] is not None
+
+    def test_my_recipes_ndjson(
+        self, authenticated_client, users_list, django_assert_max_num_queries
+    ):
+        """Streams every recipe, one JSON object per line, in batches"""
+        user = users_list["first_simple_user"]
+        recipes = RecipeFactory.create_batch(5, user=user, moderation_status="approved")
+
+        with patch.object(RecipeViewSet, "stream_chunk_size", 2):
+            response = authenticated_client.get(f"{ENDPOINT}my-recipes/?format=ndjson")
+            with django_assert_max_num_queries(3):
+                lines = b"".join(response.streaming_content).decode().splitlines()
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert [json.loads(line)["slug"] for line in lines] == [
+            recipe.slug for recipe in recipes
+        ]
+
+    def test_in_process_ndjson_accept_header(self, admin_client):
+        RecipeFactory.create_batch(3, moderation_status="in_process")
+
+        response = admin_client.get(
+            f"{ENDPOINT}in-process/", HTTP_ACCEPT="application/x-ndjson"
+        )
+
+        assert response.streaming
+        assert len(b"".join(response.streaming_content).splitlines()) == 3
+
+    def test_builder_keeps_match_order_with_cursor_param(self, authenticated_client):
+        """Builder results are ordered by matches, not by created_at"""
+        best = RecipeFactory(ingredients="tomato, cheese", moderation_status="approved")
+        RecipeFactory(ingredients="tomato", moderation_status="approved")
+
+        response = authenticated_client.get(
+            f"{ENDPOINT}builder/?ingredients=tomato,cheese&pagination=cursor"
+        )
+
+        assert response.data["count"] == 2
+        assert response.data["results"][0]["slug"] == best.slug
+
+    def test_ndjson_error_is_single_line(self, api_client):
+        response = api_client.get(f"{ENDPOINT}my-recipes/?format=ndjson")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert "detail" in json.loads(response.content)
+
+
+@pytest.mark.django_db
+class TestRecipeUserState:
+    """Tests for ?include=user_state on the recipe lists"""
+
+    USER_STATE_FIELDS = {"is_favorited", "my_rating", "average_rating", "review_count"}
+
+    def test_fields_are_opt_in(self, authenticated_client):
+        RecipeFactory.create(moderation_status="approved")
+
+        response = authenticated_client.get(ENDPOINT)
+
+        assert not self.USER_STATE_FIELDS & response.data["results"][0].keys()
+
+    def test_list_includes_user_state(self, authenticated_client, users_list):
+        user = users_list["first_simple_user"]
+        rated, other = RecipeFactory.create_batch(2, moderation_status="approved")
+        ReviewFactory.create(recipe=rated, user=user, rating=5)
+        ReviewFactory.create(
+            recipe=rated, user=users_list["second_simple_user"], rating=2
+        )
+        UserRecipeFavoriteFactory.create(user=user, recipe=rated)
+
+        response = authenticated_client.get(f"{ENDPOINT}?include=user_state")
+
+        results = {item["slug"]: item for item in response.data["results"]}
+        assert results[rated.slug]["is_favorited"] is True
+        assert results[rated.slug]["my_rating"] == 5
+        assert results[rated.slug]["average_rating"] == 3.5
+        assert results[rated.slug]["review_count"] == 2
+        assert results[other.slug]["is_favorited"] is False
+        assert results[other.slug]["my_rating"] is None
+        assert results[other.slug]["average_rating"] is None
+        assert results[other.slug]["review_count"] == 0
+
+    def test_anonymous_list_includes_user_state(self, api_client):
+        RecipeFactory.create(moderation_status="approved")
+
+        response = api_client.get(f"{ENDPOINT}?include=user_state")
+
+        assert response.data["results"][0]["is_favorited"] is False
+        assert response.data["results"][0]["my_rating"] is None
+
+    def test_user_state_in_the_page_query(
+        self, authenticated_client, users_list, django_assert_num_queries
+    ):
+        """Favorite and rating lookups do not add a query per recipe"""
+        user = users_list["first_simple_user"]
+        for recipe in RecipeFactory.create_batch(5, moderation_status="approved"):
+            ReviewFactory.create(recipe=recipe, user=user)
+            UserRecipeFavoriteFactory.create(user=user, recipe=recipe)
+
+        with django_assert_num_queries(2):
+            authenticated_client.get(f"{ENDPOINT}?include=user_state")
+
+    def test_my_recipes_and_builder_include_user_state(
+        self, authenticated_client, users_list
+    ):
+        user = users_list["first_simple_user"]
+        RecipeFactory.create(
+            user=user, ingredients="tomato - 1 pc", moderation_status="approved"
+        )
+
+        for url in [
+            f"{ENDPOINT}my-recipes/?include=user_state",
+            f"{ENDPOINT}builder/?ingredients=tomato&include=user_state",
+            f"{ENDPOINT}my-recipes/?include=user_state&format=ndjson",
+        ]:
+            response = authenticated_client.get(url)
+            if response.streaming:
+                item = json.loads(b"".join(response.streaming_content))
+            else:
+                item = response.data["results"][0]
+            assert self.USER_STATE_FIELDS <= item.keys()
 
 
 @pytest.mark.django_db
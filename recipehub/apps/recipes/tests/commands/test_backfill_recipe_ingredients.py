@@ -0,0 +1,29 @@
+import pytest
+from django.core.management import call_command
+
+from recipehub.apps.recipes.models import Recipe, RecipeIngredient
+from recipehub.factories import RecipeFactory
+
+
+@pytest.mark.django_db
+class TestBackfillRecipeIngredients:
+    """Tests for the backfill_recipe_ingredients management command"""
+
+    def test_backfill_parses_existing_recipes(self):
+        recipe = RecipeFactory.create()
+        # Rows written before the structured table existed
+        Recipe.objects.filter(pk=recipe.pk).update(
+            ingredients="tomato - 2ks\ncheese - 100g"
+        )
+
+        call_command("backfill_recipe_ingredients", batch_size=1)
+
+        recipe.refresh_from_db()
+        rows = RecipeIngredient.objects.filter(recipe=recipe).order_by(
+            "ingredient__name"
+        )
+        assert recipe.ingredients_count == 2
+        assert [(r.ingredient.name, r.quantity) for r in rows] == [
+            ("cheese", "100g"),
+            ("tomato", "2ks"),
+        ]
@@ -0,0 +1,79 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from recipehub.apps.recipes.management.commands.benchmark import (
+    SCENARIOS,
+    percentile,
+)
+from recipehub.factories import RecipeFactory
+
+
+@pytest.fixture
+def benchmark_redis(fake_redis):
+    with (
+        patch("recipehub.apps.recipes.utils.r", fake_redis),
+        patch("recipehub.apps.reviews.views.r", fake_redis),
+    ):
+        yield fake_redis
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+    """Tests for the benchmark management command"""
+
+    def test_writes_results_for_every_scenario(
+        self, tmp_path, users_list, benchmark_redis
+    ):
+        RecipeFactory.create(name="Tomato soup", moderation_status="approved")
+        output = tmp_path / "results.json"
+
+        call_command(
+            "benchmark",
+            requests=3,
+            concurrency=1,
+            warmup=1,
+            user=users_list["first_simple_user"].username,
+            output=str(output),
+            stdout=StringIO(),
+        )
+
+        results = json.loads(output.read_text())
+        assert list(results["scenarios"]) == SCENARIOS
+        for stats in results["scenarios"].values():
+            assert stats["requests"] == 3
+            assert stats["errors"] == 0
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+    def test_compare_fails_on_regression(self, tmp_path, users_list, benchmark_redis):
+        RecipeFactory.create(moderation_status="approved")
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(
+            json.dumps({"scenarios": {"api-recipes": {"p95_ms": 0.0001}}})
+        )
+
+        with pytest.raises(CommandError, match="api-recipes: p95"):
+            call_command(
+                "benchmark",
+                requests=2,
+                concurrency=1,
+                warmup=0,
+                scenarios=["api-recipes"],
+                compare=str(baseline),
+                stdout=StringIO(),
+            )
+
+    def test_requires_recipes(self, users_list):
+        with pytest.raises(CommandError, match="No approved recipes"):
+            call_command("benchmark", stdout=StringIO())
+
+    def test_percentile_nearest_rank(self):
+        values = [float(i) for i in range(1, 101)]
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile([7.0], 99) == 7.0
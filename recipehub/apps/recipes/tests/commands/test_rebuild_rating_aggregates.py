@@ -0,0 +1,31 @@
+import pytest
+from django.core.management import call_command
+
+from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.reviews.models import Review
+from recipehub.factories import RecipeFactory, ReviewFactory
+
+
+@pytest.mark.django_db
+class TestRebuildRatingAggregates:
+    """Tests for the rebuild_rating_aggregates management command"""
+
+    def test_rebuild_fixes_drifted_aggregates(self):
+        recipe = RecipeFactory.create()
+        empty_recipe = RecipeFactory.create()
+        ReviewFactory.create(recipe=recipe, rating=5)
+        ReviewFactory.create(recipe=recipe, rating=2)
+
+        # Queryset updates bypass the signals and leave the aggregates stale
+        Review.objects.filter(recipe=recipe).update(rating=1)
+        Recipe.objects.filter(pk=empty_recipe.pk).update(rating_sum=7, rating_count=3)
+
+        call_command("rebuild_rating_aggregates", batch_size=1)
+
+        recipe.refresh_from_db()
+        empty_recipe.refresh_from_db()
+        assert recipe.rating_sum == 2
+        assert recipe.rating_count == 2
+        assert recipe.rating_histogram == {1: 2, 2: 0, 3: 0, 4: 0, 5: 0}
+        assert empty_recipe.rating_count == 0
+        assert empty_recipe.average_rating is None
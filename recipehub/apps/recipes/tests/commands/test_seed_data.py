@@ -0,0 +1,123 @@
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from allauth.account.models import EmailAddress
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.urls import reverse
+
+from recipehub.apps.recipes.management.commands.seed_data import allocate
+from recipehub.apps.recipes.models import Recipe, RecipeIngredient
+from recipehub.apps.reviews.models import Comment, Review
+from recipehub.apps.users.models import User, UserRecipeFavorite
+from recipehub.factories import RecipeFactory
+
+SEED_OPTIONS = {
+    "users": 20,
+    "categories": 3,
+    "recipes": 40,
+    "reviews": 150,
+    "comments": 30,
+    "favorites": 60,
+    "views": 500,
+    "approved_ratio": 0.75,
+    "batch_size": 15,
+    "seed": 1,
+    "stdout": StringIO(),
+}
+
+
+@pytest.fixture
+def seed_redis(fake_redis):
+    with patch(
+        "recipehub.apps.recipes.management.commands.seed_data.batch_r", fake_redis
+    ):
+        yield fake_redis
+
+
+@pytest.mark.django_db
+class TestSeedData:
+    """Tests for the seed_data management command"""
+
+    def test_seeds_requested_volumes(self, seed_redis):
+        call_command("seed_data", **SEED_OPTIONS)
+
+        assert User.objects.filter(username__startswith="seed-user-").count() == 20
+        assert Recipe.objects.count() == 40
+        assert Review.objects.count() == 150
+        assert Comment.objects.count() == 30
+        assert UserRecipeFavorite.objects.count() == 60
+        assert not Review.objects.filter(user=F("recipe__user")).exists()
+
+    def test_state_matches_what_the_app_maintains(self, seed_redis):
+        call_command("seed_data", **SEED_OPTIONS)
+
+        for recipe in Recipe.objects.all():
+            ratings = list(recipe.reviews.values_list("rating", flat=True))
+            assert recipe.rating_sum == sum(ratings)
+            assert recipe.rating_count == len(ratings)
+            assert sum(recipe.rating_histogram.values()) == len(ratings)
+            assert recipe.ingredients_count == (
+                RecipeIngredient.objects.filter(recipe=recipe).count()
+            )
+            assert recipe.ingredients_count >= 3
+
+            if recipe.rating_count:
+                assert seed_redis.zscore("recipe:ratings", recipe.pk) == (
+                    pytest.approx(recipe.average_rating)
+                )
+            if recipe.view_count:
+                assert int(seed_redis.get(f"recipe:{recipe.pk}:views")) == (
+                    recipe.view_count
+                )
+            if recipe.moderation_status != "approved":
+                assert recipe.view_count == 0
+                assert recipe.rating_count == 0
+
+        assert sum(Recipe.objects.values_list("view_count", flat=True)) == 500
+
+    def test_seeded_users_can_log_in(self, client, seed_redis):
+        call_command("seed_data", **SEED_OPTIONS)
+
+        assert EmailAddress.objects.filter(verified=True, primary=True).count() == 20
+        response = client.post(
+            reverse("account_login"),
+            {"login": "seed-user-0", "password": "seed-password"},
+        )
+        assert response.status_code == 302
+        assert client.session.get("_auth_user_id")
+
+    def test_slugs_continue_after_existing_ones(self, seed_redis):
+        RecipeFactory.create(name="Spicy Tomato Soup", slug="spicy-tomato-soup-7")
+
+        with patch.multiple(
+            "recipehub.apps.recipes.management.commands.seed_data",
+            ADJECTIVES=["Spicy"],
+            MAINS=["Tomato"],
+            DISHES=["Soup"],
+        ):
+            call_command("seed_data", **{**SEED_OPTIONS, "recipes": 3})
+
+        slugs = set(
+            Recipe.objects.exclude(slug="spicy-tomato-soup-7").values_list(
+                "slug", flat=True
+            )
+        )
+        assert slugs == {
+            "spicy-tomato-soup-8",
+            "spicy-tomato-soup-9",
+            "spicy-tomato-soup-10",
+        }
+
+    def test_rejects_invalid_ratio(self, seed_redis):
+        with pytest.raises(CommandError):
+            call_command("seed_data", **{**SEED_OPTIONS, "approved_ratio": 2})
+
+    def test_allocate_is_skewed_and_capped(self):
+        counts = allocate(100, [1, 0.5, 0.25], cap=50)
+
+        assert sum(counts) == 100
+        assert counts[0] == 50
+        assert counts[0] > counts[1] > counts[2]
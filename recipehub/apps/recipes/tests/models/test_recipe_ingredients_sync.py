@@ -0,0 +1,40 @@
+import pytest
+
+from recipehub.apps.recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipehub.factories import RecipeFactory
+
+
+@pytest.mark.django_db
+class TestRecipeIngredientsSync:
+    """Tests that saving a recipe keeps RecipeIngredient rows in sync"""
+
+    def test_rows_follow_ingredients_text(self):
+        recipe = RecipeFactory.create(ingredients="tomato - 2ks\ncheese - 100g")
+        other_recipe = RecipeFactory.create(ingredients="tomato - 1ks")
+
+        assert recipe.ingredients_count == 2
+        assert Ingredient.objects.filter(name="tomato").count() == 1
+
+        recipe.ingredients = "potato - 3ks"
+        recipe.save()
+
+        assert list(
+            RecipeIngredient.objects.filter(recipe=recipe).values_list(
+                "ingredient__name", "quantity"
+            )
+        ) == [("potato", "3ks")]
+        assert recipe.ingredients_count == 1
+        assert RecipeIngredient.objects.filter(recipe=other_recipe).count() == 1
+
+    def test_deferred_ingredients_are_not_resynced(self, django_assert_num_queries):
+        recipe = RecipeFactory.create(ingredients="tomato - 2ks")
+        recipe = Recipe.objects.only("pk", "slug", "name").get(pk=recipe.pk)
+        recipe.name = "Renamed"
+
+        with django_assert_num_queries(3):
+            recipe.save(update_fields=["name"])
+
+        with django_assert_num_queries(3):
+            recipe.save()
+
+        assert RecipeIngredient.objects.filter(recipe=recipe).count() == 1
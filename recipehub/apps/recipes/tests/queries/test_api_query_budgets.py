@@ -0,0 +1,124 @@
+import pytest
+
+ENDPOINT = "/api/recipes/"
+
+
+@pytest.mark.django_db
+class TestRecipeApiQueryBudgets:
+    """SQL query and Redis command budgets for the recipe API"""
+
+    @pytest.mark.parametrize(
+        "url,queries,redis_commands",
+        [
+            pytest.param(lambda site: ENDPOINT, 2, 0, id="list"),
+            pytest.param(
+                lambda site: f"{ENDPOINT}?pagination=cursor", 1, 0, id="list-cursor"
+            ),
+            pytest.param(
+                lambda site: f"{ENDPOINT}?include=user_state",
+                2,
+                0,
+                id="list-user-state",
+            ),
+            pytest.param(
+                lambda site: f"{ENDPOINT}?search=recipe&ordering=-created_at",
+                2,
+                0,
+                id="list-search",
+            ),
+            pytest.param(
+                lambda site: f"{ENDPOINT}{site['recipes'][0].slug}/",
+                1,
+                0,
+                id="retrieve",
+            ),
+            pytest.param(lambda site: f"{ENDPOINT}my-recipes/", 2, 0, id="my-recipes"),
+            pytest.param(
+                lambda site: f"{ENDPOINT}my-recipes/?include=user_state",
+                2,
+                0,
+                id="my-recipes-user-state",
+            ),
+            pytest.param(
+                lambda site: f"{ENDPOINT}my-recipes/?format=ndjson",
+                1,
+                0,
+                id="my-recipes-ndjson",
+            ),
+            pytest.param(
+                lambda site: f"{ENDPOINT}best-recipes/", 1, 3, id="best-recipes"
+            ),
+            pytest.param(lambda site: f"{ENDPOINT}trending/", 1, 1, id="trending"),
+            pytest.param(
+                lambda site: f"{ENDPOINT}recommended/", 1, 4, id="recommended"
+            ),
+            pytest.param(
+                lambda site: f"{ENDPOINT}{site['recipes'][0].slug}/similar/",
+                1,
+                1,
+                id="similar",
+            ),
+            pytest.param(
+                lambda site: f"{ENDPOINT}builder/?ingredients=tomato,cheese",
+                2,
+                0,
+                id="builder",
+            ),
+            pytest.param(
+                lambda site: f"{ENDPOINT}builder/?ingredients=tomato,cheese"
+                "&include=user_state",
+                2,
+                0,
+                id="builder-user-state",
+            ),
+            pytest.param(lambda site: "/api/categories/", 2, 0, id="categories"),
+        ],
+    )
+    def test_get(
+        self,
+        authenticated_client,
+        seeded_site,
+        query_budget,
+        url,
+        queries,
+        redis_commands,
+    ):
+        url = url(seeded_site)
+
+        with query_budget(queries=queries, redis_commands=redis_commands):
+            response = authenticated_client.get(url)
+            if response.streaming:
+                b"".join(response.streaming_content)
+
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize(
+        "method,index,status_code,queries,redis_commands",
+        [
+            pytest.param("post", -1, 201, 5, 6, id="add"),
+            pytest.param("delete", 0, 204, 2, 3, id="remove"),
+        ],
+    )
+    def test_favorite(
+        self,
+        authenticated_client,
+        seeded_site,
+        query_budget,
+        method,
+        index,
+        status_code,
+        queries,
+        redis_commands,
+    ):
+        url = f"{ENDPOINT}{seeded_site['recipes'][index].slug}/favorite/"
+
+        with query_budget(queries=queries, redis_commands=redis_commands):
+            response = getattr(authenticated_client, method)(url)
+
+        assert response.status_code == status_code
+
+    def test_in_process(self, admin_client, seeded_site, query_budget):
+        with query_budget(queries=2, redis_commands=0):
+            response = admin_client.get(f"{ENDPOINT}in-process/")
+
+        assert response.status_code == 200
@@ -0,0 +1,44 @@
+import pytest
+from asgiref.sync import async_to_sync
+
+import recipehub.redis as redis_module
+from recipehub.apps.recipes.models import Recipe
+from recipehub.factories import RecipeFactory
+
+
+@pytest.mark.django_db
+class TestQueryBudgetReport:
+    """Tests for the query budget failure report"""
+
+    def test_n_plus_one_points_at_call_site(self, query_budget):
+        RecipeFactory.create_batch(3)
+
+        with pytest.raises(AssertionError) as error:
+            with query_budget(queries=1):
+                for recipe in Recipe.objects.all():
+                    recipe.user.username
+
+        report = str(error.value)
+        assert "4 SQL queries over a budget of 1" in report
+        assert "3x recipehub/apps/recipes/tests/queries/" in report
+
+    def test_redis_commands_are_counted(self, query_budget, fake_redis):
+        with pytest.raises(AssertionError, match="3 Redis commands"):
+            with query_budget(queries=0, redis_commands=1):
+                fake_redis.set("key", 1)
+                pipe = fake_redis.pipeline()
+                pipe.get("key")
+                pipe.incr("key")
+                pipe.execute()
+
+    def test_async_redis_commands_are_counted(self, query_budget, fake_redis):
+        @async_to_sync
+        async def run():
+            client = redis_module.get_async_redis()
+            await client.set("key", 1)
+            async with client.pipeline() as pipe:
+                await pipe.get("key").incr("key").execute()
+
+        with pytest.raises(AssertionError, match="3 Redis commands"):
+            with query_budget(queries=0, redis_commands=1):
+                run()
@@ -0,0 +1,90 @@
+import pytest
+from django.urls import reverse
+
+
+def recipe_url(site):
+    return reverse("recipes:recipe-detail", kwargs={"slug": site["recipes"][0].slug})
+
+
+@pytest.mark.django_db
+class TestRecipeViewQueryBudgets:
+    """SQL query and Redis command budgets for the recipe HTML views"""
+
+    @pytest.mark.parametrize(
+        "url,queries,redis_commands",
+        [
+            pytest.param(lambda site: reverse("recipes:index"), 4, 12, id="index"),
+            pytest.param(
+                lambda site: reverse("recipes:recipes-list"), 6, 13, id="list"
+            ),
+            pytest.param(
+                lambda site: reverse("recipes:recipes-list") + "?page=3",
+                6,
+                13,
+                id="list-page",
+            ),
+            pytest.param(
+                lambda site: reverse("recipes:recipes-list") + "?pagination=cursor",
+                5,
+                13,
+                id="list-cursor",
+            ),
+            pytest.param(
+                lambda site: reverse("recipes:recipes-list") + "?search=recipe",
+                6,
+                13,
+                id="list-search",
+            ),
+            pytest.param(
+                lambda site: reverse("recipes:recipes-list")
+                + "?ingredients=tomato&ingredients=cheese",
+                6,
+                13,
+                id="list-ingredients",
+            ),
+            pytest.param(recipe_url, 7, 24, id="detail"),
+            pytest.param(
+                lambda site: recipe_url(site) + "?page=2", 7, 24, id="detail-comments"
+            ),
+            pytest.param(
+                lambda site: reverse("recipes:recipe-add"), 4, 7, id="add-form"
+            ),
+            pytest.param(
+                lambda site: reverse("recipes:recipe-builder")
+                + "?ingredients=tomato,cheese",
+                3,
+                7,
+                id="builder",
+            ),
+        ],
+    )
+    def test_get(self, client, seeded_site, query_budget, url, queries, redis_commands):
+        client.force_login(seeded_site["user"])
+        url = url(seeded_site)
+
+        with query_budget(queries=queries, redis_commands=redis_commands):
+            response = client.get(url)
+
+        assert response.status_code == 200
+
+    def test_detail_with_cached_comments(self, client, seeded_site, query_budget):
+        """Comment page and count come from the fragment cache"""
+        client.force_login(seeded_site["user"])
+        client.get(recipe_url(seeded_site))
+
+        with query_budget(queries=3, redis_commands=8):
+            response = client.get(recipe_url(seeded_site))
+
+        assert response.status_code == 200
+
+    def test_save_recipe(self, client, seeded_site, query_budget):
+        client.force_login(seeded_site["user"])
+
+        with query_budget(queries=7, redis_commands=6):
+            response = client.post(
+                reverse("recipes:save-recipe"),
+                data={"slug": seeded_site["recipes"][-1].slug},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
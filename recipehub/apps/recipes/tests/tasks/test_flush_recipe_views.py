@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from pytest_django.asserts import assertContains
+
+from recipehub.apps.recipes.models import RecipeViewFlush
+from recipehub.apps.recipes.tasks import (
+    flush_recipe_views,
+    RECIPE_VIEWS_FLUSH_LOCK_KEY,
+    RECIPE_VIEWS_FLUSHING_KEY,
+)
+from recipehub.apps.recipes.utils import RECIPE_VIEWS_PENDING_KEY
+from recipehub.factories import RecipeFactory
+
+
+@pytest.mark.django_db
+class TestFlushRecipeViews:
+    """Tests for the write-behind flush of redis view deltas"""
+
+    def test_flush_moves_deltas_to_view_count(self, client, users_list, fake_redis):
+        with patch("recipehub.apps.recipes.tasks.r", fake_redis):
+            recipe = RecipeFactory.create(slug="fish", moderation_status="approved")
+            other_recipe = RecipeFactory.create(moderation_status="approved")
+
+            for user in users_list.values():
+                client.force_login(user)
+                client.get(
+                    reverse("recipes:recipe-detail", kwargs={"slug": recipe.slug})
+                )
+
+            assert flush_recipe_views() == 1
+
+            recipe.refresh_from_db()
+            other_recipe.refresh_from_db()
+            assert recipe.view_count == len(users_list)
+            assert other_recipe.view_count == 0
+            assert not fake_redis.exists(RECIPE_VIEWS_PENDING_KEY)
+            assert not fake_redis.exists(RECIPE_VIEWS_FLUSHING_KEY)
+
+    def test_flush_without_views(self, fake_redis):
+        with patch("recipehub.apps.recipes.tasks.r", fake_redis):
+            assert flush_recipe_views() == 0
+
+    def test_applied_batch_is_not_counted_twice(self, fake_redis):
+        """A run that died after the commit left its hash behind"""
+        recipe = RecipeFactory.create(moderation_status="approved")
+        fake_redis.hset(
+            RECIPE_VIEWS_FLUSHING_KEY, mapping={recipe.id: 3, "batch": "replayed"}
+        )
+        RecipeViewFlush.objects.create(batch_id="replayed")
+
+        with patch("recipehub.apps.recipes.tasks.r", fake_redis):
+            assert flush_recipe_views() == 0
+
+        recipe.refresh_from_db()
+        assert recipe.view_count == 0
+        assert not fake_redis.exists(RECIPE_VIEWS_FLUSHING_KEY)
+
+    def test_concurrent_run_is_skipped(self, fake_redis):
+        recipe = RecipeFactory.create(moderation_status="approved")
+        fake_redis.hset(RECIPE_VIEWS_PENDING_KEY, recipe.id, 2)
+        fake_redis.set(RECIPE_VIEWS_FLUSH_LOCK_KEY, 1)
+
+        with patch("recipehub.apps.recipes.tasks.r", fake_redis):
+            assert flush_recipe_views() == 0
+
+        recipe.refresh_from_db()
+        assert recipe.view_count == 0
+        assert fake_redis.exists(RECIPE_VIEWS_PENDING_KEY)
+
+    def test_expired_run_leaves_the_newer_lock(self, fake_redis):
+        """A run slower than the lock TTL must not release its successor's lock"""
+
+        def outlive_lock():
+            fake_redis.set(RECIPE_VIEWS_FLUSH_LOCK_KEY, "newer run")
+            return 0
+
+        with (
+            patch("recipehub.apps.recipes.tasks.r", fake_redis),
+            patch(
+                "recipehub.apps.recipes.tasks._flush_recipe_views",
+                side_effect=outlive_lock,
+            ),
+        ):
+            flush_recipe_views()
+
+        assert fake_redis.get(RECIPE_VIEWS_FLUSH_LOCK_KEY) == b"newer run"
+
+    def test_total_is_rebuilt_after_redis_flush(self, client, users_list, fake_redis):
+        recipe = RecipeFactory.create(slug="fish", moderation_status="approved")
+        recipe.view_count = 10
+        recipe.save()
+        user = users_list["first_simple_user"]
+
+        client.force_login(user)
+        response = client.get(
+            reverse("recipes:recipe-detail", kwargs={"slug": recipe.slug})
+        )
+
+        assert int(fake_redis.get(f"recipe:{recipe.id}:views")) == 11
+        assertContains(response, "11 views")
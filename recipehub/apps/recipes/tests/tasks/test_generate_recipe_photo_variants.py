@@ -0,0 +1,126 @@
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from pytest_django.asserts import assertContains
+
+from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.tasks import (
+    delete_recipe_photo_files,
+    generate_recipe_photo_variants,
+)
+from recipehub.apps.recipes.utils import generate_photo_variants, photo_variant_names
+from recipehub.factories import RecipeFactory
+
+
+@pytest.fixture
+def large_image() -> SimpleUploadedFile:
+    image = Image.new("RGB", (800, 600), color="green")
+    image_io = BytesIO()
+    image.save(image_io, format="JPEG")
+    return SimpleUploadedFile(
+        "large_photo.jpg", image_io.getvalue(), content_type="image/jpeg"
+    )
+
+
+@pytest.mark.django_db
+class TestGenerateRecipePhotoVariants:
+    """Tests for the resized recipe photo variants"""
+
+    def test_variants_are_resized_without_upscaling(self, large_image):
+        recipe = RecipeFactory.create(photo=large_image)
+
+        generate_recipe_photo_variants(recipe.pk)
+
+        recipe.refresh_from_db()
+        assert set(recipe.photo_variants) == {"webp", "jpeg"}
+        for ext, image_format in (("webp", "WEBP"), ("jpeg", "JPEG")):
+            assert list(recipe.photo_variants[ext]) == ["320", "640", "800"]
+            with recipe.photo.storage.open(recipe.photo_variants[ext]["320"]) as f:
+                variant = Image.open(f)
+                assert variant.format == image_format
+                assert variant.size == (320, 240)
+
+    def test_new_photo_queues_variants_after_commit(
+        self, large_image, sample_image, django_capture_on_commit_callbacks
+    ):
+        with patch.object(generate_recipe_photo_variants, "delay") as delay:
+            with django_capture_on_commit_callbacks(execute=True):
+                recipe = RecipeFactory.create(photo=large_image)
+            delay.assert_called_once_with(recipe.pk)
+
+            recipe.photo_variants = {"webp": {"320": "old.webp"}}
+            recipe.save()
+            recipe.refresh_from_db()
+            recipe.photo = sample_image
+            with django_capture_on_commit_callbacks(execute=True):
+                recipe.save()
+
+            assert delay.call_count == 2
+            assert recipe.photo_variants == {}
+
+    def test_replaced_photo_and_deleted_recipe_remove_variant_files(
+        self, large_image, sample_image, django_capture_on_commit_callbacks
+    ):
+        recipe = RecipeFactory.create(photo=large_image)
+        generate_recipe_photo_variants(recipe.pk)
+        recipe.refresh_from_db()
+        storage = recipe.photo.storage
+        old_names = photo_variant_names(recipe.photo_variants)
+
+        with (
+            patch.object(generate_recipe_photo_variants, "delay"),
+            patch.object(
+                delete_recipe_photo_files,
+                "delay",
+                side_effect=delete_recipe_photo_files,
+            ),
+        ):
+            recipe.photo = sample_image
+            with django_capture_on_commit_callbacks(execute=True):
+                recipe.save()
+            assert not any(storage.exists(name) for name in old_names)
+
+            generate_recipe_photo_variants(recipe.pk)
+            recipe.refresh_from_db()
+            new_names = photo_variant_names(recipe.photo_variants)
+            assert all(storage.exists(name) for name in new_names)
+
+            with django_capture_on_commit_callbacks(execute=True):
+                recipe.delete()
+            assert not any(storage.exists(name) for name in new_names)
+
+    def test_variants_of_a_replaced_photo_are_not_kept(self, large_image):
+        """The photo changed while the task was resizing the old one"""
+        recipe = RecipeFactory.create(photo=large_image)
+        saved_names = []
+
+        def generate_then_replace(photo):
+            variants = generate_photo_variants(photo)
+            saved_names.extend(photo_variant_names(variants))
+            Recipe.objects.filter(pk=recipe.pk).update(photo="recipes/other.jpg")
+            return variants
+
+        with patch(
+            "recipehub.apps.recipes.tasks.generate_photo_variants",
+            side_effect=generate_then_replace,
+        ):
+            generate_recipe_photo_variants(recipe.pk)
+
+        recipe.refresh_from_db()
+        assert recipe.photo_variants == {}
+        assert saved_names
+        assert not any(recipe.photo.storage.exists(name) for name in saved_names)
+
+    def test_recipe_list_emits_srcset(self, client, large_image):
+        recipe = RecipeFactory.create(photo=large_image, moderation_status="approved")
+        generate_recipe_photo_variants(recipe.pk)
+        recipe.refresh_from_db()
+
+        response = client.get(reverse("recipes:recipes-list"))
+
+        assertContains(response, f'srcset="{recipe.photo_srcsets["webp"]}"')
+        assertContains(response, f'srcset="{recipe.photo_srcsets["jpeg"]}"')
@@ -0,0 +1,119 @@
+import pytest
+from django.urls import reverse
+
+from recipehub.apps.recipes.recommendations import (
+    RECOMMENDATIONS_DIRTY_KEY,
+    get_recommended_ids,
+    item_similarities,
+)
+from recipehub.apps.recipes.tasks import (
+    rebuild_recommendations,
+    refresh_recommendations,
+)
+from recipehub.factories import (
+    RecipeFactory,
+    ReviewFactory,
+    UserFactory,
+    UserRecipeFavoriteFactory,
+)
+
+
+@pytest.fixture
+def recommendations_redis(fake_redis, monkeypatch):
+    monkeypatch.setattr("recipehub.apps.recipes.recommendations.r", fake_redis)
+    monkeypatch.setattr("recipehub.apps.recipes.recommendations.batch_r", fake_redis)
+    monkeypatch.setattr("recipehub.apps.recipes.tasks.r", fake_redis)
+    return fake_redis
+
+
+def approved(**kwargs):
+    return RecipeFactory.create(moderation_status="approved", **kwargs)
+
+
+def favorite(user, *recipes):
+    for recipe in recipes:
+        UserRecipeFavoriteFactory.create(user=user, recipe=recipe)
+
+
+@pytest.mark.django_db
+class TestRebuildRecommendations:
+    """Tests for the item-item recommendations"""
+
+    def test_co_favorited_recipes_are_recommended(self, recommendations_redis):
+        soup, bread, salad, cake = (approved() for _ in range(4))
+        first, second, third = UserFactory.create_batch(3)
+        favorite(first, soup, bread, salad)
+        favorite(second, soup, bread)
+        favorite(third, cake)
+        ReviewFactory.create(user=third, recipe=salad, rating=1)
+
+        assert rebuild_recommendations() == 1
+        assert get_recommended_ids(second.id) == [salad.id]
+        assert get_recommended_ids(first.id) == []
+        assert get_recommended_ids(third.id) == []
+
+    def test_own_and_pending_recipes_are_not_recommended(self, recommendations_redis):
+        user, other = UserFactory.create_batch(2)
+        soup = approved()
+        own = approved(user=user)
+        bread = approved()
+        pending = RecipeFactory.create(moderation_status="in_process")
+        favorite(other, soup, own, bread, pending)
+        favorite(user, soup)
+
+        rebuild_recommendations()
+
+        assert get_recommended_ids(user.id) == [bread.id]
+
+    def test_item_similarities_weights_ratings(self):
+        neighbors = item_similarities({1: {10: 1.0, 11: 1.0}, 2: {10: 0.5, 12: 1.0}})
+
+        assert neighbors[10] == {
+            11: pytest.approx(2 / 5**0.5),
+            12: pytest.approx(1 / 5**0.5),
+        }
+        assert 11 not in neighbors[12]
+
+    def test_heavy_users_only_count_their_strongest_interactions(self, monkeypatch):
+        monkeypatch.setattr(
+            "recipehub.apps.recipes.recommendations.USER_INTERACTIONS_LIMIT", 2
+        )
+
+        neighbors = item_similarities({1: {10: 1.0, 11: 1.0, 12: 0.5}})
+
+        assert neighbors == {10: {11: pytest.approx(1.0)}, 11: {10: pytest.approx(1.0)}}
+
+    def test_refresh_rescores_changed_users(
+        self, recommendations_redis, django_capture_on_commit_callbacks
+    ):
+        soup, bread, salad = (approved() for _ in range(3))
+        first, second = UserFactory.create_batch(2)
+        favorite(first, soup, bread, salad)
+        rebuild_recommendations()
+        assert get_recommended_ids(second.id) == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ReviewFactory.create(user=second, recipe=soup, rating=5)
+
+        assert recommendations_redis.smembers(RECOMMENDATIONS_DIRTY_KEY) == {
+            str(second.id).encode()
+        }
+        assert refresh_recommendations() == 1
+        assert set(get_recommended_ids(second.id)) == {bread.id, salad.id}
+        assert not recommendations_redis.exists(RECOMMENDATIONS_DIRTY_KEY)
+
+    def test_api_falls_back_to_best_recipes(self, api_client, recommendations_redis):
+        soup, bread = approved(), approved()
+        first, second = UserFactory.create_batch(2)
+        favorite(first, soup, bread)
+        favorite(second, soup)
+        rebuild_recommendations()
+        url = reverse("recipe-recommended")
+
+        api_client.force_authenticate(second)
+        response = api_client.get(url)
+        assert [item["slug"] for item in response.data] == [bread.slug]
+
+        api_client.force_authenticate(UserFactory.create())
+        response = api_client.get(url)
+        assert response.status_code == 200
@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+
+from recipehub.apps.recipes.similarity import (
+    find_similar_recipes,
+    get_similar_recipe_ids,
+    minhash_signature,
+    similar_recipes_key,
+)
+from recipehub.apps.recipes.tasks import rebuild_similar_recipes
+from recipehub.factories import RecipeFactory
+
+PASTA = "pasta - 200 g\ntomato - 3 pcs\ngarlic - 2 cloves\nbasil - 5 leaves\n"
+
+
+@pytest.fixture
+def similar_redis(fake_redis, monkeypatch):
+    monkeypatch.setattr("recipehub.apps.recipes.similarity.r", fake_redis)
+    monkeypatch.setattr("recipehub.apps.recipes.similarity.batch_r", fake_redis)
+    return fake_redis
+
+
+def approved(**kwargs):
+    return RecipeFactory.create(moderation_status="approved", **kwargs)
+
+
+@pytest.mark.django_db
+class TestRebuildSimilarRecipes:
+    """Tests for the precomputed similar recipes"""
+
+    def test_recipes_sharing_ingredients_are_similar(self, similar_redis):
+        pasta = approved(ingredients=PASTA + "olive oil - 2 tbsp")
+        close = approved(ingredients=PASTA + "parmesan - 50 g")
+        closer = approved(ingredients=PASTA.replace("200 g", "250 g"))
+        approved(ingredients="chocolate - 100 g\nbutter - 50 g\nsugar - 80 g")
+        pending = RecipeFactory.create(
+            moderation_status="in_process", ingredients=PASTA
+        )
+
+        assert rebuild_similar_recipes() == 3
+        assert get_similar_recipe_ids(pasta.id) == [closer.id, close.id]
+        assert pending.id not in get_similar_recipe_ids(close.id)
+
+    def test_rebuild_drops_stale_lists(self, similar_redis):
+        recipe = approved(ingredients="rice - 1 cup\nsalt - 1 tsp")
+        similar_redis.rpush(similar_recipes_key(recipe.id), 999)
+
+        rebuild_similar_recipes()
+
+        assert not similar_redis.exists(similar_recipes_key(recipe.id))
+
+    def test_identical_sets_share_a_signature(self):
+        assert minhash_signature([3, 1, 2]) == minhash_signature([1, 2, 3])
+        assert find_similar_recipes(
+            {1: frozenset({1, 2, 3}), 2: frozenset({1, 2, 3}), 3: frozenset({9})}
+        ) == {1: [2], 2: [1]}
+
+    def test_detail_page_and_api_show_similar_recipes(
+        self, client, api_client, users_list, similar_redis
+    ):
+        recipe = approved(ingredients=PASTA)
+        similar = approved(ingredients=PASTA + "parmesan - 50 g")
+        rebuild_similar_recipes()
+        user = users_list["first_simple_user"]
+
+        client.force_login(user)
+        response = client.get(
+            reverse("recipes:recipe-detail", kwargs={"slug": recipe.slug})
+        )
+        assert response.context["similar_recipes"] == [similar]
+
+        api_client.force_authenticate(user)
+        response = api_client.get(
+            reverse("recipe-similar", kwargs={"slug": recipe.slug})
+        )
+        assert [item["slug"] for item in response.data] == [similar.slug]
@@ -0,0 +1,51 @@
+import pytest
+
+from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.utils import filter_by_ingredients
+from recipehub.factories import RecipeFactory
+
+
+@pytest.mark.django_db
+class TestFilterByIngredients:
+    def test_substring_match(self):
+        recipe = RecipeFactory.create(ingredients="tomato - 2ks\ncheese - 100g")
+        RecipeFactory.create(ingredients="chicken - 1ks")
+
+        result = filter_by_ingredients(Recipe.objects.all(), ["Tomato"])
+        assert list(result) == [recipe]
+
+    def test_misspelled_ingredient(self):
+        recipe = RecipeFactory.create(ingredients="tomato - 2ks\ncheese - 100g")
+        RecipeFactory.create(ingredients="chicken - 1ks")
+
+        result = filter_by_ingredients(Recipe.objects.all(), ["chese"])
+        assert list(result) == [recipe]
+
+    def test_more_matches_rank_higher(self):
+        one_match = RecipeFactory.create(ingredients="tomato - 2ks")
+        two_matches = RecipeFactory.create(ingredients="tomato - 2ks\ncheese - 100g")
+
+        result = filter_by_ingredients(
+            Recipe.objects.all(), ["tomato", "cheese"]
+        ).order_by("-matched_ingredients")
+        assert list(result) == [two_matches, one_match]
+        assert [r.matched_ingredients for r in result] == [2, 1]
+
+    def test_fewer_missing_rank_higher(self):
+        many_missing = RecipeFactory.create(
+            ingredients="tomato - 2ks\nflour - 1kg\nyeast - 10g"
+        )
+        one_missing = RecipeFactory.create(ingredients="tomato - 2ks\nsalt - 1g")
+
+        result = filter_by_ingredients(Recipe.objects.all(), ["tomato"]).order_by(
+            "-matched_ingredients", "missing_ingredients"
+        )
+        assert list(result) == [one_missing, many_missing]
+        assert [r.missing_ingredients for r in result] == [1, 2]
+
+    @pytest.mark.parametrize("ingredients", [[], [""], [" ", ""]])
+    def test_empty_ingredients_return_everything(self, ingredients):
+        RecipeFactory.create_batch(2)
+
+        result = filter_by_ingredients(Recipe.objects.all(), ingredients)
+        assert result.count() == 2
@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
 import pytest
 
+from recipehub.apps.recipes.models import Recipe
 from recipehub.apps.recipes.utils import generate_unique_slug
-from recipehub.factories import RecipeFactory
+from recipehub.factories import CategoryFactory, RecipeFactory
 
 
 @pytest.mark.parametrize(
@@ -35,3 +38,55 @@ class TestGenerateUniqueSlugCollisions:
             generate_unique_slug(instance=recipe3, slugify_value=recipe3.name)
             == "fish-2"
         )
+
+
+@pytest.mark.django_db
+class TestGenerateUniqueSlugQueries:
+    def test_single_query_for_many_collisions(self, django_assert_num_queries):
+        RecipeFactory.create_batch(20, name="pancakes", slug=None)
+        recipe = RecipeFactory.build(name="pancakes")
+
+        with django_assert_num_queries(1):
+            assert generate_unique_slug(recipe, recipe.name) == "pancakes-20"
+
+    def test_similar_slugs_are_not_counted(self):
+        RecipeFactory.create(slug="fish-soup")
+        RecipeFactory.create(slug="fish-7-days")
+        recipe = RecipeFactory.build(name="fish")
+
+        assert generate_unique_slug(recipe, recipe.name) == "fish"
+
+    def test_huge_suffix_does_not_overflow(self):
+        RecipeFactory.create(name="Cake 99999999999999999999", slug=None)
+
+        recipe = RecipeFactory.create(name="cake", slug=None)
+
+        assert recipe.slug == "cake-100000000000000000000"
+
+    def test_suffix_with_leading_zero_is_not_counted(self):
+        RecipeFactory.create(slug="cake-9")
+        RecipeFactory.create(slug="cake-010")
+        recipe = RecipeFactory.build(name="cake")
+
+        assert generate_unique_slug(recipe, recipe.name) == "cake-10"
+
+    def test_category_slug(self):
+        CategoryFactory.create(name="Soups")
+
+        assert CategoryFactory.create(name="Soups").slug == "soups-1"
+
+
+@pytest.mark.django_db
+class TestSaveWithUniqueSlug:
+    def test_retries_when_slug_is_taken_concurrently(self):
+        """A slug taken between allocation and insert is allocated again"""
+        RecipeFactory.create(name="fish", slug=None)
+
+        with patch(
+            "recipehub.apps.recipes.utils.generate_unique_slug",
+            side_effect=["fish", "fish-1"],
+        ):
+            recipe = RecipeFactory.create(name="fish", slug=None)
+
+        assert recipe.slug == "fish-1"
+        assert Recipe.objects.filter(name="fish").count() == 2
@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from recipehub.apps.recipes.utils import (
+    BEST_RECIPES_CACHE_KEY,
+    BEST_RECIPES_LOCK_KEY,
+    clear_local_best_recipes,
+    get_best_recipes,
+    invalidate_best_recipes,
+)
+from recipehub.factories import RecipeFactory
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestGetBestRecipes:
+    """Tests for the two-level best recipes cache"""
+
+    def test_returns_recipes_in_rating_order(self, fake_redis):
+        first, second = RecipeFactory.create_batch(2)
+        fake_redis.zadd("recipe:ratings", {first.id: 3, second.id: 5})
+
+        with patch("recipehub.apps.recipes.utils.r", fake_redis):
+            assert get_best_recipes() == [second, first]
+
+    def test_local_copy_skips_shared_cache(self, fake_redis):
+        recipe = RecipeFactory.create()
+        fake_redis.zadd("recipe:ratings", {recipe.id: 5})
+
+        with patch("recipehub.apps.recipes.utils.r", fake_redis):
+            get_best_recipes()
+            cache.clear()
+            fake_redis.delete("recipe:ratings")
+
+            assert get_best_recipes() == [recipe]
+
+    def test_stale_value_served_while_refresh_is_locked(self, fake_redis):
+        """Only the lock holder recomputes, the others get the stale value"""
+        stale, fresh = RecipeFactory.create_batch(2)
+        fake_redis.zadd("recipe:ratings", {fresh.id: 5})
+        cache.set(BEST_RECIPES_CACHE_KEY, {"recipes": [stale], "fresh_until": 0})
+        cache.add(BEST_RECIPES_LOCK_KEY, 1)
+
+        with patch("recipehub.apps.recipes.utils.r", fake_redis):
+            assert get_best_recipes() == [stale]
+
+            cache.delete(BEST_RECIPES_LOCK_KEY)
+            clear_local_best_recipes()
+
+            assert get_best_recipes() == [fresh]
+            assert cache.get(BEST_RECIPES_LOCK_KEY) is None
+
+    def test_invalidated_copy_is_served_stale_while_locked(self, fake_redis):
+        """Invalidation doesn't send every worker to Redis and the database"""
+        stale, fresh = RecipeFactory.create_batch(2)
+        fake_redis.zadd("recipe:ratings", {stale.id: 5})
+
+        with patch("recipehub.apps.recipes.utils.r", fake_redis):
+            get_best_recipes()
+            fake_redis.zadd("recipe:ratings", {fresh.id: 5, stale.id: 1})
+            invalidate_best_recipes()
+            cache.add(BEST_RECIPES_LOCK_KEY, 1)
+
+            assert get_best_recipes() == [stale]
+            assert cache.get(BEST_RECIPES_CACHE_KEY)["fresh_until"] == 0
+
+            cache.delete(BEST_RECIPES_LOCK_KEY)
+            clear_local_best_recipes()
+
+            assert get_best_recipes() == [fresh, stale]
+
+    def test_review_changing_top_invalidates_cache(
+        self, client, users_list, fake_redis
+    ):
+        user = users_list["first_simple_user"]
+        recipe = RecipeFactory.create(slug="fish")
+        client.force_login(user)
+
+        with (
+            patch("recipehub.apps.recipes.utils.r", fake_redis),
+            patch("recipehub.apps.reviews.views.r", fake_redis),
+        ):
+            assert get_best_recipes() == []
+
+            client.post(
+                reverse("reviews:create-review"),
+                data={"slug": recipe.slug, "rating": 4},
+                content_type="application/json",
+            )
+
+            assert get_best_recipes() == [recipe]
@@ -0,0 +1,20 @@
+import pytest
+
+from recipehub.apps.recipes.utils import parse_ingredients
+
+
+@pytest.mark.parametrize(
+    "raw_ingredients,expected",
+    [
+        ("tomato - 2ks\ncheese - 100g", {"tomato": "2ks", "cheese": "100g"}),
+        ("Olive  Oil - 2 tbsp", {"olive oil": "2 tbsp"}),
+        ("salt - 1g\nsalt - pinch", {"salt": "1g, pinch"}),
+        ("tomato, cheese, basil", {"tomato": "", "cheese": "", "basil": ""}),
+        ("\n\n", {}),
+    ],
+)
+class TestParseIngredients:
+    """Tests for parse_ingredients utility"""
+
+    def test_parse_ingredients(self, raw_ingredients, expected):
+        assert parse_ingredients(raw_ingredients) == expected
@@ -0,0 +1,37 @@
+from unittest.mock import patch
+
+from django.template import Context, Template
+
+from recipehub.context_processors import redis_best_recipes
+
+
+class TestRedisBestRecipesContextProcessor:
+    """Tests for the lazy best recipes context processor"""
+
+    def test_not_evaluated_until_used(self, rf):
+        with patch(
+            "recipehub.context_processors.get_best_recipes", return_value=[]
+        ) as get_best_recipes:
+            context = redis_best_recipes(rf.get("/accounts/profile/"))
+
+            Template("{{ user }}").render(Context(context))
+            get_best_recipes.assert_not_called()
+
+    def test_evaluated_once_per_request(self, rf):
+        request = rf.get("/recipes/")
+        with patch(
+            "recipehub.context_processors.get_best_recipes",
+            return_value=["Borscht", "Pizza"],
+        ) as get_best_recipes:
+            template = Template(
+                "{% for recipe in best_recipes %}{{ recipe }} {% endfor %}"
+            )
+
+            first = template.render(Context(redis_best_recipes(request)))
+            second = template.render(Context(redis_best_recipes(request)))
+
+            assert first == second == "Borscht Pizza "
+            get_best_recipes.assert_called_once()
+
+    def test_skipped_for_api(self, rf):
+        assert redis_best_recipes(rf.get("/api/recipes/")) == {}
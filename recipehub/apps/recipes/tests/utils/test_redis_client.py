@@ -0,0 +1,60 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from redis.exceptions import ConnectionError
+
+from recipehub.redis import (
+    LuaScript,
+    create_client,
+    get_connection_pool,
+    pipeline,
+    pool_options,
+)
+
+
+class TestRedisClientFactory:
+    """Tests for the shared Redis pools and helpers"""
+
+    def test_clients_share_the_pool_of_a_url(self, settings):
+        url = "redis://example.invalid:6379/3"
+
+        assert create_client(url).connection_pool is get_connection_pool(url)
+        assert create_client(url).connection_pool is create_client(url).connection_pool
+        assert get_connection_pool(url) is not get_connection_pool(settings.REDIS_URL)
+
+    def test_cache_uses_the_shared_pool(self, settings):
+        client = cache._cache.get_client(write=True)
+
+        assert client.connection_pool is get_connection_pool(settings.REDIS_URL)
+
+    def test_pool_options_come_from_settings(self, settings):
+        settings.REDIS_POOL = {**settings.REDIS_POOL, "socket_timeout": 0.2}
+        options = pool_options()
+
+        assert options["socket_timeout"] == 0.2
+        assert "retries" not in options
+        assert options["retry"]._supported_errors == (ConnectionError,)
+
+    def test_batch_jobs_get_their_own_pool(self, settings):
+        settings.REDIS_BATCH_POOL = {**settings.REDIS_POOL, "socket_timeout": 30}
+        url = "redis://example.invalid:6379/4"
+
+        assert get_connection_pool(url, batch=True) is not get_connection_pool(url)
+        assert pool_options(batch=True)["socket_timeout"] == 30
+        assert pool_options()["socket_timeout"] == settings.REDIS_POOL["socket_timeout"]
+
+    def test_pipeline_skips_multi_by_default(self, fake_redis):
+        assert pipeline().transaction is False
+        assert pipeline(fake_redis, transaction=True).transaction is True
+
+    def test_lua_script_reloads_after_flush(self, fake_redis):
+        script = LuaScript("return redis.call('INCR', KEYS[1])")
+
+        assert script(keys=["counter"]) == 1
+        fake_redis.script_flush()
+        assert script(keys=["counter"]) == 2
+
+    def test_lua_script_runs_on_the_async_client(self, fake_redis):
+        script = LuaScript("return redis.call('INCR', KEYS[1])")
+
+        assert async_to_sync(script.acall)(keys=["counter"]) == 1
+        assert int(fake_redis.get("counter")) == 1
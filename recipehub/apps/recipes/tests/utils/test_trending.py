@@ -0,0 +1,103 @@
+import pytest
+from django.urls import reverse
+
+from recipehub.apps.recipes.tasks import flush_recipe_views
+from recipehub.apps.recipes.trending import (
+    TRENDING_EPOCH_KEY,
+    TRENDING_FAVORITE_WEIGHT,
+    TRENDING_HALF_LIFE,
+    TRENDING_KEY,
+    bump_trending,
+    get_trending_ids,
+)
+from recipehub.apps.recipes.utils import (
+    RECIPE_VIEWS_PENDING_KEY,
+    add_user_favorite,
+    remove_user_favorite,
+)
+from recipehub.factories import RecipeFactory, ReviewFactory
+
+
+@pytest.fixture
+def trending_redis(fake_redis, monkeypatch):
+    for module in ("trending", "tasks", "utils"):
+        monkeypatch.setattr(f"recipehub.apps.recipes.{module}.r", fake_redis)
+    return fake_redis
+
+
+def approved(**kwargs):
+    return RecipeFactory.create(moderation_status="approved", **kwargs)
+
+
+@pytest.mark.django_db
+class TestTrending:
+    """Tests for the time-decayed trending leaderboard"""
+
+    def test_recent_engagement_outweighs_older(self, trending_redis):
+        now = 1_700_000_000
+        bump_trending({1: 3, 2: 1}, now=now)
+        bump_trending({2: 1}, now=now + TRENDING_HALF_LIFE * 2)
+
+        assert get_trending_ids() == [2, 1]
+        assert trending_redis.zscore(TRENDING_KEY, 2) == pytest.approx(5)
+
+    def test_scores_are_rebased_when_they_grow(self, trending_redis):
+        now = 1_700_000_000
+        bump_trending({1: 2, 2: 1}, now=now)
+        later = now + TRENDING_HALF_LIFE * 70
+        bump_trending({3: 1}, now=later)
+
+        assert float(trending_redis.get(TRENDING_EPOCH_KEY)) == later
+        assert get_trending_ids() == [3, 1, 2]
+        assert trending_redis.zscore(TRENDING_KEY, 1) == pytest.approx(2**-69)
+
+    def test_only_the_top_is_kept(self, trending_redis, monkeypatch):
+        monkeypatch.setattr("recipehub.apps.recipes.trending.TRENDING_SIZE", 2)
+
+        bump_trending({1: 1, 2: 3, 3: 2})
+
+        assert get_trending_ids() == [2, 3]
+
+    def test_views_favorites_and_reviews_feed_trending(
+        self, trending_redis, django_capture_on_commit_callbacks
+    ):
+        viewed, favorited, reviewed = (approved() for _ in range(3))
+        trending_redis.hset(RECIPE_VIEWS_PENDING_KEY, viewed.id, 2)
+
+        flush_recipe_views()
+        add_user_favorite(favorited.user_id, favorited.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            review = ReviewFactory.create(recipe=reviewed)
+        with django_capture_on_commit_callbacks(execute=True):
+            review.rating = 5
+            review.save()
+
+        assert get_trending_ids() == [favorited.id, reviewed.id, viewed.id]
+
+    def test_toggling_a_favorite_counts_once(self, trending_redis):
+        recipe = approved()
+
+        for _ in range(3):
+            add_user_favorite(recipe.user_id, recipe.id)
+            remove_user_favorite(recipe.user_id, recipe.id)
+        add_user_favorite(recipe.user_id + 1, recipe.id)
+
+        assert trending_redis.zscore(TRENDING_KEY, recipe.id) == pytest.approx(
+            2 * TRENDING_FAVORITE_WEIGHT, rel=0.01
+        )
+
+    def test_index_and_api_show_approved_trending_recipes(
+        self, client, api_client, users_list, trending_redis
+    ):
+        first, second = approved(), approved()
+        pending = RecipeFactory.create(moderation_status="in_process")
+        bump_trending({pending.id: 3, second.id: 2, first.id: 1})
+        user = users_list["first_simple_user"]
+
+        client.force_login(user)
+        response = client.get(reverse("recipes:index"))
+        assert response.context["trending_recipes"] == [second, first]
+
+        api_client.force_authenticate(user)
+        response = api_client.get(reverse("recipe-trending"))
+        assert [item["slug"] for item in response.data] == [second.slug, first.slug]
@@ -0,0 +1,122 @@
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.urls import reverse
+
+from recipehub.apps.recipes.utils import (
+    aget_favorited_ids,
+    awarm_user_favorites,
+    remove_user_favorite,
+    user_favorites_key,
+)
+from recipehub.factories import RecipeFactory, UserRecipeFavoriteFactory
+
+get_favorited_ids = async_to_sync(aget_favorited_ids)
+
+
+@pytest.fixture
+def favorites_redis(fake_redis):
+    with patch("recipehub.apps.recipes.utils.r", fake_redis):
+        yield fake_redis
+
+
+@pytest.mark.django_db
+class TestUserFavorites:
+    """Tests for the Redis mirror of user favorites"""
+
+    def test_first_lookup_warms_the_set(self, users_list, favorites_redis):
+        user = users_list["first_simple_user"]
+        saved, other = RecipeFactory.create_batch(2)
+        UserRecipeFavoriteFactory.create(user=user, recipe=saved)
+
+        assert get_favorited_ids(user, [saved.id, other.id]) == {saved.id}
+        assert favorites_redis.sismember(user_favorites_key(user.id), saved.id)
+        assert favorites_redis.ttl(user_favorites_key(user.id)) > 0
+
+    def test_warmed_set_answers_without_queries(
+        self, users_list, favorites_redis, django_assert_num_queries
+    ):
+        user = users_list["first_simple_user"]
+        saved, other = RecipeFactory.create_batch(2)
+        UserRecipeFavoriteFactory.create(user=user, recipe=saved)
+        get_favorited_ids(user, [saved.id])
+
+        with django_assert_num_queries(0):
+            assert get_favorited_ids(user, [other.id, saved.id]) == {saved.id}
+
+    def test_user_without_favorites_is_not_reloaded(
+        self, users_list, favorites_redis, django_assert_num_queries
+    ):
+        user = users_list["first_simple_user"]
+        recipe = RecipeFactory.create()
+        get_favorited_ids(user, [recipe.id])
+
+        with django_assert_num_queries(0):
+            assert get_favorited_ids(user, [recipe.id]) == set()
+
+    def test_save_and_remove_keep_the_set_in_sync(
+        self, client, users_list, favorites_redis
+    ):
+        user = users_list["first_simple_user"]
+        recipe = RecipeFactory.create(moderation_status="approved")
+        client.force_login(user)
+        get_favorited_ids(user, [recipe.id])
+
+        client.post(
+            reverse("recipes:save-recipe"),
+            {"slug": recipe.slug},
+            content_type="application/json",
+        )
+        assert get_favorited_ids(user, [recipe.id]) == {recipe.id}
+
+        client.post(
+            reverse("remove_saved_recipe"),
+            {"slug": recipe.slug},
+            content_type="application/json",
+        )
+        assert get_favorited_ids(user, [recipe.id]) == set()
+
+    def test_api_favorite_keeps_the_set_in_sync(
+        self, api_client, users_list, favorites_redis
+    ):
+        user = users_list["first_simple_user"]
+        recipe = RecipeFactory.create(moderation_status="approved")
+        api_client.force_authenticate(user)
+        get_favorited_ids(user, [recipe.id])
+        url = reverse("recipe-favorite", kwargs={"slug": recipe.slug})
+
+        api_client.post(url)
+        assert get_favorited_ids(user, [recipe.id]) == {recipe.id}
+
+        api_client.delete(url)
+        assert get_favorited_ids(user, [recipe.id]) == set()
+
+    def test_warm_up_racing_a_removal_stores_nothing(self, users_list, favorites_redis):
+        """The removal lands between the warm-up's database read and SADD"""
+        user = users_list["first_simple_user"]
+        recipe = RecipeFactory.create()
+        generation = favorites_redis.get(f"user:{user.id}:favorites:generation") or 0
+        remove_user_favorite(user.id, recipe.id)
+
+        # The warm-up read the favorite before it was removed
+        stale = UserRecipeFavoriteFactory.create(user=user, recipe=recipe)
+        async_to_sync(awarm_user_favorites)(user.id, generation)
+        stale.delete()
+
+        assert not favorites_redis.exists(user_favorites_key(user.id))
+        assert get_favorited_ids(user, [recipe.id]) == set()
+
+    def test_list_page_flags_favorites(self, client, users_list, favorites_redis):
+        user = users_list["first_simple_user"]
+        saved, other = RecipeFactory.create_batch(2, moderation_status="approved")
+        UserRecipeFavoriteFactory.create(user=user, recipe=saved)
+        client.force_login(user)
+
+        response = client.get(reverse("recipes:recipes-list"))
+
+        assert response.context["favorited_ids"] == {saved.id}
+
+    def test_anonymous_user_has_no_favorites(self, favorites_redis):
+        assert get_favorited_ids(AnonymousUser(), [1, 2]) == set()
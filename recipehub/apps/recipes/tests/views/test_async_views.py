@@ -0,0 +1,92 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from recipehub.apps.recipes.api.views import RecipeViewSet
+from recipehub.factories import RecipeFactory, UserRecipeFavoriteFactory
+
+
+@pytest.fixture
+def async_client(users_list, fake_redis):
+    client = AsyncClient()
+    client.force_login(users_list["first_simple_user"])
+    return client
+
+
+def get(client: AsyncClient, url: str):
+    return async_to_sync(client.get)(url)
+
+
+@async_to_sync
+async def read_chunks(response) -> list[bytes]:
+    return [chunk async for chunk in response.streaming_content]
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    """Tests for the views served through the ASGI handler"""
+
+    def test_recipes_list(self, async_client, users_list):
+        saved, other = RecipeFactory.create_batch(2, moderation_status="approved")
+        UserRecipeFavoriteFactory.create(
+            user=users_list["first_simple_user"], recipe=saved
+        )
+
+        response = get(async_client, reverse("recipes:recipes-list"))
+
+        assert response.status_code == 200
+        assert {recipe.pk for recipe in response.context["recipes"]} == {
+            saved.pk,
+            other.pk,
+        }
+        assert response.context["favorited_ids"] == {saved.pk}
+
+    def test_recipe_detail_counts_view(self, async_client, fake_redis):
+        recipe = RecipeFactory.create(moderation_status="approved")
+        url = reverse("recipes:recipe-detail", kwargs={"slug": recipe.slug})
+
+        response = get(async_client, url)
+
+        assert response.status_code == 200
+        assert response.context["views"] == 1
+        assert int(fake_redis.get(f"recipe:{recipe.id}:views")) == 1
+
+    def test_recipe_detail_not_found(self, async_client):
+        url = reverse("recipes:recipe-detail", kwargs={"slug": "missing"})
+
+        assert get(async_client, url).status_code == 404
+
+    def test_api_list_and_retrieve(self, async_client):
+        recipe = RecipeFactory.create(moderation_status="approved")
+        RecipeFactory.create(moderation_status="in_process")
+
+        response = get(async_client, reverse("recipe-list"))
+        assert response.status_code == 200
+        assert [item["slug"] for item in response.json()["results"]] == [recipe.slug]
+
+        response = get(
+            async_client, reverse("recipe-detail", kwargs={"slug": recipe.slug})
+        )
+        assert response.status_code == 200
+        assert response.json()["slug"] == recipe.slug
+
+    def test_api_ndjson_is_streamed_not_buffered(self, async_client, users_list):
+        user = users_list["first_simple_user"]
+        recipes = RecipeFactory.create_batch(5, user=user, moderation_status="approved")
+
+        with patch.object(RecipeViewSet, "stream_chunk_size", 2):
+            response = get(
+                async_client, reverse("recipe-my-recipes") + "?format=ndjson"
+            )
+            assert response.is_async
+            chunks = read_chunks(response)
+
+        assert len(chunks) == 3
+        lines = b"".join(chunks).decode().splitlines()
+        assert [json.loads(line)["slug"] for line in lines] == [
+            recipe.slug for recipe in recipes
+        ]
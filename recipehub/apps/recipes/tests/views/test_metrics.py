@@ -0,0 +1,119 @@
+import fakeredis
+import pytest
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+
+from recipehub.apps.recipes.utils import clear_local_best_recipes, get_best_recipes
+from recipehub.apps.users.tasks import send_welcome_mail
+from recipehub.redis import InstrumentedRedis
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """Tests for the Prometheus instrumentation and /metrics"""
+
+    def test_requests_are_observed_by_url_name(self, client, users_list, fake_redis):
+        client.force_login(users_list["first_simple_user"])
+        labels = {"view": "recipes:recipes-list", "method": "GET", "status": "200"}
+        before = sample("recipehub_request_duration_seconds_count", **labels)
+        queries_before = sample(
+            "recipehub_request_db_queries_sum", view="recipes:recipes-list"
+        )
+
+        client.get(reverse("recipes:recipes-list"))
+
+        assert sample("recipehub_request_duration_seconds_count", **labels) == (
+            before + 1
+        )
+        assert (
+            sample("recipehub_request_db_queries_sum", view="recipes:recipes-list")
+            > queries_before
+        )
+
+    def test_redis_commands_are_observed(self):
+        server = fakeredis.FakeServer()
+        client = InstrumentedRedis(
+            connection_pool=fakeredis.FakeStrictRedis(server=server).connection_pool
+        )
+        before = sample("recipehub_redis_command_duration_seconds_count", command="SET")
+        pipelines = sample(
+            "recipehub_redis_command_duration_seconds_count", command="PIPELINE"
+        )
+
+        client.set("key", 1)
+        client.pipeline().get("key").incr("key").execute()
+
+        assert sample(
+            "recipehub_redis_command_duration_seconds_count", command="SET"
+        ) == (before + 1)
+        assert sample(
+            "recipehub_redis_command_duration_seconds_count", command="PIPELINE"
+        ) == (pipelines + 1)
+
+    def test_best_recipes_hits_and_misses(self, fake_redis, monkeypatch):
+        monkeypatch.setattr("recipehub.apps.recipes.utils.r", fake_redis)
+        clear_local_best_recipes()
+        hits = sample(
+            "recipehub_cache_requests_total", cache="best_recipes_local", result="hit"
+        )
+        misses = sample(
+            "recipehub_cache_requests_total", cache="best_recipes_local", result="miss"
+        )
+
+        get_best_recipes()
+        get_best_recipes()
+
+        assert sample(
+            "recipehub_cache_requests_total", cache="best_recipes_local", result="miss"
+        ) == (misses + 1)
+        assert sample(
+            "recipehub_cache_requests_total", cache="best_recipes_local", result="hit"
+        ) == (hits + 1)
+
+    def test_task_durations_are_observed(self, settings):
+        settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+        labels = {"task": send_welcome_mail.name, "state": "SUCCESS"}
+        before = sample("recipehub_celery_task_duration_seconds_count", **labels)
+
+        send_welcome_mail.apply(args=["cook", "cook@example.com"])
+
+        assert sample("recipehub_celery_task_duration_seconds_count", **labels) == (
+            before + 1
+        )
+
+    def test_metrics_endpoint(self, client):
+        response = client.get(reverse("metrics"))
+
+        assert response.status_code == 200
+        assert b"recipehub_request_duration_seconds" in response.content
+
+    def test_metrics_endpoint_merges_container_directories(
+        self, client, tmp_path, monkeypatch
+    ):
+        key = mmap_key(
+            "recipehub_emails_total",
+            "recipehub_emails_total",
+            ["result"],
+            ["sent"],
+            "Emails handed to SMTP by send_queued_emails",
+        )
+        for container, sent in (("web", 2), ("celery", 3)):
+            (tmp_path / container).mkdir()
+            # Same PID in both containers
+            samples = MmapedDict(str(tmp_path / container / "counter_7.db"))
+            samples.write_value(key, sent, 0)
+            samples.close()
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path / "web"))
+        monkeypatch.setenv(
+            "PROMETHEUS_EXTRA_MULTIPROC_DIRS",
+            f"{tmp_path / 'celery'}:{tmp_path / 'missing'}",
+        )
+
+        response = client.get(reverse("metrics"))
+
+        assert b'recipehub_emails_total{result="sent"} 5.0' in response.content
@@ -0,0 +1,32 @@
+import pytest
+from django.urls import reverse
+
+from recipehub.factories import RecipeFactory
+
+
+@pytest.mark.django_db
+class TestRecipeListCursorPagination:
+    """Tests for the opt-in keyset pagination on the recipe list"""
+
+    def test_recipe_list_cursor_pages(self, client):
+        recipes = RecipeFactory.create_batch(5, moderation_status="approved")
+        RecipeFactory.create(moderation_status="rejected")
+        newest_first = [recipe.slug for recipe in reversed(recipes)]
+
+        response = client.get(reverse("recipes:recipes-list") + "?pagination=cursor")
+        assert response.status_code == 200
+        assert [r.slug for r in response.context["recipes"]] == newest_first[:2]
+        assert response.context["previous_page_url"] is None
+
+        seen = []
+        next_url = reverse("recipes:recipes-list") + "?pagination=cursor"
+        while next_url:
+            response = client.get(next_url)
+            seen += [r.slug for r in response.context["recipes"]]
+            next_url = response.context["next_page_url"]
+
+        assert seen == newest_first
+
+    def test_recipe_list_invalid_cursor(self, client):
+        response = client.get(reverse("recipes:recipes-list") + "?cursor=not-a-cursor")
+        assert response.status_code == 404
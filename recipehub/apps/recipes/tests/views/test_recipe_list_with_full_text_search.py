@@ -43,3 +43,23 @@ class TestRecipeListFullTextSearch:
         assert response.status_code == 200
         assert len(search_recipes_page) == 1
         assert vareniki_recipe in search_recipes_page
+
+    def test_recipe_list_search_ranking(self, client, users_list):
+        # Name matches are weighted above recipe text matches
+        name_match = RecipeFactory.create(
+            user=users_list["first_simple_user"],
+            name="Salmon",
+            moderation_status="approved",
+        )
+        # Newer recipe, so it would come first without ranking
+        text_match = RecipeFactory.create(
+            user=users_list["recipe_owner_user"],
+            name="Pie",
+            recipe_text="Serve with salmon",
+            moderation_status="approved",
+        )
+
+        response = client.get(reverse("recipes:recipes-list") + "?search=salmon")
+        search_recipes_page = response.context["recipes"]
+        assert response.status_code == 200
+        assert list(search_recipes_page) == [name_match, text_match]
@@ -0,0 +1,93 @@
+import time
+from typing import Any
+
+from django.apps import apps
+
+from recipehub.apps.recipes.similarity import order_like
+from recipehub.redis import LuaScript, r
+
+TRENDING_KEY = "recipes:trending"
+# Time the scores in TRENDING_KEY are relative to
+TRENDING_EPOCH_KEY = "recipes:trending:epoch"
+# A view, favorite or review counts half as much after this long
+TRENDING_HALF_LIFE = 60 * 60 * 12
+# Only the top of the leaderboard is kept, so updates and reads cost
+# the same whatever the size of the catalogue
+TRENDING_SIZE = 500
+TRENDING_LIMIT = 10
+
+# A user's engagement with a recipe counts once in this window, by then
+# the earlier event weighs 2^-14 of a new one
+TRENDING_ONCE_TTL = TRENDING_HALF_LIFE * 14
+
+TRENDING_VIEW_WEIGHT = 1
+TRENDING_FAVORITE_WEIGHT = 5
+TRENDING_REVIEW_WEIGHT = 3
+
+# KEYS: trending sorted set, epoch key, optional once key
+# ARGV: now, half-life, kept size, once key TTL, then recipe id and
+# weight pairs
+# Instead of decaying every score, new events are added with a weight
+# that doubles every half-life since the epoch. Once the weights grow
+# too large the whole set is scaled down once and the epoch moves.
+BUMP_TRENDING_LUA = """
+if KEYS[3] and not redis.call("SET", KEYS[3], 1, "NX", "EX", ARGV[4]) then
+    return
+end
+local now = tonumber(ARGV[1])
+local half_life = tonumber(ARGV[2])
+local epoch = tonumber(redis.call("GET", KEYS[2]))
+if not epoch then
+    epoch = now
+    redis.call("SET", KEYS[2], ARGV[1])
+end
+local age = (now - epoch) / half_life
+if age > 64 then
+    redis.call("ZUNIONSTORE", KEYS[1], 1, KEYS[1], "WEIGHTS", tostring(2 ^ -age))
+    redis.call("SET", KEYS[2], ARGV[1])
+    age = 0
+end
+local factor = 2 ^ age
+for i = 5, #ARGV, 2 do
+    redis.call("ZINCRBY", KEYS[1], tostring(tonumber(ARGV[i + 1]) * factor), ARGV[i])
+end
+redis.call("ZREMRANGEBYRANK", KEYS[1], 0, -tonumber(ARGV[3]) - 1)
+"""
+bump_trending_script = LuaScript(BUMP_TRENDING_LUA)
+
+
+def bump_trending(
+    weights: dict[int, float], now: float | None = None, once_key: str | None = None
+) -> None:
+    """
+    Adds engagement to the leaderboard, one round trip for any number
+    of recipes. With once_key the bump is skipped while that key exists.
+    """
+    if not weights:
+        return
+    keys = [TRENDING_KEY, TRENDING_EPOCH_KEY]
+    if once_key:
+        keys.append(once_key)
+    args = [now or time.time(), TRENDING_HALF_LIFE, TRENDING_SIZE, TRENDING_ONCE_TTL]
+    for recipe_id, weight in weights.items():
+        args += [recipe_id, weight]
+    bump_trending_script(keys=keys, args=args, client=r)
+
+
+def get_trending_ids(limit: int = TRENDING_LIMIT) -> list[int]:
+    return [int(i) for i in r.zrevrange(TRENDING_KEY, 0, limit - 1)]
+
+
+def get_trending_recipes(limit: int = TRENDING_LIMIT) -> list[Any]:
+    """
+    The approved recipes on top of the leaderboard, in order.
+    Twice the limit is read so a few pending recipes don't leave gaps.
+    """
+    Recipe = apps.get_model("recipes", "Recipe")
+    recipe_ids = get_trending_ids(limit * 2)
+    if not recipe_ids:
+        return []
+    recipes = Recipe.objects.select_related("user").filter(
+        pk__in=recipe_ids, moderation_status="approved"
+    )
+    return order_like(recipes, recipe_ids)[:limit]
@@ -1,13 +1,35 @@
 import os
+import re
+import time
 import uuid
+from collections.abc import Callable
+from io import BytesIO
 
+from PIL import Image, ImageOps
 from django.utils.text import slugify
 from typing import Any
 from django.core.exceptions import ValidationError
 from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Length
 
 from django.apps import apps
-from recipehub.redis import r
+from recipehub.apps.recipes.recommendations import RECOMMENDATIONS_DIRTY_KEY
+from recipehub.apps.recipes.trending import TRENDING_FAVORITE_WEIGHT, bump_trending
+from recipehub.metrics import record_cache
+from recipehub.redis import LuaScript, r
 
 
 def valid_extension(filename: str) -> str:
@@ -24,17 +46,180 @@ def reformate_ingredients(raw_ingredients: str) -> list[str]:
     return [i.strip() for i in raw_ingredients.strip().split(",")]
 
 
+def parse_ingredients(raw_ingredients: str) -> dict[str, str]:
+    """
+    Parses "name - quantity" lines into {name: quantity}.
+    Lenient with legacy free text: lines without a quantity and
+    comma separated names are accepted.
+    """
+    parsed = {}
+    for line in raw_ingredients.splitlines():
+        names, _, quantity = line.partition("-")
+        quantity = quantity.strip()[:255]
+        for name in names.split(","):
+            name = " ".join(name.split()).lower()[:100]
+            if not name:
+                continue
+            if parsed.get(name) and quantity:
+                parsed[name] = f"{parsed[name]}, {quantity}"[:255]
+            elif not parsed.get(name):
+                parsed[name] = quantity
+    return parsed
+
+
+def sync_recipe_ingredients(recipes: list[Any]) -> None:
+    """
+    Rebuilds the RecipeIngredient rows and ingredients_count of the given
+    recipes from their ingredients text
+    """
+    Recipe = apps.get_model("recipes", "Recipe")
+    Ingredient = apps.get_model("recipes", "Ingredient")
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+
+    parsed = {recipe.pk: parse_ingredients(recipe.ingredients) for recipe in recipes}
+    names = {name for items in parsed.values() for name in items}
+
+    Ingredient.objects.bulk_create(
+        [Ingredient(name=name) for name in names], ignore_conflicts=True
+    )
+    ingredient_ids = dict(
+        Ingredient.objects.filter(name__in=names).values_list("name", "id")
+    )
+
+    RecipeIngredient.objects.filter(recipe_id__in=parsed).delete()
+    RecipeIngredient.objects.bulk_create(
+        [
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_ids[name],
+                quantity=quantity,
+            )
+            for recipe_id, items in parsed.items()
+            for name, quantity in items.items()
+        ]
+    )
+
+    for recipe in recipes:
+        recipe.ingredients_count = len(parsed[recipe.pk])
+    Recipe.objects.bulk_update(recipes, ["ingredients_count"])
+
+
+def filter_by_ingredients(queryset: QuerySet, ingredients: list[str]) -> QuerySet:
+    """
+    Filters recipes using any of the ingredients and annotates how many of
+    them are matched and how many more ingredients each recipe needs.
+    Terms are resolved to canonical Ingredient rows, tolerating slight
+    misspellings, and counted over the RecipeIngredient index in one GROUP BY.
+    """
+    terms = list(dict.fromkeys(i.strip().lower() for i in ingredients if i.strip()))
+    if not terms:
+        return queryset.annotate(
+            matched_ingredients=Value(0), missing_ingredients=F("ingredients_count")
+        )
+
+    Ingredient = apps.get_model("recipes", "Ingredient")
+    q = Q()
+    for term in terms:
+        q |= Q(name=term) | Q(name__trigram_word_similar=term)
+
+    return queryset.filter(
+        recipe_ingredients__ingredient__in=Ingredient.objects.filter(q)
+    ).annotate(
+        matched_ingredients=Count("recipe_ingredients"),
+        missing_ingredients=F("ingredients_count") - Count("recipe_ingredients"),
+    )
+
+
+def annotate_user_state(
+    queryset: QuerySet, user: Any, favorites: bool = True
+) -> QuerySet:
+    """
+    Annotates is_favorited and my_rating for the given user as correlated
+    subqueries, so they come with the page instead of a query per recipe.
+    The average rating and review count come from the denormalized columns.
+    """
+    if not user.is_authenticated:
+        queryset = queryset.annotate(my_rating=Value(None, output_field=FloatField()))
+        if favorites:
+            queryset = queryset.annotate(is_favorited=Value(False))
+        return queryset
+
+    Review = apps.get_model("reviews", "Review")
+    UserRecipeFavorite = apps.get_model("users", "UserRecipeFavorite")
+
+    queryset = queryset.annotate(
+        my_rating=Subquery(
+            Review.objects.filter(recipe=OuterRef("pk"), user=user).values("rating")[:1]
+        )
+    )
+    if favorites:
+        queryset = queryset.annotate(
+            is_favorited=Exists(
+                UserRecipeFavorite.objects.filter(recipe=OuterRef("pk"), user=user)
+            )
+        )
+    return queryset
+
+
 def generate_unique_slug(instance: Any, slugify_value: str) -> str:
     """
-    Generates a unique slug without collisions
+    Generates a unique slug without collisions.
+    Takes the next suffix after the highest one in use, in a single query.
+    Suffixes are compared by length and then as text rather than cast to
+    a number, so a name ending in a huge number can't overflow the query.
     """
     base_slug = slugify(slugify_value)
-    slug = base_slug
-    counter = 1
-    while instance.__class__.objects.filter(slug=slug).exclude(pk=instance.pk).exists():
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-    return slug
+    highest_slug = (
+        instance.__class__.objects.filter(
+            slug__startswith=base_slug,
+            slug__regex=rf"^{re.escape(base_slug)}(-[1-9][0-9]*)?$",
+        )
+        .exclude(pk=instance.pk)
+        .order_by(Length("slug").desc(), "-slug")
+        .values_list("slug", flat=True)
+        .first()
+    )
+    if highest_slug is None:
+        return base_slug
+    highest_suffix = int(highest_slug[len(base_slug) + 1 :] or 0)
+    return f"{base_slug}-{highest_suffix + 1}"
+
+
+SLUG_SAVE_ATTEMPTS = 5
+
+
+def save_with_unique_slug(
+    instance: Any, slugify_value: str, save: Callable[[], None]
+) -> None:
+    """
+    Runs save() with a freshly generated slug, generating it again
+    when a concurrent save took the same slug first
+    """
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        instance.slug = generate_unique_slug(instance, slugify_value)
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            slug_taken = (
+                instance.__class__.objects.filter(slug=instance.slug)
+                .exclude(pk=instance.pk)
+                .exists()
+            )
+            if not slug_taken or attempt == SLUG_SAVE_ATTEMPTS - 1:
+                raise
+
+
+RATING_STARS = range(1, 6)
+
+
+def rating_histogram_field(rating: float) -> str:
+    """
+    Returns the Recipe histogram column for a rating, rounding half up
+    """
+    star = min(max(int(rating + 0.5), RATING_STARS[0]), RATING_STARS[-1])
+    return f"rating_{star}_count"
 
 
 def user_photo_upload_to(instance: Any, filename: str) -> str:
@@ -53,6 +238,39 @@ def recipe_photo_upload_to(instance: Any, filename: str) -> str:
     return f"recipes/{instance.user.username}/{uuid.uuid4()}{ext}"
 
 
+PHOTO_VARIANT_WIDTHS = (320, 640, 960)
+PHOTO_VARIANT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+
+def generate_photo_variants(photo: Any) -> dict[str, dict[str, str]]:
+    """
+    Saves resized WebP and JPEG copies of the photo next to the original.
+    Returns storage names keyed by format and width, never upscales.
+    """
+    with photo.open("rb"), Image.open(photo) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    root = os.path.splitext(photo.name)[0]
+    widths = sorted({min(width, image.width) for width in PHOTO_VARIANT_WIDTHS})
+    variants = {ext: {} for ext in PHOTO_VARIANT_FORMATS}
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for ext, image_format in PHOTO_VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, format=image_format, quality=80)
+            variants[ext][str(width)] = photo.storage.save(
+                f"{root}-{width}w.{ext}", ContentFile(buffer.getvalue())
+            )
+    return variants
+
+
+def photo_variant_names(variants: dict[str, dict[str, str]]) -> list[str]:
+    return sorted(
+        {name for by_width in variants.values() for name in by_width.values()}
+    )
+
+
 def validate_ingredients_format(value: str) -> str:
     value = value.strip()
     if not value:
@@ -81,26 +299,271 @@ def validate_ingredients_format(value: str) -> str:
     return "\n".join(normalized_lines)
 
 
+RECIPE_VIEWS_PENDING_KEY = "recipe:views:pending"
+
+# KEYS: per-user dedupe key, recipe total key, pending deltas hash
+# ARGV: recipe id, persisted Recipe.view_count
+RECORD_RECIPE_VIEW_LUA = """
+local counted = redis.call("SET", KEYS[1], 1, "NX")
+if counted then
+    redis.call("HINCRBY", KEYS[3], ARGV[1], 1)
+end
+local total = redis.call("GET", KEYS[2])
+if not total then
+    local pending = redis.call("HGET", KEYS[3], ARGV[1]) or 0
+    total = tonumber(ARGV[2]) + tonumber(pending)
+    redis.call("SET", KEYS[2], total)
+elseif counted then
+    total = redis.call("INCR", KEYS[2])
+end
+return tonumber(total)
+"""
+record_recipe_view = LuaScript(RECORD_RECIPE_VIEW_LUA)
+
+
+BEST_RECIPES_CACHE_KEY = "recipes:best"
+BEST_RECIPES_LOCK_KEY = "recipes:best:lock"
+# Shared copy is refreshed after FRESH_FOR but served stale until STALE_FOR
+BEST_RECIPES_FRESH_FOR = 60 * 10
+BEST_RECIPES_STALE_FOR = 60 * 60
+# In-process copy in front of the shared one
+BEST_RECIPES_LOCAL_TTL = 15
+
+_best_recipes_local = {"recipes": None, "expires_at": 0.0}
+
+
+def _load_best_recipes() -> list[Any]:
+    Recipe = apps.get_model("recipes", "Recipe")
+
+    top_ids = [int(i) for i in r.zrevrange("recipe:ratings", 0, 3)]
+    if not top_ids:
+        return []
+
+    recipes = Recipe.objects.select_related("user").filter(id__in=top_ids)
+    recipe_map = {recipe.id: recipe for recipe in recipes}
+    best_recipes = [recipe_map[i] for i in top_ids if i in recipe_map]
+
+    cache.set(
+        BEST_RECIPES_CACHE_KEY,
+        {"recipes": best_recipes, "fresh_until": time.time() + BEST_RECIPES_FRESH_FOR},
+        BEST_RECIPES_STALE_FOR,
+    )
+    return best_recipes
+
+
 def get_best_recipes() -> list[Any]:
     """
     Returns top 4 rated recipes from Redis.
+    Served from a short-lived in-process copy, then from the shared cache.
+    When the shared copy goes stale one worker refreshes it under a lock
+    while the others keep serving the stale value.
     """
+    now = time.monotonic()
+    local_hit = (
+        _best_recipes_local["recipes"] is not None
+        and _best_recipes_local["expires_at"] > now
+    )
+    record_cache("best_recipes_local", local_hit)
+    if local_hit:
+        return _best_recipes_local["recipes"]
 
-    Recipe = apps.get_model("recipes", "Recipe")
+    cached = cache.get(BEST_RECIPES_CACHE_KEY)
+    record_cache("best_recipes", cached is not None)
+    if cached is None:
+        best_recipes = _load_best_recipes()
+    elif cached["fresh_until"] <= time.time() and cache.add(
+        BEST_RECIPES_LOCK_KEY, 1, timeout=30
+    ):
+        try:
+            best_recipes = _load_best_recipes()
+        finally:
+            cache.delete(BEST_RECIPES_LOCK_KEY)
+    else:
+        best_recipes = cached["recipes"]
 
-    best_recipes = cache.get("best_recipes")
-    if not best_recipes:
-        top_ids = r.zrevrange("recipe:ratings", 0, 3)
+    _best_recipes_local.update(
+        recipes=best_recipes, expires_at=now + BEST_RECIPES_LOCAL_TTL
+    )
+    return best_recipes
 
-        if not top_ids:
-            return []
 
-        top_ids = [int(i) for i in top_ids]
-        recipes = Recipe.objects.filter(id__in=top_ids)
+def invalidate_best_recipes() -> None:
+    """
+    Marks the shared copy stale and drops the in-process one. The next
+    reader refreshes it under the lock while the others keep serving the
+    stale list. Other processes pick up the change once their in-process
+    copy expires.
+    """
+    cached = cache.get(BEST_RECIPES_CACHE_KEY)
+    if cached is not None:
+        cache.set(
+            BEST_RECIPES_CACHE_KEY,
+            {**cached, "fresh_until": 0},
+            BEST_RECIPES_STALE_FOR,
+        )
+    clear_local_best_recipes()
 
-        recipe_map = {recipe.id: recipe for recipe in recipes}
-        best_recipes = [recipe_map[i] for i in top_ids if i in recipe_map]
 
-        cache.set("best_recipes", best_recipes, 60 * 10)
+def clear_local_best_recipes() -> None:
+    _best_recipes_local.update(recipes=None, expires_at=0.0)
 
-    return best_recipes
+
+# Rendered comment pages of a recipe are cached under a per-recipe version,
+# replacing the version drops every cached page at once
+RECIPE_COMMENTS_CACHE_TTL = 60 * 10
+
+
+def recipe_comments_version_key(recipe_id: int) -> str:
+    return f"recipe:{recipe_id}:comments:version"
+
+
+async def aget_recipe_comments_version(recipe_id: int) -> str:
+    key = recipe_comments_version_key(recipe_id)
+    version = await cache.aget(key)
+    record_cache("recipe_comments_version", version is not None)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def invalidate_recipe_comments(recipe_id: int) -> None:
+    cache.set(recipe_comments_version_key(recipe_id), uuid.uuid4().hex, timeout=None)
+
+
+# Mirror of each user's favorite recipe IDs, warmed from the database on
+# first use. The 0 member marks a warmed set, so users without favorites
+# are not reloaded on every request.
+USER_FAVORITES_TTL = 60 * 60 * 24
+USER_FAVORITES_WARM_MARKER = 0
+# SADD takes the members of a warm-up in chunks, unpack() has a stack limit
+USER_FAVORITES_WARM_CHUNK = 1000
+
+# KEYS: user favorites set, its generation
+# ARGV: recipe ids
+# Returns the flags, or the generation to warm with while the set
+# has not been warmed yet
+FAVORITE_FLAGS_LUA = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return redis.call("GET", KEYS[2]) or "0"
+end
+return redis.call("SMISMEMBER", KEYS[1], unpack(ARGV))
+"""
+favorite_flags = LuaScript(FAVORITE_FLAGS_LUA)
+
+# KEYS: user favorites set, its generation, users with stale recommendations
+# ARGV: SADD or SREM, recipe id, user id, generation TTL
+# A set that is not warmed is left alone, it is loaded whole on first read.
+# Its generation moves instead, so a warm-up that read the database
+# before this change doesn't store the outdated set.
+UPDATE_FAVORITES_LUA = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    redis.call(ARGV[1], KEYS[1], ARGV[2])
+else
+    redis.call("INCR", KEYS[2])
+    redis.call("EXPIRE", KEYS[2], ARGV[4])
+end
+redis.call("SADD", KEYS[3], ARGV[3])
+"""
+update_favorites = LuaScript(UPDATE_FAVORITES_LUA)
+
+# KEYS: user favorites set, its generation
+# ARGV: generation read before the database, TTL, chunk size, recipe ids
+# Stores nothing when the set was warmed or changed in the meantime
+WARM_USER_FAVORITES_LUA = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    return 0
+end
+if (redis.call("GET", KEYS[2]) or "0") ~= ARGV[1] then
+    return 0
+end
+local chunk = tonumber(ARGV[3])
+for i = 4, #ARGV, chunk do
+    redis.call("SADD", KEYS[1], unpack(ARGV, i, math.min(i + chunk - 1, #ARGV)))
+end
+redis.call("EXPIRE", KEYS[1], ARGV[2])
+return 1
+"""
+warm_user_favorites = LuaScript(WARM_USER_FAVORITES_LUA)
+
+
+def user_favorites_key(user_id: int) -> str:
+    return f"user:{user_id}:favorites"
+
+
+def user_favorites_generation_key(user_id: int) -> str:
+    return f"user:{user_id}:favorites:generation"
+
+
+async def awarm_user_favorites(user_id: int, generation: bytes | str) -> set[int]:
+    """
+    Loads the user's favorites from the database and stores them unless
+    a favorite was saved or removed since the generation was read
+    """
+    UserRecipeFavorite = apps.get_model("users", "UserRecipeFavorite")
+
+    recipe_ids = {
+        recipe_id
+        async for recipe_id in UserRecipeFavorite.objects.filter(
+            user_id=user_id
+        ).values_list("recipe_id", flat=True)
+    }
+    await warm_user_favorites.acall(
+        keys=[user_favorites_key(user_id), user_favorites_generation_key(user_id)],
+        args=[
+            generation,
+            USER_FAVORITES_TTL,
+            USER_FAVORITES_WARM_CHUNK,
+            USER_FAVORITES_WARM_MARKER,
+            *recipe_ids,
+        ],
+    )
+    return recipe_ids
+
+
+async def aget_favorited_ids(user: Any, recipe_ids: list[int]) -> set[int]:
+    """
+    Returns which of the given recipes the user has in favorites,
+    with a single SMISMEMBER once the user's set is warmed
+    """
+    if not user.is_authenticated or not recipe_ids:
+        return set()
+
+    flags = await favorite_flags.acall(
+        keys=[user_favorites_key(user.id), user_favorites_generation_key(user.id)],
+        args=recipe_ids,
+    )
+    warmed = isinstance(flags, list)
+    record_cache("user_favorites", warmed)
+    if not warmed:
+        return await awarm_user_favorites(user.id, flags) & set(recipe_ids)
+    return {recipe_id for recipe_id, flag in zip(recipe_ids, flags) if flag}
+
+
+def add_user_favorite(user_id: int, recipe_id: int) -> None:
+    update_favorites(
+        keys=[
+            user_favorites_key(user_id),
+            user_favorites_generation_key(user_id),
+            RECOMMENDATIONS_DIRTY_KEY,
+        ],
+        args=["SADD", recipe_id, user_id, USER_FAVORITES_TTL],
+        client=r,
+    )
+    # Saving the same recipe again after removing it is not new engagement
+    bump_trending(
+        {recipe_id: TRENDING_FAVORITE_WEIGHT},
+        once_key=f"user:{user_id}:recipe:{recipe_id}:favorited",
+    )
+
+
+def remove_user_favorite(user_id: int, recipe_id: int) -> None:
+    update_favorites(
+        keys=[
+            user_favorites_key(user_id),
+            user_favorites_generation_key(user_id),
+            RECOMMENDATIONS_DIRTY_KEY,
+        ],
+        args=["SREM", recipe_id, user_id, USER_FAVORITES_TTL],
+        client=r,
+    )
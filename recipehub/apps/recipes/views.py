@@ -1,30 +1,76 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.contrib.postgres.search import SearchVector
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.core.paginator import Paginator
-from django.db.models import Q
-from django.db.models.aggregates import Avg
-from django.http import JsonResponse
-from django.shortcuts import render, redirect, get_object_or_404
+from django.db.models import F
+from django.http import Http404, JsonResponse
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
+from django.template.response import TemplateResponse
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import ListView
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
 
+from recipehub.apps.recipes.api.pagination import (
+    RecipeCursorPagination,
+    wants_cursor_pagination,
+)
 from recipehub.apps.recipes.decorators import require_post_json
 from recipehub.apps.recipes.forms import RecipeForm
-from recipehub.apps.recipes.models import Recipe
-from recipehub.apps.recipes.utils import reformate_ingredients
-from recipehub.apps.reviews.models import Review, Comment
+from recipehub.apps.recipes.models import Recipe, SEARCH_CONFIG
+from recipehub.apps.recipes.utils import (
+    add_user_favorite,
+    aget_favorited_ids,
+    aget_recipe_comments_version,
+    annotate_user_state,
+    filter_by_ingredients,
+    remove_user_favorite,
+    record_recipe_view,
+    reformate_ingredients,
+    RECIPE_COMMENTS_CACHE_TTL,
+    RECIPE_VIEWS_PENDING_KEY,
+)
+from recipehub.apps.recipes.similarity import (
+    aget_similar_recipe_ids,
+    order_like,
+    similar_recipes_queryset,
+)
+from recipehub.apps.recipes.trending import get_trending_recipes
+from recipehub.apps.reviews.models import Comment
 from recipehub.apps.users.models import UserRecipeFavorite
-from recipehub.redis import r
 
 
 def index(request):
-    return render(request, "recipes/index.html", context={"home_active": True})
+    return render(
+        request,
+        "recipes/index.html",
+        context={"home_active": True, "trending_recipes": get_trending_recipes()},
+    )
 
 
 class RecipesList(ListView):
+    """
+    Served natively async: the count, the page and the favorite flags are
+    awaited before the sync template rendering
+    """
+
     model = Recipe
     context_object_name = "recipes"
     paginate_by = 2
 
+    async def get(self, request, *args, **kwargs):
+        # Share the loaded user with the sync request.user the template uses
+        self.user = request.user = await request.auser()
+        self.object_list = self.get_queryset()
+        self.pagination = await self.apaginate_queryset(
+            self.object_list, self.get_paginate_by(self.object_list)
+        )
+        context = self.get_context_data()
+        context["favorited_ids"] = await aget_favorited_ids(
+            self.user, [recipe.pk for recipe in context["recipes"]]
+        )
+        return self.render_to_response(context)
+
     def get_queryset(self):
         ingredients = self.request.GET.getlist("ingredients")
         search_query = self.request.GET.get("search", "")
@@ -32,18 +78,20 @@ class RecipesList(ListView):
         queryset = Recipe.objects.filter(moderation_status="approved").select_related(
             "user", "category"
         )
+        # Favorite flags come from Redis, see get
+        queryset = annotate_user_state(queryset, self.user, favorites=False)
 
         if search_query:
-            queryset = queryset.annotate(
-                search=SearchVector("name")
-                + SearchVector("ingredients")
-                + SearchVector("recipe_text")
-            ).filter(search=search_query)
+            query = SearchQuery(search_query, config=SEARCH_CONFIG)
+            queryset = (
+                queryset.filter(search_vector=query)
+                .annotate(rank=SearchRank(F("search_vector"), query))
+                .order_by("-rank", "-created_at")
+            )
         elif ingredients:
-            q = Q()
-            for ing in ingredients:
-                q |= Q(ingredients__icontains=ing)
-            queryset = queryset.filter(q)
+            queryset = filter_by_ingredients(queryset, ingredients).order_by(
+                "-matched_ingredients", "missing_ingredients", "-created_at"
+            )
 
         return queryset
 
@@ -55,46 +103,95 @@ class RecipesList(ListView):
         else:
             context["page_header"] = "All Recipes"
         context["list_active"] = True
+        if self.uses_cursor_pagination():
+            paginator = context["paginator"]
+            context["next_page_url"] = paginator.get_next_link()
+            context["previous_page_url"] = paginator.get_previous_link()
+            context["is_paginated"] = bool(
+                context["next_page_url"] or context["previous_page_url"]
+            )
         return context
 
+    def uses_cursor_pagination(self) -> bool:
+        # Keyset pagination only applies to the default newest-first listing
+        return (
+            wants_cursor_pagination(self.request.GET)
+            and not self.request.GET.get("search")
+            and not self.request.GET.getlist("ingredients")
+        )
+
     def paginate_queryset(self, queryset, page_size):
+        # Already fetched in get
+        return self.pagination
+
+    async def apaginate_queryset(self, queryset, page_size):
+        if self.uses_cursor_pagination():
+            return await sync_to_async(self.paginate_by_cursor)(queryset, page_size)
+
         paginator = Paginator(queryset, page_size)
-        page = self.request.GET.get("page")
-        page_obj = paginator.get_page(page)
+        paginator.count = await queryset.acount()
+        page_obj = paginator.get_page(self.request.GET.get("page"))
+        page_obj.object_list = [recipe async for recipe in page_obj.object_list]
 
         return paginator, page_obj, page_obj.object_list, page_obj.has_other_pages()
 
+    def paginate_by_cursor(self, queryset, page_size):
+        paginator = RecipeCursorPagination()
+        paginator.page_size = page_size
+        try:
+            object_list = paginator.paginate_queryset(queryset, Request(self.request))
+        except NotFound:
+            raise Http404("Invalid cursor")
+        return paginator, None, object_list, True
+
 
 @login_required
-def recipe_detail(request, slug):
-    recipe = get_object_or_404(Recipe, slug=slug, moderation_status="approved")
-    average_rating = Review.objects.filter(recipe=recipe).aggregate(Avg("rating"))[
-        "rating__avg"
-    ]
-    redis_user_recipe_view_key = f"user:{request.user.id}:recipe:{recipe.id}:view"
+async def recipe_detail(request, slug):
+    user = request.user = await request.auser()
+    recipe = await aget_object_or_404(
+        Recipe.objects.select_related("user", "category"),
+        slug=slug,
+        moderation_status="approved",
+    )
+    average_rating = recipe.average_rating
+    redis_user_recipe_view_key = f"user:{user.id}:recipe:{recipe.id}:view"
     redis_all_recipe_view_key = f"recipe:{recipe.id}:views"
 
-    if not r.exists(redis_user_recipe_view_key):
-        r.set(redis_user_recipe_view_key, 1)
-        r.incr(redis_all_recipe_view_key)
-    is_favorited = UserRecipeFavorite.objects.filter(
-        user=request.user, recipe=recipe
-    ).exists()
-    comments = Comment.objects.filter(recipe=recipe, active=True)
+    # Dedupe, increment and read in one round trip. Deltas are flushed
+    # to Recipe.view_count by the flush_recipe_views task
+    recipe_views = await record_recipe_view.acall(
+        keys=[
+            redis_user_recipe_view_key,
+            redis_all_recipe_view_key,
+            RECIPE_VIEWS_PENDING_KEY,
+        ],
+        args=[recipe.id, recipe.view_count],
+    )
+    is_favorited = recipe.id in await aget_favorited_ids(user, [recipe.id])
+    # Precomputed by the rebuild_similar_recipes task
+    similar_ids = await aget_similar_recipe_ids(recipe.id)
+    similar_recipes = []
+    if similar_ids:
+        similar_recipes = order_like(
+            [similar async for similar in similar_recipes_queryset(similar_ids)],
+            similar_ids,
+        )
+    comments = Comment.objects.select_related("user").filter(recipe=recipe, active=True)
 
     if request.method == "POST":
         body = request.POST.get("body", "").strip()
         if body:
-            Comment.objects.create(user=request.user, recipe=recipe, body=body)
+            await Comment.objects.acreate(user=user, recipe=recipe, body=body)
             return redirect("recipes:recipe-detail", slug=slug)
 
+    # The comments block is a cached fragment, so the page and its COUNT
+    # are only evaluated when the fragment has to be rendered
     paginator = Paginator(comments, 5)
-    page_number = request.GET.get("page")
-    comments_page = paginator.get_page(page_number)
-
-    recipe_views = int(r.get(redis_all_recipe_view_key) or 0)
+    page_number = request.GET.get("page", "")
+    comments_page = SimpleLazyObject(lambda: paginator.get_page(page_number))
 
-    return render(
+    # Rendered after the view returns, in a thread like any sync code
+    return TemplateResponse(
         request,
         "recipes/recipe_detail.html",
         {
@@ -102,7 +199,11 @@ def recipe_detail(request, slug):
             "average_rating": average_rating,
             "is_favorited": is_favorited,
             "comments": comments_page,
+            "comments_page_number": page_number if page_number.isdigit() else "1",
+            "comments_version": await aget_recipe_comments_version(recipe.id),
+            "comments_cache_ttl": RECIPE_COMMENTS_CACHE_TTL,
             "views": recipe_views,
+            "similar_recipes": similar_recipes,
         },
     )
 
@@ -134,7 +235,11 @@ def save_recipe(request):
     if not slug:
         return JsonResponse({"error": "Missing fields"}, status=400)
 
-    recipe = get_object_or_404(Recipe, slug=slug, moderation_status="approved")
+    recipe = get_object_or_404(
+        Recipe.objects.select_related("user", "category"),
+        slug=slug,
+        moderation_status="approved",
+    )
 
     favorite, created = UserRecipeFavorite.objects.get_or_create(
         user=request.user, recipe=recipe
@@ -142,8 +247,10 @@ def save_recipe(request):
 
     if not created:
         favorite.delete()
+        remove_user_favorite(request.user.id, recipe.id)
         new_status = False
     else:
+        add_user_favorite(request.user.id, recipe.id)
         new_status = True
 
     return JsonResponse(
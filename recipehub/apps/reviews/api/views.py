@@ -1,12 +1,14 @@
 from rest_framework.request import Request
 
 from django.db import transaction
+from django.http import HttpResponseBase
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, BasePermission
 from rest_framework.response import Response
 
 import recipehub.api_permissions as custom_permissions
+from recipehub.api_streaming import PaginatedStreamMixin, STREAMING_RENDERER_CLASSES
 from recipehub.apps.reviews.api.serializers import (
     ReviewSerializer,
     CommentSerializer,
@@ -17,7 +19,7 @@ from recipehub.apps.reviews.models import Review, Comment
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
-    queryset = Review.objects.all().order_by("pk")
+    queryset = Review.objects.select_related("user").order_by("pk")
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -39,7 +41,11 @@ class ReviewViewSet(viewsets.ModelViewSet):
         if request.user.is_staff:
             queryset = self.filter_queryset(self.get_queryset()).order_by("pk")
         else:
-            queryset = Review.objects.filter(user=request.user).order_by("pk")
+            queryset = (
+                Review.objects.select_related("user")
+                .filter(user=request.user)
+                .order_by("pk")
+            )
 
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -71,8 +77,8 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all().order_by("pk")
+class CommentViewSet(PaginatedStreamMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.select_related("user").order_by("pk")
     serializer_class = CommentSerializer
 
     def get_serializer_class(self) -> type[CommentSerializer | CommentAdminSerializer]:
@@ -107,11 +113,15 @@ class CommentViewSet(viewsets.ModelViewSet):
         methods=["get"],
         url_path="my-comments",
         permission_classes=[IsAuthenticated],
+        renderer_classes=STREAMING_RENDERER_CLASSES,
     )
-    def my_comments(self, request: Request) -> Response:
-        comments = Comment.objects.filter(user=self.request.user).order_by("pk")
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    def my_comments(self, request: Request) -> HttpResponseBase:
+        comments = (
+            Comment.objects.select_related("user")
+            .filter(user=self.request.user)
+            .order_by("pk")
+        )
+        return self.paginated_or_streamed(comments, CommentSerializer)
 
     @action(
         detail=True,
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ReviewsConfig(AppConfig):
     name = "recipehub.apps.reviews"
+
+    def ready(self):
+        import recipehub.apps.reviews.signals  # noqa: F401
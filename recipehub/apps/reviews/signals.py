@@ -0,0 +1,71 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.utils import (
+    invalidate_recipe_comments,
+    rating_histogram_field,
+)
+from recipehub.apps.reviews.models import Comment, Review
+
+
+def apply_rating(recipe_id: int, rating: float, sign: int) -> None:
+    """
+    Adds (sign=1) or removes (sign=-1) a rating from the Recipe aggregates.
+    Queryset update() on Review bypasses signals - run
+    rebuild_rating_aggregates after such bulk changes.
+    """
+    rating = float(rating)
+    histogram_field = rating_histogram_field(rating)
+    Recipe.objects.filter(pk=recipe_id).update(
+        rating_sum=F("rating_sum") + sign * rating,
+        rating_count=F("rating_count") + sign,
+        **{histogram_field: F(histogram_field) + sign},
+    )
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance: Review, **kwargs: Any) -> None:
+    instance._previous_rating = None
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not {"rating", "recipe"} & set(update_fields):
+        return
+    if instance.pk:
+        instance._previous_rating = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list("recipe_id", "rating")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_aggregates(
+    sender, instance: Review, created: bool, **kwargs: Any
+) -> None:
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not {"rating", "recipe"} & set(update_fields):
+        return
+
+    previous = getattr(instance, "_previous_rating", None)
+    if previous == (instance.recipe_id, float(instance.rating)):
+        return
+    if previous:
+        apply_rating(*previous, sign=-1)
+    apply_rating(instance.recipe_id, instance.rating, sign=1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating_from_aggregates(sender, instance: Review, **kwargs: Any) -> None:
+    apply_rating(instance.recipe_id, instance.rating, sign=-1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments_cache(sender, instance: Comment, **kwargs: Any) -> None:
+    # After commit, so a concurrent render cannot cache the old rows
+    # under the new version
+    transaction.on_commit(lambda: invalidate_recipe_comments(instance.recipe_id))
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from rest_framework import status
 
@@ -261,7 +263,7 @@ class TestCommentCustomActions:
         response = authenticated_client.get(f"{ENDPOINT}my-comments/")
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 3
+        assert response.data["count"] == 3
         assert Comment.objects.filter(user=user).count() == 3
 
     def test_my_comments_empty(self, authenticated_client):
@@ -269,7 +271,18 @@ class TestCommentCustomActions:
         response = authenticated_client.get(f"{ENDPOINT}my-comments/")
 
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 0
+        assert response.data["count"] == 0
+
+    def test_my_comments_ndjson(self, authenticated_client, users_list):
+        """Comments can be streamed as NDJSON"""
+        user = users_list["first_simple_user"]
+        CommentFactory.create_batch(3, user=user)
+
+        response = authenticated_client.get(f"{ENDPOINT}my-comments/?format=ndjson")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert [json.loads(line)["user"] for line in lines] == [str(user)] * 3
 
     # Activate action tests
     def test_activate_permissions(self, authenticated_client, comment):
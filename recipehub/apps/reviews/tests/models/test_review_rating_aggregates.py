@@ -0,0 +1,48 @@
+import pytest
+
+from recipehub.factories import RecipeFactory, ReviewFactory
+
+
+@pytest.mark.django_db
+class TestReviewRatingAggregates:
+    """Tests that Review changes keep the Recipe rating aggregates in sync"""
+
+    def test_create_update_delete(self):
+        recipe = RecipeFactory.create()
+        first_review = ReviewFactory.create(recipe=recipe, rating=5)
+        second_review = ReviewFactory.create(recipe=recipe, rating=2)
+
+        recipe.refresh_from_db()
+        assert recipe.rating_count == 2
+        assert recipe.average_rating == pytest.approx(3.5)
+        assert recipe.rating_histogram == {1: 0, 2: 1, 3: 0, 4: 0, 5: 1}
+
+        second_review.rating = 4
+        second_review.save()
+
+        recipe.refresh_from_db()
+        assert recipe.rating_count == 2
+        assert recipe.average_rating == pytest.approx(4.5)
+        assert recipe.rating_histogram == {1: 0, 2: 0, 3: 0, 4: 1, 5: 1}
+
+        first_review.delete()
+
+        recipe.refresh_from_db()
+        assert recipe.rating_count == 1
+        assert recipe.average_rating == pytest.approx(4)
+        assert recipe.rating_histogram == {1: 0, 2: 0, 3: 0, 4: 1, 5: 0}
+
+    def test_move_review_to_another_recipe(self):
+        old_recipe = RecipeFactory.create()
+        new_recipe = RecipeFactory.create()
+        review = ReviewFactory.create(recipe=old_recipe, rating=3)
+
+        review.recipe = new_recipe
+        review.save()
+
+        old_recipe.refresh_from_db()
+        new_recipe.refresh_from_db()
+        assert old_recipe.rating_count == 0
+        assert old_recipe.average_rating is None
+        assert new_recipe.rating_count == 1
+        assert new_recipe.rating_3_count == 1
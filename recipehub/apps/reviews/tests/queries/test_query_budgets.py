@@ -0,0 +1,51 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestReviewQueryBudgets:
+    """SQL query and Redis command budgets for reviews and comments"""
+
+    @pytest.mark.parametrize(
+        "client_fixture,url,queries,redis_commands",
+        [
+            pytest.param("authenticated_client", "/api/reviews/", 1, 0, id="reviews"),
+            pytest.param("admin_client", "/api/reviews/", 2, 0, id="reviews-admin"),
+            pytest.param("admin_client", "/api/comments/", 2, 0, id="comments-admin"),
+            pytest.param(
+                "authenticated_client",
+                "/api/comments/my-comments/",
+                2,
+                0,
+                id="my-comments",
+            ),
+        ],
+    )
+    def test_api_get(
+        self,
+        seeded_site,
+        query_budget,
+        request,
+        client_fixture,
+        url,
+        queries,
+        redis_commands,
+    ):
+        client = request.getfixturevalue(client_fixture)
+
+        with query_budget(queries=queries, redis_commands=redis_commands):
+            response = client.get(url)
+
+        assert response.status_code == 200
+
+    def test_create_review(self, client, seeded_site, query_budget):
+        client.force_login(seeded_site["user"])
+
+        with query_budget(queries=11, redis_commands=3):
+            response = client.post(
+                reverse("reviews:create-review"),
+                data={"slug": seeded_site["recipes"][-1].slug, "rating": 5},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
@@ -0,0 +1,79 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from recipehub.apps.reviews.models import Comment
+from recipehub.factories import CommentFactory, RecipeFactory
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings, fake_redis, monkeypatch):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    monkeypatch.setattr("recipehub.apps.recipes.utils.r", fake_redis)
+
+
+@pytest.mark.django_db
+class TestRecipeDetailCommentsCache:
+    """Tests for the cached comment block of recipe_detail"""
+
+    def setup_recipe(self, client, users_list):
+        client.force_login(users_list["first_simple_user"])
+        recipe = RecipeFactory.create(moderation_status="approved")
+        return recipe, reverse("recipes:recipe-detail", kwargs={"slug": recipe.slug})
+
+    def test_comments_served_from_cache(self, client, users_list):
+        recipe, url = self.setup_recipe(client, users_list)
+        CommentFactory.create(recipe=recipe, body="First comment")
+        client.get(url)
+
+        # bulk_create skips the signals, so the cached block stays as it was
+        Comment.objects.bulk_create(
+            [Comment(recipe=recipe, user=recipe.user, body="Unseen comment")]
+        )
+        response = client.get(url)
+
+        assert "First comment" in response.content.decode()
+        assert "Unseen comment" not in response.content.decode()
+
+    def test_new_comment_invalidates_cache(
+        self, client, users_list, django_capture_on_commit_callbacks
+    ):
+        recipe, url = self.setup_recipe(client, users_list)
+        client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(url, {"body": "Fresh comment"})
+        response = client.get(url)
+
+        assert "Fresh comment" in response.content.decode()
+        assert "(1)" in response.content.decode()
+
+    def test_activate_invalidates_cache(
+        self, client, admin_client, users_list, django_capture_on_commit_callbacks
+    ):
+        recipe, url = self.setup_recipe(client, users_list)
+        comment = CommentFactory.create(recipe=recipe, body="Hidden comment")
+        assert "Hidden comment" in client.get(url).content.decode()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.patch(
+                f"/api/comments/{comment.id}/activate/",
+                {"active": False},
+                format="json",
+            )
+
+        assert "Hidden comment" not in client.get(url).content.decode()
+
+    def test_pages_are_cached_separately(self, client, users_list):
+        recipe, url = self.setup_recipe(client, users_list)
+        for i in range(6):
+            CommentFactory.create(recipe=recipe, body=f"Comment number {i}")
+        client.get(url)
+
+        response = client.get(f"{url}?page=2")
+
+        assert "Comment number 0" in response.content.decode()
+        assert "Comment number 5" not in response.content.decode()
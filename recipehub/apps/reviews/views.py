@@ -1,12 +1,12 @@
 from django.contrib.auth.decorators import login_required
-from django.db.models.aggregates import Avg
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 
 from recipehub.apps.recipes.decorators import require_post_json
 from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.utils import invalidate_best_recipes
 from recipehub.apps.reviews.models import Review
-from recipehub.redis import r
+from recipehub.redis import pipeline, r
 
 
 @login_required
@@ -26,12 +26,19 @@ def create_review(request):
         recipe=recipe, user=request.user, defaults={"rating": rating}
     )
 
-    updated_average_rating = Review.objects.filter(recipe=recipe).aggregate(
-        Avg("rating")
-    )["rating__avg"]
-
-    # Saving the average rating in Redis via sorted set
-    r.zadd("recipe:ratings", {recipe.id: updated_average_rating})
+    # Aggregates are kept up to date by the Review signals
+    recipe.refresh_from_db(fields=["rating_sum", "rating_count"])
+    updated_average_rating = recipe.average_rating
+
+    # Saving the average rating in Redis via sorted set and
+    # dropping the cached best recipes if the top 4 changed
+    pipe = pipeline(r, transaction=True)
+    pipe.zrevrange("recipe:ratings", 0, 3)
+    pipe.zadd("recipe:ratings", {recipe.id: updated_average_rating})
+    pipe.zrevrange("recipe:ratings", 0, 3)
+    previous_top, _, current_top = pipe.execute()
+    if previous_top != current_top:
+        invalidate_best_recipes()
 
     return JsonResponse(
         {
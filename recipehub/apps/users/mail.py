@@ -0,0 +1,133 @@
+import base64
+import json
+import time
+from email.mime.base import MIMEBase
+from functools import partial
+from typing import Any
+
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+
+from recipehub.redis import LuaScript, r
+
+
+def serialize_message(message: EmailMessage) -> dict[str, Any]:
+    """
+    Turns a message into JSON for the Celery task.
+    Binary attachments are base64 encoded.
+    """
+    attachments = []
+    for attachment in message.attachments:
+        if isinstance(attachment, MIMEBase):
+            raise ValueError("MIME attachments can't be queued")
+        filename, content, mimetype = attachment
+        if isinstance(content, bytes):
+            content = {"base64": base64.b64encode(content).decode()}
+        attachments.append([filename, content, mimetype])
+
+    return {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email,
+        "to": message.to,
+        "cc": message.cc,
+        "bcc": message.bcc,
+        "reply_to": message.reply_to,
+        "headers": message.extra_headers,
+        "content_subtype": message.content_subtype,
+        "alternatives": [
+            [content, mimetype]
+            for content, mimetype in getattr(message, "alternatives", [])
+        ],
+        "attachments": attachments,
+    }
+
+
+def deserialize_message(data: dict[str, Any], connection=None) -> EmailMessage:
+    message = EmailMultiAlternatives(
+        subject=data["subject"],
+        body=data["body"],
+        from_email=data["from_email"],
+        to=data["to"],
+        cc=data["cc"],
+        bcc=data["bcc"],
+        reply_to=data["reply_to"],
+        headers=data["headers"],
+        connection=connection,
+    )
+    message.content_subtype = data["content_subtype"]
+    for content, mimetype in data["alternatives"]:
+        message.attach_alternative(content, mimetype)
+    for filename, content, mimetype in data["attachments"]:
+        if isinstance(content, dict):
+            content = base64.b64decode(content["base64"])
+        message.attach(filename, content, mimetype)
+    return message
+
+
+# Serialized messages waiting for the send_queued_emails task
+MAIL_QUEUE_KEY = "mail:queue"
+# Messages of the batch being sent, removed one by one once handled.
+# Whatever a killed worker left here goes back to the queue.
+MAIL_PROCESSING_KEY = "mail:processing"
+# Set while a drain task is queued, so a burst schedules only one
+MAIL_DRAIN_SCHEDULED_KEY = "mail:drain:scheduled"
+# Held by the running drain, a second one would resend its batch
+MAIL_DRAIN_LOCK_KEY = "mail:drain:lock"
+MAIL_DRAIN_LOCK_TTL = 60 * 10
+
+# KEYS: sent counter of the current minute
+# ARGV: per-minute limit, wanted slots
+# Returns how many messages may be sent now
+RESERVE_SEND_SLOTS_LUA = """
+local used = tonumber(redis.call("GET", KEYS[1]) or "0")
+local granted = math.min(tonumber(ARGV[1]) - used, tonumber(ARGV[2]))
+if granted <= 0 then
+    return 0
+end
+redis.call("INCRBY", KEYS[1], granted)
+redis.call("EXPIRE", KEYS[1], 120)
+return granted
+"""
+reserve_send_slots = LuaScript(RESERVE_SEND_SLOTS_LUA)
+
+
+def send_window_key(now: float | None = None) -> str:
+    return f"mail:sent:{int((now or time.time()) // 60)}"
+
+
+def schedule_drain(countdown: int = 0) -> None:
+    from recipehub.apps.users.tasks import send_queued_emails
+
+    if r.set(MAIL_DRAIN_SCHEDULED_KEY, 1, nx=True, ex=countdown + 60):
+        send_queued_emails.apply_async(countdown=countdown)
+
+
+def enqueue_messages(payloads: list[dict[str, Any]]) -> None:
+    r.rpush(MAIL_QUEUE_KEY, *(json.dumps(payload) for payload in payloads))
+    schedule_drain()
+
+
+class CeleryEmailBackend(BaseEmailBackend):
+    """
+    Queues messages in Redis for the send_queued_emails task instead of
+    talking to SMTP inside the request. The task delivers them in batches
+    with QUEUED_EMAIL_BACKEND. Messages are queued once the current
+    transaction commits, so a rolled back signup sends nothing.
+    """
+
+    def send_messages(self, email_messages: list[EmailMessage]) -> int:
+        payloads = [
+            serialize_message(message)
+            for message in email_messages
+            if message.recipients()
+        ]
+        if payloads:
+            try:
+                transaction.on_commit(partial(enqueue_messages, payloads))
+            except Exception:
+                if not self.fail_silently:
+                    raise
+                return 0
+        return len(payloads)
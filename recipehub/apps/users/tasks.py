@@ -1,15 +1,178 @@
+import json
 import logging
+import time
 from smtplib import SMTPException
 
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from recipehub.apps.users.mail import (
+    MAIL_DRAIN_LOCK_KEY,
+    MAIL_DRAIN_LOCK_TTL,
+    MAIL_DRAIN_SCHEDULED_KEY,
+    MAIL_PROCESSING_KEY,
+    MAIL_QUEUE_KEY,
+    deserialize_message,
+    reserve_send_slots,
+    schedule_drain,
+    send_window_key,
+)
+from recipehub.metrics import EMAILS_SENT
+from recipehub.redis import lock_is_held, pipeline, r, redis_lock
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def send_welcome_mail(self, username: str, email: str) -> None:
+@shared_task
+def send_queued_emails() -> dict[str, float]:
+    """
+    Drains the mail queue in batches, one SMTP connection per batch,
+    within EMAIL_RATE_LIMIT_PER_MINUTE. Messages beyond the limit wait in
+    the queue for the next minute. Returns the run's throughput.
+    Delivery is at least once: a batch interrupted by a killed worker is
+    sent again from its first unacknowledged message.
+    """
+    r.delete(MAIL_DRAIN_SCHEDULED_KEY)
+    started = time.perf_counter()
+    stats = {"sent": 0, "failed": 0, "batches": 0}
+
+    with redis_lock(MAIL_DRAIN_LOCK_KEY, MAIL_DRAIN_LOCK_TTL, client=r) as token:
+        if token:
+            requeue_in_flight()
+            drain_queue(stats, token)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 3)
+    stats["per_second"] = round(stats["sent"] / elapsed, 2) if elapsed else 0.0
+    if stats["batches"]:
+        logger.info(
+            f"Sent {stats['sent']} emails in {stats['batches']} batches, "
+            f"{stats['failed']} failed, {stats['per_second']}/s"
+        )
+    return stats
+
+
+def drain_queue(stats: dict[str, float], token: str) -> None:
+    while True:
+        if not lock_is_held(MAIL_DRAIN_LOCK_KEY, token, client=r):
+            # The lock expired and another run may be draining already
+            logger.warning("Mail drain lock lost, stopping")
+            return
+        granted = reserve_send_slots(
+            keys=[send_window_key()],
+            args=[settings.EMAIL_RATE_LIMIT_PER_MINUTE, settings.EMAIL_BATCH_SIZE],
+        )
+        if not granted:
+            if r.llen(MAIL_QUEUE_KEY):
+                schedule_drain(countdown=60 - int(time.time()) % 60)
+            return
+
+        pipe = pipeline(r)
+        for _ in range(granted):
+            pipe.lmove(MAIL_QUEUE_KEY, MAIL_PROCESSING_KEY, "LEFT", "RIGHT")
+        batch = [item for item in pipe.execute() if item is not None]
+        if len(batch) < granted:
+            r.decrby(send_window_key(), granted - len(batch))
+        if not batch:
+            return
+
+        batch_started = time.perf_counter()
+        sent, failed, dropped = send_batch(batch)
+        batch_elapsed = time.perf_counter() - batch_started
+        per_second = round(sent / batch_elapsed, 2) if batch_elapsed else 0.0
+        logger.info(
+            f"Sent {sent} of {len(batch)} emails in {batch_elapsed:.3f}s, "
+            f"{failed + dropped} failed, {per_second}/s"
+        )
+        stats["sent"] += sent
+        stats["failed"] += failed + dropped
+        stats["batches"] += 1
+        if sent + dropped < len(batch):
+            # SMTP is struggling, back off instead of retrying right away
+            schedule_drain(countdown=60)
+            return
+
+
+def requeue_in_flight() -> int:
+    """
+    Puts the processing list back at the head of the queue, in order
+    """
+    moved = 0
+    while r.lmove(MAIL_PROCESSING_KEY, MAIL_QUEUE_KEY, "RIGHT", "LEFT"):
+        moved += 1
+    if moved:
+        logger.warning(f"Requeued {moved} emails of an interrupted batch")
+    return moved
+
+
+def acknowledge(retry: dict | None = None) -> None:
+    """
+    Removes the oldest message of the processing list, queueing its retry
+    in the same transaction
+    """
+    pipe = pipeline(r, transaction=True)
+    pipe.lpop(MAIL_PROCESSING_KEY)
+    if retry is not None:
+        pipe.rpush(MAIL_QUEUE_KEY, json.dumps(retry))
+    pipe.execute()
+
+
+def send_batch(batch: list[bytes]) -> tuple[int, int, int]:
+    """
+    Sends the batch, already moved to the processing list, over one
+    connection. Failed messages go back to the queue until
+    EMAIL_MAX_ATTEMPTS, a batch whose connection can't be opened goes back
+    whole and malformed ones are dropped. Returns (sent, failed, dropped).
+    """
+    connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+    try:
+        connection.open()
+    except (SMTPException, OSError) as e:
+        logger.warning(f"Could not open mail connection: {str(e)}")
+        requeue_in_flight()
+        return 0, 0, 0
+
+    sent = failed = dropped = 0
+    try:
+        for item in batch:
+            retry = None
+            try:
+                payload = json.loads(item)
+                message = deserialize_message(payload)
+            except (ValueError, KeyError, TypeError) as e:
+                dropped += 1
+                logger.error(f"Dropping malformed queued email: {str(e)}")
+            else:
+                try:
+                    connection.send_messages([message])
+                except (SMTPException, OSError) as e:
+                    failed += 1
+                    payload["attempts"] = payload.get("attempts", 0) + 1
+                    if payload["attempts"] < settings.EMAIL_MAX_ATTEMPTS:
+                        retry = payload
+                    else:
+                        logger.error(
+                            f"Giving up on email to {payload['to']}: {str(e)}",
+                            exc_info=True,
+                        )
+                else:
+                    sent += 1
+            acknowledge(retry)
+    finally:
+        connection.close()
+
+    EMAILS_SENT.labels("sent").inc(sent)
+    EMAILS_SENT.labels("failed").inc(failed + dropped)
+    return sent, failed, dropped
+
+
+@shared_task
+def send_welcome_mail(username: str, email: str) -> None:
+    """
+    Queues the welcome email, send_queued_emails delivers it and retries
+    SMTP failures
+    """
     if not email:
         logger.warning(
             f"Attempted to send welcome email without email address for user: {username}"
@@ -49,17 +212,10 @@ def send_welcome_mail(self, username: str, email: str) -> None:
         msg.attach_alternative(html_content, "text/html")
         msg.send()
 
-        logger.info(f"Welcome email successfully sent to {email} for user {username}")
-
-    except SMTPException as e:
-        logger.error(
-            f"SMTP error sending welcome email to {email} for user {username}: {str(e)}",
-            exc_info=True,
-        )
-        raise self.retry(exc=e, countdown=60 * (2**self.request.retries))
+        logger.info(f"Welcome email queued for {email} for user {username}")
 
     except Exception as e:
         logger.error(
-            f"Unexpected error sending welcome email to {email} for user {username}: {str(e)}",
+            f"Unexpected error queueing welcome email to {email} for user {username}: {str(e)}",
             exc_info=True,
         )
@@ -0,0 +1,82 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestUserQueryBudgets:
+    """SQL query and Redis command budgets for the account pages and user API"""
+
+    @pytest.mark.parametrize(
+        "url,queries,redis_commands",
+        [
+            pytest.param(lambda site: reverse("profile"), 5, 7, id="profile"),
+            pytest.param(
+                lambda site: reverse("profile-edit", kwargs={"pk": site["user"].pk}),
+                4,
+                7,
+                id="profile-edit",
+            ),
+            pytest.param(
+                lambda site: reverse("saved-recipes"), 4, 7, id="saved-recipes"
+            ),
+        ],
+    )
+    def test_get(self, client, seeded_site, query_budget, url, queries, redis_commands):
+        client.force_login(seeded_site["user"])
+        url = url(seeded_site)
+
+        with query_budget(queries=queries, redis_commands=redis_commands):
+            response = client.get(url)
+
+        assert response.status_code == 200
+
+    def test_login_page(self, client, seeded_site, query_budget):
+        with query_budget(queries=1, redis_commands=7):
+            response = client.get(reverse("account_login"))
+
+        assert response.status_code == 200
+
+    def test_remove_saved_recipe(self, client, seeded_site, query_budget):
+        client.force_login(seeded_site["user"])
+
+        with query_budget(queries=5, redis_commands=3):
+            response = client.post(
+                reverse("remove_saved_recipe"),
+                data={"slug": seeded_site["recipes"][0].slug},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize(
+        "client_fixture,url,queries,redis_commands",
+        [
+            pytest.param("admin_client", lambda site: "/api/users/", 2, 0, id="users"),
+            pytest.param(
+                "authenticated_client", lambda site: "/api/users/me/", 1, 0, id="me"
+            ),
+            pytest.param(
+                "authenticated_client",
+                lambda site: f"/api/users/{site['user'].pk}/recipes/",
+                3,
+                0,
+                id="user-recipes",
+            ),
+        ],
+    )
+    def test_api_get(
+        self,
+        seeded_site,
+        query_budget,
+        request,
+        client_fixture,
+        url,
+        queries,
+        redis_commands,
+    ):
+        client = request.getfixturevalue(client_fixture)
+
+        with query_budget(queries=queries, redis_commands=redis_commands):
+            response = client.get(url(seeded_site))
+
+        assert response.status_code == 200
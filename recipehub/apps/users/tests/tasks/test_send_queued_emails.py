@@ -0,0 +1,194 @@
+import json
+from smtplib import SMTPException
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives, send_mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+
+from recipehub.apps.users.mail import (
+    MAIL_DRAIN_LOCK_KEY,
+    MAIL_DRAIN_SCHEDULED_KEY,
+    MAIL_PROCESSING_KEY,
+    MAIL_QUEUE_KEY,
+    deserialize_message,
+    serialize_message,
+)
+from recipehub.apps.users.tasks import send_queued_emails
+from recipehub.celery import app
+
+LOCMEM_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+
+@pytest.fixture
+def mail_queue(settings, fake_redis, monkeypatch):
+    settings.EMAIL_BACKEND = "recipehub.apps.users.mail.CeleryEmailBackend"
+    settings.QUEUED_EMAIL_BACKEND = LOCMEM_BACKEND
+    settings.EMAIL_BATCH_SIZE = 2
+    settings.EMAIL_RATE_LIMIT_PER_MINUTE = 100
+    for module in ("mail", "tasks"):
+        monkeypatch.setattr(f"recipehub.apps.users.{module}.r", fake_redis)
+    return fake_redis
+
+
+def queue_messages(redis, count: int, key: str = MAIL_QUEUE_KEY) -> None:
+    for i in range(count):
+        message = EmailMessage(f"Message {i}", "Body", to=[f"user{i}@example.com"])
+        redis.rpush(key, json.dumps(serialize_message(message)))
+
+
+@pytest.mark.django_db
+class TestSendQueuedEmails:
+    """Tests for the Celery email backend and the batching mail task"""
+
+    def test_message_survives_serialization(self):
+        message = EmailMultiAlternatives(
+            subject="Hello",
+            body="Text",
+            from_email="from@example.com",
+            to=["to@example.com"],
+            bcc=["bcc@example.com"],
+            headers={"X-Tag": "welcome"},
+        )
+        message.attach_alternative("<p>Text</p>", "text/html")
+        message.attach("photo.jpg", b"\xff\xd8\xff", "image/jpeg")
+
+        copy = deserialize_message(serialize_message(message))
+
+        assert copy.recipients() == ["to@example.com", "bcc@example.com"]
+        assert copy.extra_headers == {"X-Tag": "welcome"}
+        assert list(copy.alternatives) == [("<p>Text</p>", "text/html")]
+        assert list(copy.attachments[0]) == ["photo.jpg", b"\xff\xd8\xff", "image/jpeg"]
+
+    def test_mail_is_sent_after_commit(
+        self, mail_queue, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        monkeypatch.setattr(app.conf, "task_always_eager", True)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            send_mail("Confirm", "Link", "from@example.com", ["to@example.com"])
+            assert mail_queue.llen(MAIL_QUEUE_KEY) == 0
+
+        for callback in callbacks:
+            callback()
+
+        assert [message.subject for message in mail.outbox] == ["Confirm"]
+        assert mail_queue.llen(MAIL_QUEUE_KEY) == 0
+
+    def test_one_connection_per_batch(self, mail_queue):
+        queue_messages(mail_queue, 5)
+
+        with patch(f"{LOCMEM_BACKEND}.open") as open_connection:
+            stats = send_queued_emails()
+
+        assert open_connection.call_count == 3
+        assert stats["batches"] == 3
+        assert stats["sent"] == 5
+        assert len(mail.outbox) == 5
+
+    def test_throughput_is_logged_per_batch(self, mail_queue, caplog):
+        queue_messages(mail_queue, 3)
+
+        with caplog.at_level("INFO", logger="recipehub.apps.users.tasks"):
+            send_queued_emails()
+
+        batches = [m for m in caplog.messages if " of " in m]
+        assert [m.split(" in ")[0] for m in batches] == [
+            "Sent 2 of 2 emails",
+            "Sent 1 of 1 emails",
+        ]
+
+    def test_rate_limit_leaves_the_rest_for_next_minute(self, mail_queue, settings):
+        settings.EMAIL_RATE_LIMIT_PER_MINUTE = 3
+        queue_messages(mail_queue, 5)
+
+        with patch.object(send_queued_emails, "apply_async") as apply_async:
+            stats = send_queued_emails()
+            assert send_queued_emails()["sent"] == 0
+
+        assert stats["sent"] == 3
+        assert mail_queue.llen(MAIL_QUEUE_KEY) == 2
+        assert mail_queue.exists(MAIL_DRAIN_SCHEDULED_KEY)
+        assert 0 < apply_async.call_args.kwargs["countdown"] <= 60
+
+    def test_failed_messages_are_requeued_until_max_attempts(
+        self, mail_queue, settings
+    ):
+        settings.EMAIL_MAX_ATTEMPTS = 2
+        queue_messages(mail_queue, 1)
+
+        with (
+            patch(f"{LOCMEM_BACKEND}.send_messages", side_effect=SMTPException("busy")),
+            patch.object(send_queued_emails, "apply_async") as apply_async,
+        ):
+            assert send_queued_emails()["failed"] == 1
+            assert mail_queue.llen(MAIL_QUEUE_KEY) == 1
+            assert apply_async.call_args.kwargs["countdown"] == 60
+
+            assert send_queued_emails()["failed"] == 1
+
+        assert mail_queue.llen(MAIL_QUEUE_KEY) == 0
+
+    def test_batch_of_a_killed_worker_is_sent_first(self, mail_queue):
+        queue_messages(mail_queue, 2, key=MAIL_PROCESSING_KEY)
+        later = EmailMessage("Later", "Body", to=["later@example.com"])
+        mail_queue.rpush(MAIL_QUEUE_KEY, json.dumps(serialize_message(later)))
+
+        assert send_queued_emails()["sent"] == 3
+
+        assert [message.subject for message in mail.outbox] == [
+            "Message 0",
+            "Message 1",
+            "Later",
+        ]
+        assert not mail_queue.exists(MAIL_PROCESSING_KEY)
+
+    def test_messages_are_acknowledged_as_they_are_sent(self, mail_queue):
+        queue_messages(mail_queue, 2)
+
+        with patch(
+            f"{LOCMEM_BACKEND}.send_messages",
+            side_effect=[1, KeyboardInterrupt],
+        ):
+            with pytest.raises(KeyboardInterrupt):
+                send_queued_emails()
+
+        assert mail_queue.llen(MAIL_PROCESSING_KEY) == 1
+        assert json.loads(mail_queue.lindex(MAIL_PROCESSING_KEY, 0))["subject"] == (
+            "Message 1"
+        )
+
+    def test_malformed_message_does_not_drop_the_batch(self, mail_queue):
+        mail_queue.rpush(MAIL_QUEUE_KEY, "not json", json.dumps({"subject": "x"}))
+        queue_messages(mail_queue, 1)
+
+        stats = send_queued_emails()
+
+        assert stats["sent"] == 1
+        assert stats["failed"] == 2
+        assert [message.subject for message in mail.outbox] == ["Message 0"]
+        assert not mail_queue.exists(MAIL_QUEUE_KEY)
+        assert not mail_queue.exists(MAIL_PROCESSING_KEY)
+
+    def test_concurrent_drain_is_skipped(self, mail_queue):
+        queue_messages(mail_queue, 1)
+        mail_queue.set(MAIL_DRAIN_LOCK_KEY, 1)
+
+        assert send_queued_emails()["sent"] == 0
+        assert mail_queue.llen(MAIL_QUEUE_KEY) == 1
+
+    def test_run_outliving_its_lock_stops_and_keeps_the_new_lock(self, mail_queue):
+        queue_messages(mail_queue, 4)
+        send_messages = LocmemBackend.send_messages
+
+        def send_and_lose_lock(connection, messages):
+            mail_queue.set(MAIL_DRAIN_LOCK_KEY, "newer run")
+            return send_messages(connection, messages)
+
+        with patch(f"{LOCMEM_BACKEND}.send_messages", send_and_lose_lock):
+            stats = send_queued_emails()
+
+        assert stats["sent"] == 2
+        assert mail_queue.llen(MAIL_QUEUE_KEY) == 2
+        assert mail_queue.get(MAIL_DRAIN_LOCK_KEY) == b"newer run"
@@ -9,6 +9,7 @@ from django.shortcuts import get_object_or_404
 from recipehub.apps.users.models import UserRecipeFavorite
 
 from recipehub.apps.recipes.models import Recipe
+from recipehub.apps.recipes.utils import remove_user_favorite
 
 User = get_user_model()
 
@@ -59,6 +60,7 @@ def remove_saved_recipe(request):
     # Toggle realization favorites recipes
     if favorite.exists():
         favorite.delete()
+        remove_user_favorite(request.user.id, recipe.id)
         return JsonResponse({"status": "ok", "removed": True})
     else:
         return JsonResponse(
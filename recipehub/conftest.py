@@ -1,21 +1,28 @@
+import uuid
+
 import fakeredis
 import pytest
 import recipehub.redis as redis_module
 
 from io import BytesIO
 from typing import Dict
+from weakref import WeakKeyDictionary
 from PIL import Image
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from rest_framework.test import APIClient, APIRequestFactory
 
+from recipehub.apps.recipes.trending import TRENDING_KEY
+from recipehub.apps.recipes.utils import clear_local_best_recipes
 from recipehub.factories import (
     CategoryFactory,
     RecipeFactory,
     CommentFactory,
     ReviewFactory,
     UserFactory,
+    UserRecipeFavoriteFactory,
 )
+from recipehub.query_budget import QueryBudget
 
 # Constants for moderation statuses
 MODERATION_STATUS_APPROVED = "approved"
@@ -28,6 +35,28 @@ def media_root(settings, tmp_path):
     settings.MEDIA_ROOT = tmp_path
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    """
+    Gives every test its own cache key prefix. The Redis cache outlives
+    the test database, whose recipe IDs start over on every run.
+    """
+    settings.CACHES = {
+        "default": {
+            **settings.CACHES["default"],
+            "KEY_PREFIX": f"test-{uuid.uuid4().hex}",
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def local_best_recipes():
+    """Keeps the in-process best recipes copy from leaking between tests."""
+    clear_local_best_recipes()
+    yield
+    clear_local_best_recipes()
+
+
 @pytest.fixture
 def valid_signup_data() -> Dict[str, str]:
     """Basic valid data for user registration."""
@@ -53,9 +82,19 @@ def sample_image() -> SimpleUploadedFile:
 
 @pytest.fixture()
 def fake_redis(monkeypatch) -> fakeredis.FakeStrictRedis:
-    """Provides a fake Redis client for testing without a real Redis instance."""
-    fake_client = fakeredis.FakeStrictRedis()
+    """
+    Provides a fake Redis client for testing without a real Redis instance.
+    Async views get asyncio clients backed by the same fake server.
+    """
+    server = fakeredis.FakeServer()
+    fake_client = fakeredis.FakeStrictRedis(server=server)
     monkeypatch.setattr(redis_module, "r", fake_client)
+    monkeypatch.setattr(redis_module, "_async_clients", WeakKeyDictionary())
+    monkeypatch.setattr(
+        redis_module,
+        "create_async_client",
+        lambda: fakeredis.FakeAsyncRedis(server=server),
+    )
     return fake_client
 
 
@@ -298,3 +337,72 @@ def reviews_fixture(authenticated_client, users_list) -> Dict[str, object]:
         "user1_reviews": [reviews[0], reviews[2]],
         "user2_reviews": [reviews[1]],
     }
+
+
+# Query budget fixtures
+@pytest.fixture
+def query_budget() -> type[QueryBudget]:
+    """Asserts a block stays within a number of SQL queries and Redis commands."""
+    return QueryBudget
+
+
+@pytest.fixture
+def seeded_site(
+    users_list: Dict[str, object], fake_redis, monkeypatch, settings
+) -> Dict[str, object]:
+    """
+    Seeds realistic volumes for the query budget suites: approved recipes
+    with reviews, comments and favorites, plus a moderation backlog.
+    Every module talking to Redis gets the fake client and the cache
+    starts cold under its own key prefix.
+    """
+    for module in (
+        "recipes.utils",
+        "recipes.tasks",
+        "recipes.trending",
+        "recipes.similarity",
+        "recipes.recommendations",
+        "reviews.views",
+    ):
+        monkeypatch.setattr(f"recipehub.apps.{module}.r", fake_redis)
+    settings.CACHES = {
+        "default": {
+            **settings.CACHES["default"],
+            "KEY_PREFIX": f"query-budget-{uuid.uuid4().hex}",
+        }
+    }
+
+    user = users_list["first_simple_user"]
+    categories = CategoryFactory.create_batch(3)
+    recipes = [
+        RecipeFactory(
+            category=categories[i % len(categories)],
+            moderation_status=MODERATION_STATUS_APPROVED,
+            ingredients="tomato - 2 pcs\ncheese - 100 g",
+        )
+        for i in range(30)
+    ]
+    own_recipes = RecipeFactory.create_batch(
+        10, user=user, moderation_status=MODERATION_STATUS_APPROVED
+    )
+    pending_recipes = RecipeFactory.create_batch(
+        10, user=user, moderation_status=MODERATION_STATUS_IN_PROCESS
+    )
+
+    reviewers = UserFactory.create_batch(3)
+    for recipe in recipes:
+        for reviewer in reviewers:
+            ReviewFactory(recipe=recipe, user=reviewer)
+            CommentFactory(recipe=recipe, user=reviewer)
+        CommentFactory(recipe=recipe, user=user)
+    fake_redis.zadd("recipe:ratings", {recipe.id: 4 for recipe in recipes})
+    fake_redis.zadd(TRENDING_KEY, {recipe.id: recipe.id for recipe in recipes})
+    for recipe in recipes[:10]:
+        UserRecipeFavoriteFactory(user=user, recipe=recipe)
+
+    return {
+        "user": user,
+        "recipes": recipes,
+        "own_recipes": own_recipes,
+        "pending_recipes": pending_recipes,
+    }
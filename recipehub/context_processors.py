@@ -1,6 +1,7 @@
 from typing import Any
 
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
 
 from recipehub.apps.recipes.utils import get_best_recipes
 
@@ -8,6 +9,7 @@ from recipehub.apps.recipes.utils import get_best_recipes
 def redis_best_recipes(request: HttpRequest) -> dict[str, Any]:
     """
     Returns top 4 rated recipes from Redis.
+    Evaluated only when a template uses them, once per request.
     Doesn't work for API
     """
     if (
@@ -16,8 +18,9 @@ def redis_best_recipes(request: HttpRequest) -> dict[str, Any]:
     ):
         return {}
 
-    best_recipes = get_best_recipes()
+    if not hasattr(request, "_best_recipes"):
+        request._best_recipes = SimpleLazyObject(get_best_recipes)
 
     return {
-        "best_recipes": best_recipes,
+        "best_recipes": request._best_recipes,
     }
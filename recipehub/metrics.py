@@ -0,0 +1,214 @@
+import glob
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import task_postrun, task_prerun
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With PROMETHEUS_MULTIPROC_DIR set, every gunicorn worker and Celery
+# process writes its samples there and /metrics sums them up. Sample
+# files are named by PID, so each container needs its own directory:
+# the web container merges in the ones in PROMETHEUS_EXTRA_MULTIPROC_DIRS.
+
+REQUEST_LATENCY = Histogram(
+    "recipehub_request_duration_seconds",
+    "Request latency by URL name",
+    ["view", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "recipehub_request_db_queries",
+    "SQL queries per request by URL name",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+REQUEST_DB_DURATION = Histogram(
+    "recipehub_request_db_duration_seconds",
+    "Time spent in SQL per request by URL name",
+    ["view"],
+)
+REDIS_COMMAND_LATENCY = Histogram(
+    "recipehub_redis_command_duration_seconds",
+    "Redis command latency, pipelines are observed as a whole",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+CACHE_REQUESTS = Counter(
+    "recipehub_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+EMAILS_SENT = Counter(
+    "recipehub_emails_total",
+    "Emails handed to SMTP by send_queued_emails",
+    ["result"],
+)
+TASK_DURATION = Histogram(
+    "recipehub_celery_task_duration_seconds",
+    "Celery task run time by task and final state",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_redis(command: str, started: float) -> None:
+    REDIS_COMMAND_LATENCY.labels(command.upper()).observe(time.perf_counter() - started)
+
+
+class DbStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Context variables follow the request into sync_to_async threads,
+# so queries of async views are counted as well
+_request_db_stats: ContextVar[DbStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _request_db_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def instrument_connection(sender=None, connection=connection, **kwargs) -> None:
+    # Outermost, so execute_wrapper() blocks still pop their own wrapper
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+connection_created.connect(instrument_connection)
+
+
+class MetricsMiddleware:
+    """
+    Observes latency and SQL usage of every request under its URL name
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        # Connections opened before this module was imported
+        instrument_connection()
+        started, token = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            stats = self.stop(token)
+        self.observe(request, response, started, stats)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        started, token = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stats = self.stop(token)
+        self.observe(request, response, started, stats)
+        return response
+
+    def start(self):
+        return time.perf_counter(), _request_db_stats.set(DbStats())
+
+    def stop(self, token) -> DbStats:
+        stats = _request_db_stats.get()
+        _request_db_stats.reset(token)
+        return stats
+
+    def observe(
+        self, request: HttpRequest, response: HttpResponse, started: float, stats
+    ) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "<unresolved>"
+        REQUEST_LATENCY.labels(view, request.method, response.status_code).observe(
+            time.perf_counter() - started
+        )
+        REQUEST_DB_QUERIES.labels(view).observe(stats.queries)
+        REQUEST_DB_DURATION.labels(view).observe(stats.seconds)
+
+
+_task_started: dict[str, float] = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs) -> None:
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def observe_task(task_id=None, task=None, state=None, **kwargs) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(
+            time.perf_counter() - started
+        )
+
+
+class MergedMultiProcessCollector(multiprocess.MultiProcessCollector):
+    """
+    Sums the sample files of several multiprocess directories.
+    Directories that don't exist yet are skipped.
+    """
+
+    def __init__(self, registry: CollectorRegistry, paths: list[str]):
+        super().__init__(None, paths[0])
+        self._paths = paths
+        registry.register(self)
+
+    def collect(self):
+        files = [
+            file
+            for path in self._paths
+            for file in glob.glob(os.path.join(path, "*.db"))
+        ]
+        return self.merge(files, accumulate=True)
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        extra = os.environ.get("PROMETHEUS_EXTRA_MULTIPROC_DIRS", "")
+        MergedMultiProcessCollector(
+            registry,
+            [os.environ["PROMETHEUS_MULTIPROC_DIR"], *filter(None, extra.split(":"))],
+        )
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,122 @@
+import traceback
+from collections import Counter
+from pathlib import Path
+
+import redis
+import redis.asyncio
+from django.db import connection
+
+PROJECT_DIR = Path(__file__).resolve().parent
+# Wrappers every query or command passes through, never the call site
+INSTRUMENTATION = {
+    PROJECT_DIR / "query_budget.py",
+    PROJECT_DIR / "metrics.py",
+    PROJECT_DIR / "redis.py",
+}
+
+
+def call_site() -> str:
+    """
+    Returns the innermost project line that led to the current call
+    """
+    for frame in reversed(traceback.extract_stack()):
+        path = Path(frame.filename)
+        if path.is_relative_to(PROJECT_DIR) and path not in INSTRUMENTATION:
+            return f"{path.relative_to(PROJECT_DIR.parent)}:{frame.lineno}"
+    return "<outside recipehub>"
+
+
+class QueryBudget:
+    """
+    Context manager failing when the wrapped code runs more SQL queries
+    or Redis commands than allowed. The failure lists what ran, grouped
+    by the project line that issued it, so an N+1 points at its source.
+    """
+
+    def __init__(self, queries: int, redis_commands: int = 0):
+        self.max_queries = queries
+        self.max_redis_commands = redis_commands
+        self.queries: list[tuple[str, str]] = []
+        self.redis_commands: list[tuple[str, str]] = []
+
+    def __enter__(self) -> "QueryBudget":
+        self._execute_wrapper = connection.execute_wrapper(self._record_query)
+        self._execute_wrapper.__enter__()
+        self._patch_redis()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self._execute_wrapper.__exit__(exc_type, exc_value, tb)
+        for cls, name, method in self._patched:
+            setattr(cls, name, method)
+        if exc_type is not None:
+            return
+
+        errors = []
+        if len(self.queries) > self.max_queries:
+            errors.append(self._report("SQL queries", self.queries, self.max_queries))
+        if len(self.redis_commands) > self.max_redis_commands:
+            errors.append(
+                self._report(
+                    "Redis commands", self.redis_commands, self.max_redis_commands
+                )
+            )
+        if errors:
+            raise AssertionError("\n\n".join(errors))
+
+    def _record_query(self, execute, sql, params, many, context):
+        self.queries.append((sql, call_site()))
+        return execute(sql, params, many, context)
+
+    def _record_command(self, args: tuple) -> None:
+        self.redis_commands.append((str(args[0]), call_site()))
+
+    def _record_pipeline(self, pipeline) -> None:
+        site = call_site()
+        for command_args, _ in pipeline.command_stack:
+            self.redis_commands.append((f"{command_args[0]} (pipeline)", site))
+
+    def _patch_redis(self) -> None:
+        """
+        Counts commands of the sync and asyncio clients, async views
+        talk to Redis through the latter
+        """
+        budget = self
+        sync_command = redis.Redis.execute_command
+        sync_pipeline = redis.client.Pipeline.execute
+        async_command = redis.asyncio.Redis.execute_command
+        async_pipeline = redis.asyncio.client.Pipeline.execute
+        self._patched = [
+            (redis.Redis, "execute_command", sync_command),
+            (redis.client.Pipeline, "execute", sync_pipeline),
+            (redis.asyncio.Redis, "execute_command", async_command),
+            (redis.asyncio.client.Pipeline, "execute", async_pipeline),
+        ]
+
+        def execute_command(client, *args, **options):
+            budget._record_command(args)
+            return sync_command(client, *args, **options)
+
+        def execute(pipeline, *args, **kwargs):
+            budget._record_pipeline(pipeline)
+            return sync_pipeline(pipeline, *args, **kwargs)
+
+        async def aexecute_command(client, *args, **options):
+            budget._record_command(args)
+            return await async_command(client, *args, **options)
+
+        async def aexecute(pipeline, *args, **kwargs):
+            budget._record_pipeline(pipeline)
+            return await async_pipeline(pipeline, *args, **kwargs)
+
+        redis.Redis.execute_command = execute_command
+        redis.client.Pipeline.execute = execute
+        redis.asyncio.Redis.execute_command = aexecute_command
+        redis.asyncio.client.Pipeline.execute = aexecute
+
+    @staticmethod
+    def _report(kind: str, calls: list[tuple[str, str]], budget: int) -> str:
+        lines = [f"{len(calls)} {kind} over a budget of {budget}:"]
+        for (statement, site), count in Counter(calls).most_common():
+            lines.append(f"  {count}x {site}  {statement[:200]}")
+        return "\n".join(lines)
@@ -1,9 +1,238 @@
-import os
+import asyncio
+import hashlib
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Iterator, Sequence
+from weakref import WeakKeyDictionary
 
 import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.cache.backends import redis as django_redis
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, NoScriptError
+from redis.retry import Retry
 
-r = redis.Redis(
-    host=os.environ.get("REDIS_HOST"),
-    port=int(os.environ.get("REDIS_PORT")),
-    db=int(os.environ.get("REDIS_DB")),
-)
+from recipehub.metrics import observe_redis
+
+_pools: dict[tuple[str, bool], redis.BlockingConnectionPool] = {}
+_async_clients: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def pool_options(retry_class: type = Retry, batch: bool = False) -> dict[str, Any]:
+    """
+    Connection options from settings.REDIS_POOL, or REDIS_BATCH_POOL for
+    batch jobs. Only dropped connections are retried: a timed out command
+    may have run already, and retrying it would stack the stall onto the
+    request.
+    """
+    options = dict(settings.REDIS_BATCH_POOL if batch else settings.REDIS_POOL)
+    retries = options.pop("retries")
+    options["retry"] = retry_class(
+        ExponentialBackoff(cap=0.1, base=0.01),
+        retries,
+        supported_errors=(ConnectionError,),
+    )
+    return options
+
+
+def get_connection_pool(
+    url: str | None = None, batch: bool = False
+) -> redis.BlockingConnectionPool:
+    """
+    Returns the process-wide pool for the URL, shared by every thread.
+    Callers wait up to REDIS_POOL["timeout"] for a free connection
+    instead of opening new ones past max_connections.
+    """
+    url = url or settings.REDIS_URL
+    pool = _pools.get((url, batch))
+    if pool is None:
+        pool = _pools[url, batch] = redis.BlockingConnectionPool.from_url(
+            url, **pool_options(batch=batch)
+        )
+    return pool
+
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    def execute(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().execute(*args, **kwargs)
+        finally:
+            observe_redis("pipeline", started)
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Observes the latency of every command in recipehub_redis_command_*
+    """
+
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            observe_redis(str(args[0]), started)
+
+    def pipeline(self, transaction=True, shard_hint=None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedAsyncPipeline(redis.asyncio.client.Pipeline):
+    async def execute(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().execute(*args, **kwargs)
+        finally:
+            observe_redis("pipeline", started)
+
+
+class InstrumentedAsyncRedis(redis.asyncio.Redis):
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            observe_redis(str(args[0]), started)
+
+    def pipeline(self, transaction=True, shard_hint=None) -> InstrumentedAsyncPipeline:
+        return InstrumentedAsyncPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def create_client(url: str | None = None, batch: bool = False) -> InstrumentedRedis:
+    return InstrumentedRedis(connection_pool=get_connection_pool(url, batch))
+
+
+r = create_client()
+# For Celery batch jobs and management commands sending large pipelines,
+# which would time out under the request timeouts
+batch_r = create_client(batch=True)
+
+
+def create_async_client() -> redis.asyncio.Redis:
+    pool = redis.asyncio.BlockingConnectionPool.from_url(
+        settings.REDIS_URL, **pool_options(AsyncRetry)
+    )
+    return InstrumentedAsyncRedis(connection_pool=pool)
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    """
+    Returns the asyncio client of the running event loop.
+    Its connections belong to that loop, so each loop gets its own client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = create_async_client()
+    return client
+
+
+def pipeline(client: redis.Redis | None = None, transaction: bool = False):
+    """
+    Batches commands into one round trip. Without MULTI/EXEC by default,
+    pass transaction=True when the commands must run atomically.
+    """
+    return (client or r).pipeline(transaction=transaction)
+
+
+class LuaScript:
+    """
+    Lua script called by its SHA and loaded on the first NOSCRIPT,
+    so it survives Redis restarts and works with sync and async clients
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    def __call__(
+        self,
+        keys: Sequence = (),
+        args: Sequence = (),
+        client: redis.Redis | None = None,
+    ) -> Any:
+        client = client or r
+        try:
+            return client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            client.script_load(self.source)
+            return client.evalsha(self.sha, len(keys), *keys, *args)
+
+    async def acall(
+        self,
+        keys: Sequence = (),
+        args: Sequence = (),
+        client: redis.asyncio.Redis | None = None,
+    ) -> Any:
+        client = client or get_async_redis()
+        try:
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await client.script_load(self.source)
+            return await client.evalsha(self.sha, len(keys), *keys, *args)
+
+
+# KEYS: lock key
+# ARGV: token of the holder
+# Deletes the lock only while it still holds the token
+RELEASE_LOCK_LUA = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+release_lock = LuaScript(RELEASE_LOCK_LUA)
+
+
+def lock_is_held(key: str, token: str, client: redis.Redis | None = None) -> bool:
+    return (client or r).get(key) == token.encode()
+
+
+@contextmanager
+def redis_lock(
+    key: str, ttl: int, client: redis.Redis | None = None
+) -> Iterator[str | None]:
+    """
+    Takes the lock for at most ttl seconds and yields its token, or None
+    when another run holds it. The lock is released only while it still
+    holds the token, so a run outliving the TTL leaves its successor's
+    lock alone.
+    """
+    client = client or r
+    token = uuid.uuid4().hex
+    if not client.set(key, token, nx=True, ex=ttl):
+        yield None
+        return
+    try:
+        yield token
+    finally:
+        release_lock(keys=[key], args=[token], client=client)
+
+
+class RedisCacheClient(django_redis.RedisCacheClient):
+    """
+    Takes connections from the shared pools instead of a pool per
+    thread-local cache instance
+    """
+
+    def __init__(self, servers, **options):
+        super().__init__(servers, **options)
+        self._client = InstrumentedRedis
+
+    def _get_connection_pool(self, write: bool) -> redis.ConnectionPool:
+        return get_connection_pool(
+            self._servers[self._get_connection_pool_index(write)]
+        )
+
+
+class RedisCache(django_redis.RedisCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        self._class = RedisCacheClient
@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Other
     "django_cleanup.apps.CleanupConfig",
     "widget_tweaks",
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "recipehub.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -101,10 +103,39 @@ DATABASES = {
 }
 
 REDIS_HOST = os.environ.get("REDIS_HOST", "redis")
+REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+REDIS_DB = int(os.environ.get("REDIS_DB", 0))
+REDIS_SOCKET_PATH = os.environ.get("REDIS_SOCKET_PATH")
+REDIS_URL = (
+    f"unix://{REDIS_SOCKET_PATH}?db={REDIS_DB}"
+    if REDIS_SOCKET_PATH
+    else f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}"
+)
+
+# Shared by the app clients and the cache, see recipehub/redis.py
+REDIS_POOL = {
+    "max_connections": int(os.environ.get("REDIS_MAX_CONNECTIONS", 50)),
+    "timeout": float(os.environ.get("REDIS_POOL_TIMEOUT", 1)),
+    "socket_timeout": float(os.environ.get("REDIS_SOCKET_TIMEOUT", 0.5)),
+    "socket_connect_timeout": float(
+        os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", 0.5)
+    ),
+    "health_check_interval": int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", 30)),
+    "retries": int(os.environ.get("REDIS_RETRIES", 2)),
+}
+# Pipelines of thousands of commands from Celery batch jobs and
+# management commands, on a small pool of their own
+REDIS_BATCH_POOL = {
+    **REDIS_POOL,
+    "max_connections": int(os.environ.get("REDIS_BATCH_MAX_CONNECTIONS", 10)),
+    "timeout": float(os.environ.get("REDIS_BATCH_POOL_TIMEOUT", 10)),
+    "socket_timeout": float(os.environ.get("REDIS_BATCH_SOCKET_TIMEOUT", 30)),
+}
+
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.redis.RedisCache",
-        "LOCATION": f"redis://{REDIS_HOST}:6379",
+        "BACKEND": "recipehub.redis.RedisCache",
+        "LOCATION": REDIS_URL,
     }
 }
 
@@ -156,7 +187,12 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# Requests only queue messages, the Celery worker delivers them over SMTP
+EMAIL_BACKEND = "recipehub.apps.users.mail.CeleryEmailBackend"
+QUEUED_EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BATCH_SIZE = 50
+EMAIL_RATE_LIMIT_PER_MINUTE = int(os.environ.get("EMAIL_RATE_LIMIT_PER_MINUTE", 60))
+EMAIL_MAX_ATTEMPTS = 5
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -214,3 +250,27 @@ SPECTACULAR_SETTINGS = {
     "SWAGGER_UI_FAVICON_HREF": "SIDECAR",
     "REDOC_DIST": "SIDECAR",
 }
+
+CELERY_BEAT_SCHEDULE = {
+    "flush-recipe-views": {
+        "task": "recipehub.apps.recipes.tasks.flush_recipe_views",
+        "schedule": 60.0,
+    },
+    "rebuild-similar-recipes": {
+        "task": "recipehub.apps.recipes.tasks.rebuild_similar_recipes",
+        "schedule": 60.0 * 60,
+    },
+    "rebuild-recommendations": {
+        "task": "recipehub.apps.recipes.tasks.rebuild_recommendations",
+        "schedule": 60.0 * 60 * 6,
+    },
+    "refresh-recommendations": {
+        "task": "recipehub.apps.recipes.tasks.refresh_recommendations",
+        "schedule": 60.0,
+    },
+    # Safety net for messages whose drain task was lost
+    "send-queued-emails": {
+        "task": "recipehub.apps.users.tasks.send_queued_emails",
+        "schedule": 60.0,
+    },
+}
@@ -17,6 +17,7 @@ from recipehub.apps.recipes.api.views import RecipeViewSet, CategoryViewSet
 from recipehub.apps.reviews.api.views import ReviewViewSet, CommentViewSet
 from recipehub.apps.users.api.auth_views import register
 from recipehub.apps.users.api.views import UserViewSet
+from recipehub.metrics import metrics_view
 
 router = DefaultRouter()
 router.register("recipes", RecipeViewSet)
@@ -45,6 +46,7 @@ urlpatterns = [
     path("api/auth/register/", register, name="register"),
     path("api/auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG: